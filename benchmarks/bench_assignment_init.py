@@ -0,0 +1,61 @@
+""" Compare how many annealing iterations assign_pools and assign_seed_pools
+    need to come within a tolerance of the minimum score when starting from
+    a random assignment versus the greedy initializer
+
+    python -m benchmarks.bench_assignment_init [--entrants N] [--problems K]
+        [--tolerance T] [--seed-tolerance T] [--max-iters M]
+
+Problems are the synthetic registrations of curlybrackets.testing's
+make_problem. Runs that hit the iteration limit are reported at the limit.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from curlybrackets.assignment.pools import assign_pools
+from curlybrackets.assignment.seeds import assign_seed_pools
+from curlybrackets.testing.assignment_problem import make_problem
+
+
+def run(func, df, events, pools, init, seed, max_iters, tolerance):
+    random.seed(seed)
+    np.random.seed(seed)
+    start = time.perf_counter()
+    *_, curr_score, min_score, iters = func(df, 'Id', events, ['State'], pools,
+                                            external='Ext', max_iters=max_iters,
+                                            tolerance=tolerance, return_scores=True,
+                                            return_iters=True, init=init)
+    elapsed = time.perf_counter() - start
+    return iters, curr_score - min_score, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entrants', type=int, default=40)
+    parser.add_argument('--problems', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=10.0)
+    parser.add_argument('--seed-tolerance', type=float, default=25.0)
+    parser.add_argument('--max-iters', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    for name, func, values, tolerance in [
+            ('assign_pools', assign_pools, False, args.tolerance),
+            ('assign_seed_pools', assign_seed_pools, True, args.seed_tolerance)]:
+        totals = {}
+        for k in range(args.problems):
+            df, events, pools = make_problem(args.entrants, seed=k, values=values)
+            for init in ['random', 'greedy']:
+                iters, excess, elapsed = run(func, df, events, pools, init, k,
+                                             args.max_iters, tolerance)
+                totals[init] = totals.get(init, 0) + iters
+                print(f'{name:<18}problem {k}  {init:<7}{iters:>6d} iters'
+                      f'  excess {excess:>7.2f}  {elapsed:>7.1f}s', flush=True)
+        saved = totals['random'] - totals['greedy']
+        print(f'{name:<18}greedy saved {saved} of {totals["random"]} iterations'
+              f' ({100 * saved / max(totals["random"], 1):.0f}%)\n')
+
+
+if __name__ == '__main__':
+    main()
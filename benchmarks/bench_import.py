@@ -0,0 +1,54 @@
+""" Measure import times of the curlybrackets package and its subpackages
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+and the cumulative import time reported for the module is collected over
+several runs. Run from the repository root:
+
+    python -m benchmarks.bench_import [module ...] [--runs N]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+DEFAULT_MODULES = [
+    'curlybrackets',
+    'curlybrackets.utilities',
+    'curlybrackets.pdf',
+    'curlybrackets.assignment',
+    'curlybrackets.api',
+    'curlybrackets.pdf.creator',
+]
+
+
+def import_time(module):
+    """ Import a module in a fresh interpreter and return its cumulative
+        import time in microseconds
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime',
+                           '-c', f'import {module}'],
+                          capture_output=True, text=True, check=True)
+    for line in reversed(proc.stderr.splitlines()):
+        # Lines are formatted as "import time: self | cumulative | name"
+        fields = [f.strip() for f in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise RuntimeError(f'No import time reported for {module}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f'{"module":<32}{"median (ms)":>14}{"min (ms)":>12}')
+    for module in args.modules:
+        times = [import_time(module) / 1000 for _ in range(args.runs)]
+        print(f'{module:<32}{statistics.median(times):>14.2f}'
+              f'{min(times):>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
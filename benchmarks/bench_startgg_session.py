@@ -0,0 +1,60 @@
+""" Compare GraphQL query throughput with a fresh connection per request
+    against GQLClient's pooled keep-alive session, using a local stub server
+
+    python -m benchmarks.bench_startgg_session [--queries N]
+
+The stub server speaks plain HTTP, so the measured savings only cover the
+TCP handshake; against the real start.gg API each new connection also
+pays for a TLS handshake.
+"""
+import argparse
+import time
+
+import requests
+
+from curlybrackets.api.startgg import GQLClient
+from curlybrackets.testing.stub_server import StubServer
+
+
+QUERY = 'query Sets($page: Int) { event { sets(page: $page) { nodes { id } } } }'
+
+
+def handler(method, path, body):
+    page = body['variables']['page']
+    nodes = [{'id': page * 50 + i} for i in range(50)]
+    return 200, {'data': {'event': {'sets': {'nodes': nodes}}}}
+
+
+def bench_unpooled(url, n):
+    start = time.perf_counter()
+    for i in range(n):
+        response = requests.post(url, json={'query': QUERY,
+                                            'variables': {'page': i}})
+        response.raise_for_status()
+        response.json()
+    return time.perf_counter() - start
+
+
+def bench_pooled(url, n):
+    start = time.perf_counter()
+    with GQLClient(url) as client:
+        for i in range(n):
+            client.execute(QUERY, {'page': i})
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    for name, bench in [('requests.post', bench_unpooled),
+                        ('GQLClient session', bench_pooled)]:
+        with StubServer(handler) as stub:
+            elapsed = bench(stub.url, args.queries)
+        print(f'{name:<20}{elapsed:>8.3f}s  {stub.connections:>5d} connections'
+              f'  {1000 * elapsed / args.queries:>7.3f}ms/query')
+
+
+if __name__ == '__main__':
+    main()
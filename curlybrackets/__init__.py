@@ -1,2 +1,15 @@
 __version__ = "0.4.2"
 __author__ = "margotphoenix"
+
+_submodules = ['api', 'assignment', 'macros', 'pandas', 'pdf', 'testing', 'utilities']
+
+
+def __getattr__(name):
+    if name not in _submodules:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from importlib import import_module
+    return import_module(f'{__name__}.{name}')
+
+
+def __dir__():
+    return sorted(list(globals()) + _submodules)
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Union
+
+
+class ResponseCache(object):
+
+    def __init__(self, path: Union[str, os.PathLike] = ':memory:',
+                 ttl: Optional[Union[int, float]] = 3600,
+                 max_size: Optional[int] = 64 * 1024 * 1024):
+        """ Persistent cache of API query results, stored in a SQLite
+            database so that it is kept between sessions and can be shared
+            by several clients and threads
+
+        Parameters
+        ----------
+        path : Union[str, os.PathLike], optional
+            Path of the SQLite database file, created if it does not exist,
+            default is ':memory:' (not persisted)
+        ttl : Optional[Union[int, float]], optional
+            Time, in seconds, for which a cached result is valid,
+            default is 3600 (one hour), None never expires results
+        max_size : Optional[int], optional
+            Maximum total size, in bytes, of the cached results, the least
+            recently used results are evicted once it is exceeded,
+            default is 64 MiB, None does not limit the size
+
+        Attributes
+        ----------
+        hits : int
+            Number of lookups answered from the cache
+        misses : int
+            Number of lookups not found in the cache or expired
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'size INTEGER NOT NULL, created REAL NOT NULL, '
+            'accessed REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed '
+                           'ON responses (accessed)')
+        # Running total size of the results, kept by triggers so that it
+        # stays right for every connection sharing the database
+        self._conn.executescript('''
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS responses_size (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                total INTEGER NOT NULL);
+            INSERT OR IGNORE INTO responses_size
+                SELECT 0, COALESCE(SUM(size), 0) FROM responses;
+            CREATE TRIGGER IF NOT EXISTS responses_insert
+                AFTER INSERT ON responses BEGIN
+                UPDATE responses_size SET total = total + new.size; END;
+            CREATE TRIGGER IF NOT EXISTS responses_delete
+                AFTER DELETE ON responses BEGIN
+                UPDATE responses_size SET total = total - old.size; END;
+            CREATE TRIGGER IF NOT EXISTS responses_update
+                AFTER UPDATE OF size ON responses BEGIN
+                UPDATE responses_size SET total = total - old.size + new.size;
+                END;
+            COMMIT;
+        ''')
+
+    @staticmethod
+    def make_key(url: str, query: str, variables: Optional[dict] = None,
+                 auth: Optional[str] = None) -> str:
+        """ Hash a query, its variables and the hash of the Authorization
+            header it is sent with (if any) into a cache key, so that
+            clients with different tokens do not share results
+        """
+        if auth is not None:
+            auth = hashlib.sha256(auth.encode('utf-8')).hexdigest()
+        text = json.dumps([url, query, variables, auth], sort_keys=True,
+                          separators=(',', ':'), default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key: str):
+        """ Return the cached result for the key, or None if it is missing
+            or has expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None \
+                    and now - row[1] > self.ttl:
+                self._conn.execute('DELETE FROM responses WHERE key = ?',
+                                   (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE responses SET accessed = ? '
+                               'WHERE key = ?', (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value):
+        """ Store a JSON-serializable result in the cache """
+        text = json.dumps(value, separators=(',', ':'))
+        size = len(text.encode('utf-8'))
+        if self.max_size is not None and size > self.max_size:
+            return
+        now = time.time()
+        with self._lock:
+            # An upsert rather than INSERT OR REPLACE, whose implicit
+            # delete would not fire the size trigger
+            self._conn.execute(
+                'INSERT INTO responses (key, value, size, created, accessed) '
+                'VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET '
+                'value = excluded.value, size = excluded.size, '
+                'created = excluded.created, accessed = excluded.accessed',
+                (key, text, size, now, now)
+            )
+            if self.max_size is not None:
+                self._evict()
+
+    def _total_size(self) -> int:
+        return self._conn.execute(
+            'SELECT total FROM responses_size'
+        ).fetchone()[0]
+
+    def _evict(self):
+        if self._total_size() <= self.max_size:
+            return
+        # Expired results go first, then the least recently used
+        if self.ttl is not None:
+            self._conn.execute('DELETE FROM responses WHERE created < ?',
+                               (time.time() - self.ttl,))
+        total = self._total_size()
+        if total <= self.max_size:
+            return
+        evict = []
+        for key, size in self._conn.execute(
+                'SELECT key, size FROM responses ORDER BY accessed'):
+            evict.append((key,))
+            total -= size
+            if total <= self.max_size:
+                break
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', evict)
+
+    def clear(self):
+        """ Remove every cached result """
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM responses'
+            ).fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
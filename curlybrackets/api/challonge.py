@@ -1,6 +1,11 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from dateutil import parser
 
 import challonge
+import requests
+from requests.adapters import HTTPAdapter
 
 from ..utilities import seed_order
 
@@ -18,6 +23,110 @@ NEW_TOURNAMENT_DEFAULTS = {'tournament_type': 'double elimination',
 
 set_credentials = challonge.set_credentials
 
+# Number of concurrent requests used for bulk match updates
+MAX_WORKERS = 8
+
+API_URL = 'https://api.challonge.com/v1'
+USER_AGENT = 'curlybrackets'
+
+_api_url = None
+_session = None
+_session_lock = threading.Lock()
+
+
+def set_api_url(url):
+    """ Send bulk requests to a different Challonge API root URL, e.g. a
+        local test server, None restores the default
+    """
+    global _api_url
+    _api_url = url
+
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS,
+                                  pool_maxsize=MAX_WORKERS)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+
+def close_session():
+    """ Close the pooled session used for bulk requests, releasing its
+        connections, a new one is opened by the next bulk request
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _prepare_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, bool):
+        # Challonge only accepts lowercase true/false
+        return str(value).lower()
+    return value
+
+
+def _prepare_params(params, prefix=None):
+    # Flatten keyword parameters into Challonge's form fields, e.g.
+    # match[winner_id], with a 'participants[]' prefix taking lists of values
+    # and sending participants[][name], participants[][seed], ... per item
+    if prefix and prefix.endswith('[]'):
+        lists = [k for k, v in params.items() if isinstance(v, (list, tuple))]
+        items = [(k, v) for values in zip(*(params[k] for k in lists))
+                 for k, v in zip(lists, values)]
+        items += [(k, v) for k, v in params.items() if k not in lists]
+    else:
+        items = params.items()
+
+    fields = []
+    for k, v in items:
+        key = '{}[{}]'.format(prefix, k) if prefix else k
+        if isinstance(v, (list, tuple)):
+            fields.extend((key + '[]', _prepare_value(x)) for x in v)
+        else:
+            fields.append((key, _prepare_value(v)))
+    return fields
+
+
+def _parse(data):
+    # Unwrap Challonge's {'tournament': {...}} style objects, in lists too
+    if not data:
+        return []
+    if isinstance(data, list):
+        return [_parse(d) for d in data]
+    return {k: v for obj in data.values() for k, v in obj.items()}
+
+
+def _fetch(method, uri, params_prefix=None, **params):
+    """ Request a Challonge API endpoint over a pooled keep-alive session
+        that can be shared by worker threads, returning the unwrapped
+        objects of the response (fields are left as sent, unlike
+        challonge.api.fetch_and_parse, which also converts dates and
+        numbers)
+    """
+    params = _prepare_params(params, params_prefix)
+    r_data = {'data': params} if method in ('POST', 'PUT') else {'params': params}
+    credentials = challonge.api.get_credentials()
+    response = _get_session().request(
+        method, '{}/{}.json'.format(_api_url or API_URL, uri),
+        headers={'User-Agent': USER_AGENT},
+        auth=credentials if credentials[0] is not None else None, **r_data
+    )
+    if response.status_code == 422:
+        doc = response.json()
+        if doc.get('errors'):
+            raise challonge.api.ChallongeException(*doc['errors'])
+    response.raise_for_status()
+    return _parse(response.json())
+
 
 def make_challonge(players, name, url, start=True, miscs=None, destroy_if_existing=True, **kwargs):
     kwargs = {**NEW_TOURNAMENT_DEFAULTS, **kwargs}
@@ -85,27 +194,38 @@ def update_time(tid, start_at):
     challonge.tournaments.start(tid)
 
 
-def free_advance(tid):
-    t = challonge.tournaments.show(tid)
+def free_advance(tid, max_workers=MAX_WORKERS):
+    t = _fetch('GET', 'tournaments/{}'.format(tid))
+    tid = t['id']
 
     if t['state'] == 'pending':
-        challonge.tournaments.start(t['id'])
-
-    autocount = 1
-    while autocount > 0:
-        autocount = 0
-        ms = challonge.matches.index(t['id'])
-        for m in ms:
-            if m['state'] != 'open':
-                continue
-            p1 = challonge.participants.show(t['id'], m['player1_id'])
-            p2 = challonge.participants.show(t['id'], m['player2_id'])
-            if p2['name'].startswith('[[Bye '):
-                challonge.matches.update(t['id'], m['id'], winner_id=p1['id'], scores_csv="1-0")
-                autocount += 1
-            elif p1['name'].startswith('[[Bye '):
-                challonge.matches.update(t['id'], m['id'], winner_id=p2['id'], scores_csv="0-1")
-                autocount += 1
+        _fetch('POST', 'tournaments/{}/start'.format(tid))
+
+    # Participants don't change while advancing, so look up byes locally
+    # instead of fetching both players of every open match
+    ps = _fetch('GET', 'tournaments/{}/participants'.format(tid))
+    byes = {p['id'] for p in ps if p['name'].startswith('[[Bye ')}
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        while True:
+            updates = []
+            for m in _fetch('GET', 'tournaments/{}/matches'.format(tid),
+                            state='open'):
+                if m['state'] != 'open':
+                    continue
+                if m['player2_id'] in byes:
+                    updates.append((m['id'], m['player1_id'], '1-0'))
+                elif m['player1_id'] in byes:
+                    updates.append((m['id'], m['player2_id'], '0-1'))
+            if not updates:
+                break
+            # Open matches are independent of each other, so a whole round
+            # of advancements can be reported at once
+            list(executor.map(
+                lambda u: _fetch('PUT', 'tournaments/{}/matches/{}'.format(tid, u[0]),
+                                 'match', winner_id=u[1], scores_csv=u[2]),
+                updates
+            ))
 
 
 def get_participant_list(tid, misc=False):
@@ -139,35 +259,41 @@ def get_participant_count(tid):
 
 
 def expand_bracket(tid, bye_char='X'):
-    t = challonge.tournaments.show(tid)
+    t = _fetch('GET', 'tournaments/{}'.format(tid))
+    tid = t['id']
     started = (t['state'] == 'underway')
     if started:
-        challonge.tournaments.reset(t['id'])
+        _fetch('POST', 'tournaments/{}/reset'.format(tid))
 
     n = t['participants_count']
     order = seed_order(n)
     m = len(order)
 
+    bye_names = []
+    bye_seeds = []
     if m > n:
         if t['sequential_pairings']:
             raise ValueError('Number of players must be a power of 2 in order to use sequential pairings')
         else:
             for j in range(m-n):
-                bye_name = '[[Bye ' + bye_char + str(j+1) + ']]'
-                bye_seed = n+j+1
-                challonge.participants.create(t['id'], name=bye_name, seed=bye_seed)
+                bye_names.append('[[Bye ' + bye_char + str(j+1) + ']]')
+                bye_seeds.append(n+j+1)
 
     for i in range(m):
         if t['sequential_pairings']:
-            bye_name = '[[Bye ' + bye_char + str(m+1-order[i]) + ']]'
-            bye_seed = 2*(i+1)
+            bye_names.append('[[Bye ' + bye_char + str(m+1-order[i]) + ']]')
+            bye_seeds.append(2*(i+1))
         else:
-            bye_name = '[[Bye ' + bye_char + str(m-n+i+1) + ']]'
-            bye_seed = m+i+1
-        challonge.participants.create(t['id'], name=bye_name, seed=bye_seed)
+            bye_names.append('[[Bye ' + bye_char + str(m-n+i+1) + ']]')
+            bye_seeds.append(m+i+1)
+
+    # Participants are added in order, exactly as if created one at a time,
+    # but in a single request
+    _fetch('POST', 'tournaments/{}/participants/bulk_add'.format(tid),
+           'participants[]', name=bye_names, seed=bye_seeds)
 
     if started:
-        challonge.tournaments.start(t['id'])
+        _fetch('POST', 'tournaments/{}/start'.format(tid))
 
 
 def advancement_bracket_setup(tid, max_winners_round=1, max_losers_round=0):
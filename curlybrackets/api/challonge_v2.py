@@ -0,0 +1,491 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..utilities import seed_order
+from .ratelimit import (TokenBucket, RateLimitMetrics,
+                        backoff_delay, parse_retry_after)
+
+
+NEW_TOURNAMENT_DEFAULTS = {'tournament_type': 'double elimination',
+                           'registration_options': {'open_signup': False},
+                           'seeding_options': {'sequential_pairings': True,
+                                               'hide_seeds': True},
+                           'match_options': {'accept_attachments': True},
+                           'notifications': {'upon_matches_open': False,
+                                             'upon_tournament_ends': False},
+                           'quick_advance': True}
+
+# Number of concurrent requests used for bulk operations
+MAX_WORKERS = 8
+
+
+class ChallongeError(Exception):
+    """ Special error type for Challonge API error responses """
+    pass
+
+
+class ChallongeClient(object):
+
+    API_URL = 'https://api.challonge.com/v2.1'
+
+    def __init__(self, api_key: Optional[str] = None,
+                 token: Optional[str] = None, url: Optional[str] = None,
+                 retries: int = 3, retry_wait_time: Union[int, float] = 1,
+                 pool_size: int = MAX_WORKERS,
+                 timeout: Union[int, float, tuple, None] = 30,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 max_retry_wait_time: Union[int, float] = 60):
+        """ Create object for interfacing with the Challonge v2 (JSON:API)
+            API, safe to share between threads
+
+        Parameters
+        ----------
+        api_key : Optional[str], optional
+            Challonge v1 API key, default is None
+        token : Optional[str], optional
+            OAuth access token, used instead of the API key if given,
+            default is None
+        url : Optional[str], optional
+            Root URL of the API, default is the Challonge v2.1 API
+        retries : int, optional
+            Number of times to re-attempt a request that responded with a
+            429, 503 or 504 error before raising an exception, default is 3
+        retry_wait_time : Union[int, float], optional
+            Amount of time, in seconds, to wait before the first
+            re-attempt, doubled (with jitter) for each further re-attempt,
+            a Retry-After header takes precedence if it asks for a longer
+            wait, default is 1
+        pool_size : int, optional
+            Maximum number of connections kept alive in the session's
+            connection pool, default is MAX_WORKERS
+        timeout : Union[int, float, tuple, None], optional
+            Timeout in seconds for each request, default is 30
+        rate_limiter : Optional[TokenBucket], optional
+            Token bucket limiting how often requests are sent,
+            default is None (no client-side limit)
+        max_retry_wait_time : Union[int, float], optional
+            Upper limit, in seconds, of the exponential wait time between
+            re-attempts, default is 60
+        """
+        self.url = self.API_URL if url is None else url
+        self.retries = retries
+        self.retry_wait_time = retry_wait_time
+        self.max_retry_wait_time = max_retry_wait_time
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        if rate_limiter is not None:
+            self.metrics = rate_limiter.metrics
+        else:
+            self.metrics = RateLimitMetrics()
+
+        self.headers = {'Content-Type': 'application/vnd.api+json',
+                        'Accept': 'application/json'}
+        if token is not None:
+            self.headers['Authorization-Type'] = 'v2'
+            self.headers['Authorization'] = 'Bearer {}'.format(token)
+        elif api_key is not None:
+            self.headers['Authorization-Type'] = 'v1'
+            self.headers['Authorization'] = api_key
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        """ Close the client's session and its pooled connections """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def request(self, method: str, path: str, attributes: Optional[dict] = None,
+                type: Optional[str] = None,
+                params: Optional[dict] = None) -> Optional[dict]:
+        """ Send a request to the API, re-attempting after rate limit and
+            unavailability errors
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+        path : str
+            Path of the endpoint relative to the API root, without the
+            '.json' extension (e.g. 'tournaments/my_url')
+        attributes : Optional[dict], optional
+            Attributes of the JSON:API resource sent as the request body,
+            default is None (no body)
+        type : Optional[str], optional
+            JSON:API type of the resource sent, default is None
+        params : Optional[dict], optional
+            Query string parameters, default is None
+
+        Returns
+        -------
+        Optional[dict]
+            Decoded JSON response, or None for an empty response
+
+        Raises
+        ------
+        ChallongeError
+            Exception if the API responds with a list of errors
+        """
+        json = None
+        if attributes is not None:
+            json = {'data': {'type': type, 'attributes': attributes}}
+        url = '{}/{}.json'.format(self.url, path)
+
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            response = self.session.request(method, url, json=json,
+                                            params=params,
+                                            headers=self.headers,
+                                            timeout=self.timeout)
+            if (response.status_code in [requests.codes.UNAVAILABLE,
+                                         requests.codes.TOO_MANY,
+                                         requests.codes.GATEWAY_TIMEOUT]
+                    and attempt < self.retries):
+                time.sleep(self._retry_delay(response, attempt))
+                attempt += 1
+                continue
+            break
+
+        if response.status_code in [requests.codes.BAD_REQUEST,
+                                    requests.codes.NOT_FOUND,
+                                    requests.codes.UNPROCESSABLE]:
+            try:
+                errors = response.json().get('errors')
+            except ValueError:
+                errors = None
+            if errors:
+                raise ChallongeError('; '.join(_error_message(e)
+                                               for e in errors))
+        response.raise_for_status()
+        if not response.content:
+            return None
+        return response.json()
+
+    def _retry_delay(self, response: requests.Response, attempt: int) -> float:
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        delay = backoff_delay(attempt, self.retry_wait_time,
+                              self.max_retry_wait_time, retry_after)
+        throttled = (response.status_code == requests.codes.TOO_MANY)
+        if throttled and self.rate_limiter is not None:
+            self.rate_limiter.pause(delay)
+        self.metrics.record_retry(delay, throttled)
+        return delay
+
+    def paginate(self, path: str, params: Optional[dict] = None,
+                 per_page: int = 100) -> Iterator[dict]:
+        """ Lazily iterate over every resource of a paginated endpoint,
+            flattened by flatten_resource
+
+        Parameters
+        ----------
+        path : str
+            Path of the endpoint relative to the API root
+        params : Optional[dict], optional
+            Other query string parameters, default is None
+        per_page : int, optional
+            Number of resources requested per page, default is 100
+
+        Yields
+        ------
+        dict
+            Flattened resources, in order
+        """
+        params = {} if params is None else dict(params)
+        page = 1
+        while True:
+            result = self.request('GET', path, params={**params, 'page': page,
+                                                       'per_page': per_page})
+            data = result.get('data') or []
+            for resource in data:
+                yield flatten_resource(resource)
+            links = result.get('links') or {}
+            if len(data) < per_page or ('next' in links and not links['next']):
+                break
+            page += 1
+
+    def tournament(self, tid: Union[int, str]) -> dict:
+        return flatten_resource(
+            self.request('GET', 'tournaments/{}'.format(tid))['data']
+        )
+
+    def create_tournament(self, name: str, url: str, **attributes) -> dict:
+        return flatten_resource(self.request(
+            'POST', 'tournaments',
+            {'name': name, 'url': url, **attributes}, 'Tournaments'
+        )['data'])
+
+    def update_tournament(self, tid: Union[int, str], **attributes) -> dict:
+        return flatten_resource(self.request(
+            'PUT', 'tournaments/{}'.format(tid), attributes, 'Tournaments'
+        )['data'])
+
+    def destroy_tournament(self, tid: Union[int, str]):
+        self.request('DELETE', 'tournaments/{}'.format(tid))
+
+    def change_state(self, tid: Union[int, str], state: str) -> dict:
+        """ Change a tournament's state, where state is one of 'start',
+            'reset', 'finalize', 'process_checkin' or 'abort_checkin'
+        """
+        return flatten_resource(self.request(
+            'PUT', 'tournaments/{}/change_state'.format(tid),
+            {'state': state}, 'TournamentState'
+        )['data'])
+
+    def tournaments(self, **params) -> Iterator[dict]:
+        return self.paginate('tournaments', params)
+
+    def participants(self, tid: Union[int, str]) -> Iterator[dict]:
+        return self.paginate('tournaments/{}/participants'.format(tid))
+
+    def matches(self, tid: Union[int, str],
+                state: Optional[str] = None) -> Iterator[dict]:
+        params = None if state is None else {'state': state}
+        return self.paginate('tournaments/{}/matches'.format(tid), params)
+
+    def bulk_add_participants(self, tid: Union[int, str],
+                              participants: Sequence[dict],
+                              chunk_size: int = 100) -> List[dict]:
+        """ Add participants to a tournament in as few requests as
+            possible, in order
+
+        Parameters
+        ----------
+        tid : Union[int, str]
+            Tournament id or URL
+        participants : Sequence[dict]
+            Attributes of each participant (name, seed, misc, etc.)
+        chunk_size : int, optional
+            Maximum number of participants added per request,
+            default is 100
+
+        Returns
+        -------
+        List[dict]
+            Flattened participants created
+        """
+        created = []
+        for i in range(0, len(participants), chunk_size):
+            result = self.request(
+                'POST', 'tournaments/{}/participants/bulk_add'.format(tid),
+                {'participants': list(participants[i:i+chunk_size])},
+                'Participants'
+            )
+            created.extend(flatten_resource(p)
+                           for p in (result or {}).get('data') or [])
+        return created
+
+    def clear_participants(self, tid: Union[int, str]):
+        self.request('DELETE', 'tournaments/{}/participants/clear'.format(tid))
+
+    def report_winner(self, tid: Union[int, str], match_id: Union[int, str],
+                      winner_id: Union[int, str], loser_id: Union[int, str],
+                      scores: Tuple[str, str] = ('1', '0')) -> dict:
+        """ Report the winner of a match, with the winner's and loser's
+            scores
+        """
+        return flatten_resource(self.request(
+            'PUT', 'tournaments/{}/matches/{}'.format(tid, match_id),
+            {'match': [{'participant_id': str(winner_id),
+                        'score_set': scores[0], 'advancing': True},
+                       {'participant_id': str(loser_id),
+                        'score_set': scores[1], 'advancing': False}]},
+            'Match'
+        )['data'])
+
+
+def flatten_resource(resource: dict) -> dict:
+    """ Flatten a JSON:API resource into a dictionary of its id and
+        attributes, with each to-one relationship as a '<name>_id' entry
+    """
+    flat = {'id': resource.get('id'), **(resource.get('attributes') or {})}
+    for name, rel in (resource.get('relationships') or {}).items():
+        data = rel.get('data') if isinstance(rel, dict) else None
+        if isinstance(data, dict):
+            flat[name+'_id'] = data.get('id')
+    return flat
+
+
+def _error_message(error: dict) -> str:
+    detail = error.get('detail') or error.get('title') or str(error)
+    pointer = (error.get('source') or {}).get('pointer')
+    return '{} ({})'.format(detail, pointer) if pointer else detail
+
+
+def _sequential_pairings(t: dict) -> bool:
+    return bool((t.get('seeding_options') or {}).get('sequential_pairings',
+                                                     t.get('sequential_pairings')))
+
+
+def _with_defaults(attributes: dict) -> dict:
+    # Option groups (e.g. seeding_options) are merged key by key, so that
+    # setting one option keeps the defaults of the others
+    merged = {**NEW_TOURNAMENT_DEFAULTS, **attributes}
+    for k, v in NEW_TOURNAMENT_DEFAULTS.items():
+        if isinstance(v, dict) and isinstance(attributes.get(k), dict):
+            merged[k] = {**v, **attributes[k]}
+    return merged
+
+
+def make_challonge(client: ChallongeClient, players: Sequence[str], name: str,
+                   url: str, start: bool = True,
+                   miscs: Optional[Sequence[str]] = None,
+                   destroy_if_existing: bool = True, **kwargs):
+    kwargs = _with_defaults(kwargs)
+
+    if miscs is not None and len(miscs) != len(players):
+        raise ValueError('Miscelaneous list must be same length as player name list')
+
+    try:
+        t = client.create_tournament(name, url, **kwargs)
+    except ChallongeError:
+        if 'subdomain' in kwargs:
+            urlfmt = kwargs['subdomain']+'-'+url
+        else:
+            urlfmt = url
+        if destroy_if_existing:
+            client.destroy_tournament(urlfmt)
+            t = client.create_tournament(name, url, **kwargs)
+        else:
+            t = client.tournament(urlfmt)
+            if t['state'] != 'pending':
+                client.change_state(t['id'], 'reset')
+            client.clear_participants(t['id'])
+            t = client.update_tournament(t['id'], name=name, **kwargs)
+
+    order = seed_order(len(players))
+    np = sum(map(lambda s: s != '', players))
+    sequential = _sequential_pairings(kwargs)
+    if sequential and len(order) > len(players):
+        raise ValueError('Number of players must be a power of 2 in order to use sequential pairings')
+
+    bye_num = 0
+    participants = []
+    for i, player in enumerate(players):
+        if player == '':
+            if sequential:
+                bye_num = order[i]-np
+            else:
+                bye_num += 1
+            participant = {'name': '[[Bye '+str(bye_num)+']]'}
+        else:
+            participant = {'name': player}
+        if miscs:
+            participant['misc'] = miscs[i]
+        participants.append(participant)
+
+    client.bulk_add_participants(t['id'], participants)
+
+    if start:
+        client.change_state(t['id'], 'start')
+
+    return t['id']
+
+
+def make_challonges(client: ChallongeClient,
+                    brackets: Iterable[Tuple[Sequence[str], str, str]],
+                    max_workers: int = MAX_WORKERS, **kwargs) -> list:
+    """ Create many brackets concurrently, e.g. every pool of an event, from
+        (players, name, url) 3-tuples, returning their tournament ids in
+        order
+    """
+    with ThreadPoolExecutor(max_workers) as executor:
+        futures = [executor.submit(make_challonge, client, players, name,
+                                   url, **kwargs)
+                   for players, name, url in brackets]
+        return [f.result() for f in futures]
+
+
+def free_advance(client: ChallongeClient, tid: Union[int, str],
+                 max_workers: int = MAX_WORKERS):
+    t = client.tournament(tid)
+    tid = t['id']
+
+    if t['state'] == 'pending':
+        client.change_state(tid, 'start')
+
+    byes = {p['id'] for p in client.participants(tid)
+            if p['name'].startswith('[[Bye ')}
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        while True:
+            updates = []
+            for m in client.matches(tid, state='open'):
+                if m.get('state', 'open') != 'open':
+                    continue
+                p1, p2 = m.get('player1_id'), m.get('player2_id')
+                if p2 in byes:
+                    updates.append((m['id'], p1, p2))
+                elif p1 in byes:
+                    updates.append((m['id'], p2, p1))
+            if not updates:
+                break
+            list(executor.map(lambda u: client.report_winner(tid, *u),
+                              updates))
+
+
+def get_participant_list(client: ChallongeClient, tid: Union[int, str],
+                         misc: bool = False):
+    part_list = []
+    misc_list = []
+    for p in client.participants(tid):
+        if p['name'].startswith('[[Bye '):
+            part_list.append('')
+            misc_list.append('')
+        else:
+            part_list.append(p['name'])
+            misc_list.append(p.get('misc'))
+    if misc:
+        return part_list, misc_list
+    else:
+        return part_list
+
+
+def expand_bracket(client: ChallongeClient, tid: Union[int, str],
+                   bye_char: str = 'X'):
+    t = client.tournament(tid)
+    tid = t['id']
+    started = (t['state'] == 'underway')
+    if started:
+        client.change_state(tid, 'reset')
+
+    n = t.get('participants_count')
+    if n is None:
+        n = sum(1 for _ in client.participants(tid))
+    order = seed_order(n)
+    m = len(order)
+
+    byes = []
+    if m > n:
+        if _sequential_pairings(t):
+            raise ValueError('Number of players must be a power of 2 in order to use sequential pairings')
+        else:
+            for j in range(m-n):
+                byes.append({'name': '[[Bye ' + bye_char + str(j+1) + ']]',
+                             'seed': n+j+1})
+
+    for i in range(m):
+        if _sequential_pairings(t):
+            byes.append({'name': '[[Bye ' + bye_char + str(m+1-order[i]) + ']]',
+                         'seed': 2*(i+1)})
+        else:
+            byes.append({'name': '[[Bye ' + bye_char + str(m-n+i+1) + ']]',
+                         'seed': m+i+1})
+
+    client.bulk_add_participants(tid, byes)
+
+    if started:
+        client.change_state(tid, 'start')
@@ -0,0 +1,193 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Union
+
+
+class RateLimitMetrics(object):
+
+    def __init__(self):
+        """ Thread-safe counters describing how much a client was slowed
+            down by rate limiting
+
+        Attributes
+        ----------
+        waits : int
+            Number of requests that had to wait for the token bucket
+        wait_time : float
+            Total time, in seconds, spent waiting for the token bucket
+        retries : int
+            Number of requests re-attempted after a 503/429/504 response
+        throttled : int
+            Number of 429 (too many requests) responses received
+        throttled_time : float
+            Total time, in seconds, spent backing off before re-attempts
+        """
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_time = 0.0
+        self.retries = 0
+        self.throttled = 0
+        self.throttled_time = 0.0
+
+    def record_wait(self, delay: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_time += delay
+
+    def record_retry(self, delay: float, throttled: bool = False):
+        with self._lock:
+            self.retries += 1
+            self.throttled_time += delay
+            if throttled:
+                self.throttled += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {'waits': self.waits,
+                    'wait_time': self.wait_time,
+                    'retries': self.retries,
+                    'throttled': self.throttled,
+                    'throttled_time': self.throttled_time}
+
+    def __repr__(self):
+        return '{}({})'.format(
+            self.__class__.__name__,
+            ', '.join('{}={!r}'.format(*kv) for kv in self.as_dict().items())
+        )
+
+
+class TokenBucket(object):
+
+    def __init__(self, rate: Union[int, float], per: Union[int, float] = 1.0,
+                 capacity: Optional[Union[int, float]] = None):
+        """ Token bucket rate limiter that can be shared by any number of
+            threads and asyncio tasks
+
+        Tokens are reserved under a lock and the caller then sleeps outside
+        of it, so one waiting caller never blocks the others from reserving
+        their own place in line.
+
+        Parameters
+        ----------
+        rate : Union[int, float]
+            Number of requests allowed every `per` seconds
+        per : Union[int, float], optional
+            Length of the rate window in seconds, default is 1
+        capacity : Union[int, float], optional
+            Maximum burst size, default is `rate` (a full window's budget)
+        """
+        if rate <= 0 or per <= 0:
+            raise ValueError('Rate and period must be positive')
+        self.fill_rate = rate / per
+        self.capacity = rate if capacity is None else capacity
+        self.metrics = RateLimitMetrics()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity,
+                           self._tokens + elapsed * self.fill_rate)
+        self._updated = now
+
+    def reserve(self, tokens: Union[int, float] = 1) -> float:
+        """ Take tokens from the bucket, returning how long, in seconds, the
+            caller must wait before using them
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            delay = max(-self._tokens / self.fill_rate, 0.0)
+        if delay > 0:
+            self.metrics.record_wait(delay)
+        return delay
+
+    def acquire(self, tokens: Union[int, float] = 1):
+        """ Block the current thread until tokens are available """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: Union[int, float] = 1):
+        """ Wait in the current asyncio task until tokens are available """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """ Hold off every sharer of the bucket for at least the given time,
+            e.g. after the API asks clients to slow down
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.fill_rate)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """ Parse a Retry-After header value, given either in seconds or as an
+        HTTP date, into a number of seconds to wait
+
+    Parameters
+    ----------
+    value : Optional[str]
+        Retry-After header value, or None if the header was not sent
+
+    Returns
+    -------
+    Optional[float]
+        Seconds to wait, or None if the value is missing or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, base: Union[int, float],
+                  max_delay: Union[int, float] = 60.0,
+                  retry_after: Optional[float] = None,
+                  jitter: bool = True) -> float:
+    """ Compute how long to wait before re-attempting a request
+
+    Parameters
+    ----------
+    attempt : int
+        Number of attempts already retried, starting from 0
+    base : Union[int, float]
+        Wait time, in seconds, before the first re-attempt, doubled for
+        each subsequent re-attempt
+    max_delay : Union[int, float], optional
+        Upper limit, in seconds, of the exponential wait time, default is 60
+    retry_after : Optional[float], optional
+        Wait time requested by the server, which is always honoured as a
+        minimum, default is None
+    jitter : bool, optional
+        Whether to randomize the exponential wait time between half and all
+        of its value, so that clients do not retry in lockstep,
+        default is True
+
+    Returns
+    -------
+    float
+        Seconds to wait
+    """
+    delay = min(base * 2 ** attempt, max_delay)
+    if jitter:
+        delay = delay / 2 + random.uniform(0, delay / 2)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
@@ -0,0 +1,194 @@
+from typing import Mapping, Optional, Sequence, Union
+
+from numpy import array, full, nan
+from pandas import Series, DataFrame
+
+from .startgg import StartggClient
+
+
+PARTICIPANTS_QUERY = '''
+query TournamentParticipants($slug: String, $page: Int, $perPage: Int) {
+  tournament(slug: $slug) {
+    participants(query: {page: $page, perPage: $perPage}) {
+      pageInfo { totalPages }
+      nodes {
+        id
+        gamerTag
+        player { id }
+        user { location { city state country } }
+        entrants { id event { name } }
+      }
+    }
+  }
+}
+'''
+
+STANDINGS_QUERY = '''
+query EventStandings($slug: String, $page: Int, $perPage: Int) {
+  event(slug: $slug) {
+    standings(query: {page: $page, perPage: $perPage}) {
+      pageInfo { totalPages }
+      nodes {
+        placement
+        entrant { participants { player { id } } }
+      }
+    }
+  }
+}
+'''
+
+
+def load_registrations(client: StartggClient, tournament: str,
+                       events: Union[Sequence[str], Mapping[str, str],
+                                     None] = None,
+                       locations: Sequence[str] = ('country', 'state'),
+                       seed_values: Optional[Mapping[str, Mapping]] = None,
+                       xchar: str = 'xx', per_page: int = 100,
+                       prefetch: int = 0) -> DataFrame:
+    """ Load a start.gg tournament's registrations into the DataFrame layout
+        used by assign_pools and assign_seed_pools
+
+    Participants are read a page at a time and collected into flat arrays,
+    from which each column of the DataFrame is built at once. The resulting
+    DataFrame has a 'Participant' primary key column, 'Tag' and 'Player'
+    columns, a column per location field, and for every event a column set
+    to xchar for its registrants (to be assigned a pool) with a matching
+    '<event>.Entry' column of entrant ids, shared by the members of a team.
+
+    Parameters
+    ----------
+    client : StartggClient
+        Client used to query the start.gg API
+    tournament : str
+        Slug of the tournament (e.g. 'tournament/genesis-9')
+    events : Union[Sequence[str], Mapping[str, str], None], optional
+        Names of the events to include, or a mapping from event names to
+        the column names to use for them, default is None (every event,
+        under its own name)
+    locations : Sequence[str], optional
+        Fields of the participants' user locations to include as location
+        columns, named in title case, default is ('country', 'state')
+    seed_values : Optional[Mapping[str, Mapping]], optional
+        Seed values for some events, keyed by event column name, each a
+        mapping from start.gg player ids to positive values (higher is
+        better, see standing_values), added as '<event>.Value' columns,
+        default is None
+    xchar : str, optional
+        Placeholder marking a registrant awaiting pool assignment,
+        default is 'xx'
+    per_page : int, optional
+        Number of participants requested per page, default is 100
+    prefetch : int, optional
+        Number of upcoming pages to request concurrently, default is 0
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per participant, in start.gg order
+    """
+    if events is not None and not isinstance(events, Mapping):
+        events = {e: e for e in events}
+
+    participant_ids = []
+    tags = []
+    player_ids = []
+    location_values = {f: [] for f in locations}
+    # Registrations as flat (row, event, entrant) arrays
+    reg_rows = []
+    reg_events = []
+    reg_entrants = []
+
+    nodes = client.paginate(PARTICIPANTS_QUERY, {'slug': tournament},
+                            path='tournament.participants',
+                            per_page=per_page, prefetch=prefetch)
+    for i, node in enumerate(nodes):
+        participant_ids.append(node['id'])
+        tags.append(node['gamerTag'])
+        player_ids.append((node.get('player') or {}).get('id'))
+        location = (node.get('user') or {}).get('location') or {}
+        for f in locations:
+            location_values[f].append(location.get(f))
+        for entrant in node.get('entrants') or []:
+            name = entrant['event']['name']
+            if events is None:
+                column = name
+            elif name in events:
+                column = events[name]
+            else:
+                continue
+            reg_rows.append(i)
+            reg_events.append(column)
+            reg_entrants.append(entrant['id'])
+
+    n_rows = len(participant_ids)
+    reg_rows = array(reg_rows, dtype='int64')
+    reg_events = array(reg_events, dtype='O')
+    reg_entrants = array(reg_entrants, dtype='O')
+    player_ids = array(player_ids, dtype='O')
+
+    columns = {'Participant': array(participant_ids, dtype='O'),
+               'Tag': array(tags, dtype='O'),
+               'Player': player_ids}
+    for f in locations:
+        columns[f.title()] = array(location_values[f], dtype='O')
+
+    if events is None:
+        event_columns = list(dict.fromkeys(reg_events))
+    else:
+        event_columns = list(dict.fromkeys(events.values()))
+    for e in event_columns:
+        mask = reg_events == e
+        rows = reg_rows[mask]
+        assigned = full(n_rows, nan, dtype='O')
+        assigned[rows] = xchar
+        entries = full(n_rows, nan, dtype='O')
+        entries[rows] = reg_entrants[mask]
+        columns[e] = assigned
+        columns[e+'.Entry'] = entries
+        if seed_values and e in seed_values:
+            values = full(n_rows, nan)
+            values[rows] = Series(player_ids[rows]).map(
+                dict(seed_values[e])).astype('float64').values
+            columns[e+'.Value'] = values
+
+    return DataFrame(columns)
+
+
+def standing_values(client: StartggClient, event: str,
+                    per_page: int = 100, prefetch: int = 0) -> dict:
+    """ Convert the final standings of a prior start.gg event into seed
+        values for load_registrations
+
+    Every member of an entrant placing p gets the value (worst placement +
+    1 - p), so values are positive, higher is better and tied placements
+    share a value.
+
+    Parameters
+    ----------
+    client : StartggClient
+        Client used to query the start.gg API
+    event : str
+        Slug of the prior event (e.g. 'tournament/genesis-9/event/melee')
+    per_page : int, optional
+        Number of standings requested per page, default is 100
+    prefetch : int, optional
+        Number of upcoming pages to request concurrently, default is 0
+
+    Returns
+    -------
+    dict
+        Seed values keyed by start.gg player id
+    """
+    placements = {}
+    for node in client.paginate(STANDINGS_QUERY, {'slug': event},
+                                path='event.standings', per_page=per_page,
+                                prefetch=prefetch):
+        for participant in (node.get('entrant') or {}).get('participants') \
+                or []:
+            player = (participant.get('player') or {}).get('id')
+            if player is not None:
+                placements.setdefault(player, node['placement'])
+    if not placements:
+        return {}
+    worst = max(placements.values())
+    return {k: worst + 1 - p for k, p in placements.items()}
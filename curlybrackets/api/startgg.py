@@ -1,21 +1,42 @@
 
+import asyncio
+import re
 import time
-from typing import Union, Optional
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Sequence, Union, Optional
 
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 
+from .cache import ResponseCache
+from .ratelimit import (TokenBucket, RateLimitMetrics,
+                        backoff_delay, parse_retry_after)
+
 
 class GQLError(Exception):
     """ Special error type for GQL exceptions """
     pass
 
 
+# start.gg rejects queries that could return too many objects with an error
+# message about the query's complexity
+COMPLEXITY_ERROR = re.compile(r'complexity', re.IGNORECASE)
+
+MUTATION = re.compile(r'^\s*mutation\b')
+
+
 class GQLClient(object):
 
     def __init__(self, url: str, headers: Optional[dict] = None,
-                 retries: int = 0, retry_wait_time: Union[int, float] = 0):
+                 retries: int = 0, retry_wait_time: Union[int, float] = 0,
+                 pool_size: int = 10,
+                 timeout: Union[int, float, tuple, None] = None,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 max_retry_wait_time: Union[int, float] = 60,
+                 cache: Optional[ResponseCache] = None):
         """ Create object for interfacing with a GraphQL API
 
         Parameters
@@ -31,17 +52,64 @@ class GQLClient(object):
             default is 0 (no re-attempts)
         retry_wait_time : Union[int, float], optional
             Amount of time, in seconds, to wait after a 503 error response
-            prior to re-attempting, default is 0
+            prior to re-attempting, doubled (with jitter) for each further
+            re-attempt, a Retry-After header sent by the API takes precedence
+            if it asks for a longer wait, default is 0
+        pool_size : int, optional
+            Maximum number of connections kept alive in the session's
+            connection pool, should be at least the number of threads
+            sharing the client, default is 10
+        timeout : Union[int, float, tuple, None], optional
+            Timeout in seconds for each request, either a single value or a
+            (connect, read) 2-tuple, default is None (wait indefinitely)
+        rate_limiter : Optional[TokenBucket], optional
+            Token bucket limiting how often requests are sent, can be shared
+            with other clients, threads and asyncio tasks to enforce a
+            common request budget, default is None (no client-side limit)
+        max_retry_wait_time : Union[int, float], optional
+            Upper limit, in seconds, of the exponential wait time between
+            re-attempts, default is 60
+        cache : Optional[ResponseCache], optional
+            Cache storing the results of queries (not mutations), so that
+            repeating a query within the cache's time to live does not send
+            another request, default is None (no caching)
         """
         self.url = url
         self.headers = {} if headers is None else headers
         self.retries = retries
         self.retry_wait_time = retry_wait_time
+        self.max_retry_wait_time = max_retry_wait_time
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        if rate_limiter is not None:
+            self.metrics = rate_limiter.metrics
+        else:
+            self.metrics = RateLimitMetrics()
+
+        # Reuse connections across queries instead of paying for a new
+        # TCP and TLS handshake on every request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        """ Close the client's session and its pooled connections """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def execute(self, query: str,
                 variables: Optional[dict] = None,
                 retries: Optional[int] = None,
-                retry_wait_time: Union[int, float, None] = None) -> dict:
+                retry_wait_time: Union[int, float, None] = None,
+                use_cache: Optional[bool] = None) -> dict:
         """ Query a GraphQL API, optionally multiple times in the event of
             repeated 503 error responses, raise an exception if the response
             includes a GraphQL error, otherwise return the query result
@@ -61,6 +129,9 @@ class GQLClient(object):
             Amount of time, in seconds, to wait after a 503 error response
             prior to re-attempting, will use the client-specified wait time
             if not included
+        use_cache : Optional[bool], optional
+            Whether to look up and store the result in the client's cache,
+            default is None (use the cache for queries but not mutations)
 
         Returns
         -------
@@ -75,27 +146,141 @@ class GQLClient(object):
         retries = retries or self.retries
         retry_wait_time = retry_wait_time or self.retry_wait_time
 
-        json = {'query': query}
-        if variables is not None:
-            json['variables'] = variables
+        cache_key = self._cache_key(query, variables, use_cache)
+        if cache_key is not None:
+            data = self.cache.get(cache_key)
+            if data is not None:
+                return data
+
+        json = self._payload(query, variables)
 
         attempt = 0
         while True:
-            response = requests.post(self.url, json=json, headers=self.headers)
-            if (response.status_code in [requests.codes.UNAVAILABLE, 
-                                         requests.codes.TOO_MANY, 
-                                         requests.codes.GATEWAY_TIMEOUT]
-                and attempt < retries):
-                # If response is a 503 error and there are
-                # retries remaining
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            response = self._post(json)
+            if self._should_retry(response, attempt, retries):
+                time.sleep(self._retry_delay(response, attempt,
+                                             retry_wait_time))
                 attempt += 1
-                time.sleep(retry_wait_time)
                 continue
-            else:
-                # Otherwise raise error for a bad response (or proceed if ok)
-                response.raise_for_status()
             break
 
+        return self._store(cache_key, self._result(response))
+
+    def execute_batched(self, selection: str, variables: Sequence[dict],
+                        variable_types: dict, batch_size: int = 20,
+                        **kwargs) -> List[dict]:
+        """ Run the same query selection for many sets of variables, merging
+            up to batch_size of them into each request as aliased fields
+
+        If the API rejects a request for being too complex, the batch size is
+        halved and the remaining items are re-attempted.
+
+        Example: fetching the seeds of many phase groups
+
+        >>> client.execute_batched(
+        ...     'phaseGroup(id: $id) { seeds(query: {page: 1, perPage: 64}) '
+        ...     '{ nodes { seedNum entrant { name } } } }',
+        ...     [{'id': pg} for pg in phase_group_ids], {'id': 'ID'})
+
+        Parameters
+        ----------
+        selection : str
+            Top-level field selection for a single item, referring to its
+            variables as usual (e.g. 'phaseGroup(id: $id) { ... }')
+        variables : Sequence[dict]
+            Dictionaries of variables, one for each item
+        variable_types : dict
+            GraphQL types of the selection's variables (e.g. {'id': 'ID'})
+        batch_size : int, optional
+            Maximum number of items merged into a single request,
+            default is 20
+        **kwargs
+            Other keyword arguments passed on to execute
+
+        Returns
+        -------
+        List[dict]
+            Result of the selection's field for each item, in order
+
+        Raises
+        ------
+        GQLError
+            Exception if a response includes a GraphQL error message other
+            than a complexity error, or a complexity error for a single item
+        """
+        results = []
+        start = 0
+        while start < len(variables):
+            items = variables[start:start+batch_size]
+            query, batch_variables = batch_query(selection, items,
+                                                 variable_types)
+            try:
+                data = self.execute(query, batch_variables, **kwargs)
+            except GQLError as e:
+                if batch_size == 1 or not COMPLEXITY_ERROR.search(str(e)):
+                    raise
+                batch_size = max(batch_size // 2, 1)
+                continue
+            results.extend(split_batch_result(data, len(items)))
+            start += len(items)
+        return results
+
+    def _retry_delay(self, response: requests.Response, attempt: int,
+                     retry_wait_time: Union[int, float]) -> float:
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        delay = backoff_delay(attempt, retry_wait_time,
+                              self.max_retry_wait_time, retry_after)
+        throttled = (response.status_code == requests.codes.TOO_MANY)
+        if throttled and self.rate_limiter is not None:
+            # Hold off everyone sharing the limiter, not just this request
+            self.rate_limiter.pause(delay)
+        self.metrics.record_retry(delay, throttled)
+        return delay
+
+    def _cache_key(self, query: str, variables: Optional[dict],
+                   use_cache: Optional[bool]) -> Optional[str]:
+        if self.cache is None:
+            return None
+        if use_cache is None:
+            use_cache = not MUTATION.match(query)
+        if not use_cache:
+            return None
+        return self.cache.make_key(self.url, query, variables,
+                                   self.headers.get('Authorization'))
+
+    def _store(self, cache_key: Optional[str], data: dict) -> dict:
+        if cache_key is not None:
+            self.cache.set(cache_key, data)
+        return data
+
+    @staticmethod
+    def _payload(query: str, variables: Optional[dict] = None) -> dict:
+        json = {'query': query}
+        if variables is not None:
+            json['variables'] = variables
+        return json
+
+    def _post(self, json: dict) -> requests.Response:
+        return self.session.post(self.url, json=json, headers=self.headers,
+                                 timeout=self.timeout)
+
+    @staticmethod
+    def _should_retry(response: requests.Response, attempt: int,
+                      retries: int) -> bool:
+        # Retry if response is a 503 (or 429/504) error and there are
+        # retries remaining
+        return (response.status_code in [requests.codes.UNAVAILABLE,
+                                         requests.codes.TOO_MANY,
+                                         requests.codes.GATEWAY_TIMEOUT]
+                and attempt < retries)
+
+    @staticmethod
+    def _result(response: requests.Response) -> dict:
+        # Raise error for a bad response (or proceed if ok)
+        response.raise_for_status()
+
         result = response.json()
 
         if 'errors' in result:
@@ -111,12 +296,499 @@ class GQLClient(object):
         return result['data']
 
 
+BATCH_ALIAS = 'b'
+
+
+def batch_query(selection: str, variables: Sequence[dict],
+                variable_types: dict, name: str = 'Batch') -> tuple:
+    """ Merge copies of a field selection into a single GraphQL query, one
+        aliased copy per set of variables with the variables renamed apart
+
+    Parameters
+    ----------
+    selection : str
+        Top-level field selection for a single item
+    variables : Sequence[dict]
+        Dictionaries of variables, one for each item
+    variable_types : dict
+        GraphQL types of the selection's variables
+    name : str, optional
+        Operation name of the merged query, default is 'Batch'
+
+    Returns
+    -------
+    tuple
+        2-tuple of the merged query string and its variables dictionary
+    """
+    pattern = re.compile(r'\$({})\b'.format('|'.join(map(re.escape,
+                                                          variable_types))))
+    definitions = []
+    fields = []
+    batch_variables = {}
+    for i, item in enumerate(variables):
+        for k in variable_types:
+            definitions.append('${}_{}: {}'.format(k, i, variable_types[k]))
+            batch_variables['{}_{}'.format(k, i)] = item.get(k)
+        renamed = pattern.sub(lambda m: '${}_{}'.format(m.group(1), i),
+                              selection)
+        fields.append('{}{}: {}'.format(BATCH_ALIAS, i, renamed))
+    header = 'query {}({})'.format(name, ', '.join(definitions)) \
+        if definitions else 'query {}'.format(name)
+    query = '{} {{\n  {}\n}}'.format(header, '\n  '.join(fields))
+    return query, batch_variables
+
+
+def split_batch_result(data: dict, n_items: int) -> List[dict]:
+    """ Split the result of a query built by batch_query back into the
+        results for each item, in order
+    """
+    return [data['{}{}'.format(BATCH_ALIAS, i)] for i in range(n_items)]
+
+
+class AsyncGQLClient(object):
+
+    def __init__(self, url: str, headers: Optional[dict] = None,
+                 max_concurrency: int = 4, **kwargs):
+        """ Create object for interfacing with a GraphQL API from asyncio
+            code, running up to a fixed number of queries concurrently
+
+        The client is not natively asynchronous: each request is a blocking
+        call of a wrapped GQLClient (the `client` attribute), run on a thread
+        pool sized to the concurrency limit, so errors and retries behave
+        exactly as they do for the synchronous client and concurrency is
+        bounded by the pool. The concurrency limit is kept per event loop, so
+        a client can be reused across loops (e.g. several asyncio.run calls).
+
+        Parameters
+        ----------
+        url : str
+            URL of the GraphQL API to query
+        headers : Optional[dict], optional
+            Dictionary representing headers to be included in the API requests,
+            default is None (no headers)
+        max_concurrency : int, optional
+            Maximum number of queries in flight at once, default is 4
+        **kwargs
+            Other keyword arguments passed on to GQLClient
+        """
+        kwargs['pool_size'] = max(kwargs.get('pool_size', 10), max_concurrency)
+        self.client = GQLClient(url, headers, **kwargs)
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @property
+    def url(self) -> str:
+        return self.client.url
+
+    @property
+    def headers(self) -> dict:
+        return self.client.headers
+
+    @property
+    def metrics(self) -> RateLimitMetrics:
+        return self.client.metrics
+
+    def close(self):
+        """ Close the client's session and shut down its worker threads """
+        self._executor.shutdown(wait=True)
+        self._semaphores.clear()
+        self.client.close()
+
+    async def aclose(self):
+        """ Close the client without blocking the running event loop """
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # One for each event loop the client is used from, created on first
+        # use so that it belongs to that loop
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def execute(self, query: str,
+                      variables: Optional[dict] = None,
+                      retries: Optional[int] = None,
+                      retry_wait_time: Union[int, float, None] = None,
+                      use_cache: Optional[bool] = None) -> dict:
+        """ Asynchronous version of GQLClient.execute, limited to the client's
+            maximum number of concurrent queries
+
+        Parameters
+        ----------
+        query : str
+            GraphQL query string, can be a query or a mutation
+        variables : dict, optional
+            Dictionary of variables to be passed to the GraphQL query,
+            default is None
+        retries : int, optional
+            Number of times to re-attempt the post request should the prior
+            attempt respond with a 503 error before raising an exception,
+            will use the client-specified retries if not included
+        retry_wait_time : Union[int, float], optional
+            Amount of time, in seconds, to wait after a 503 error response
+            prior to re-attempting, will use the client-specified wait time
+            if not included
+        use_cache : Optional[bool], optional
+            Whether to look up and store the result in the client's cache,
+            default is None (use the cache for queries but not mutations)
+
+        Returns
+        -------
+        dict
+            JSON-style dictionary containing the result of the GraphQL query
+
+        Raises
+        ------
+        GQLError
+            Exception if the response includes a GraphQL error message
+        """
+        client = self.client
+        retries = retries or client.retries
+        retry_wait_time = retry_wait_time or client.retry_wait_time
+
+        cache_key = client._cache_key(query, variables, use_cache)
+        if cache_key is not None:
+            data = client.cache.get(cache_key)
+            if data is not None:
+                return data
+
+        json = client._payload(query, variables)
+        loop = asyncio.get_running_loop()
+
+        attempt = 0
+        while True:
+            if client.rate_limiter is not None:
+                await client.rate_limiter.acquire_async()
+            async with self._get_semaphore():
+                response = await loop.run_in_executor(self._executor,
+                                                      client._post, json)
+            if client._should_retry(response, attempt, retries):
+                await asyncio.sleep(client._retry_delay(response, attempt,
+                                                        retry_wait_time))
+                attempt += 1
+                continue
+            break
+
+        return client._store(cache_key, client._result(response))
+
+    async def execute_many(self, queries: Iterable[Union[str, tuple]],
+                           return_exceptions: bool = False,
+                           **kwargs) -> List[dict]:
+        """ Run many queries concurrently, at most max_concurrency at a time
+
+        Parameters
+        ----------
+        queries : Iterable[Union[str, tuple]]
+            Query strings, or (query, variables) 2-tuples
+        return_exceptions : bool, optional
+            Whether to return exceptions from failed queries in place of
+            their results instead of raising the first one, default is False
+        **kwargs
+            Other keyword arguments passed on to execute
+
+        Returns
+        -------
+        List[dict]
+            Query results in the same order as the queries
+        """
+        tasks = []
+        for q in queries:
+            query, variables = (q, None) if isinstance(q, str) else q
+            tasks.append(self.execute(query, variables, **kwargs))
+        return await asyncio.gather(*tasks,
+                                    return_exceptions=return_exceptions)
+
+    async def execute_batched(self, selection: str, variables: Sequence[dict],
+                              variable_types: dict, batch_size: int = 20,
+                              **kwargs) -> List[dict]:
+        """ Asynchronous version of GQLClient.execute_batched that sends the
+            batched requests concurrently
+
+        A batch rejected for being too complex is split in half and both
+        halves are re-attempted.
+        """
+        async def run(items):
+            query, batch_variables = batch_query(selection, items,
+                                                 variable_types)
+            try:
+                data = await self.execute(query, batch_variables, **kwargs)
+            except GQLError as e:
+                if len(items) == 1 or not COMPLEXITY_ERROR.search(str(e)):
+                    raise
+                half = len(items) // 2
+                first, second = await asyncio.gather(run(items[:half]),
+                                                     run(items[half:]))
+                return first + second
+            return split_batch_result(data, len(items))
+
+        batches = await asyncio.gather(*(
+            run(variables[i:i+batch_size])
+            for i in range(0, len(variables), batch_size)
+        ))
+        return [result for batch in batches for result in batch]
+
+
 class StartggClient(GQLClient):
 
     API_VERSION = 'alpha'
     API_URL = 'https://api.start.gg/gql/{}'.format(API_VERSION)
+    # Documented start.gg request budget, 80 requests every 60 seconds
+    RATE_LIMIT = (80, 60)
 
-    def __init__(self, token: str = None, **kwargs):
-        super().__init__(self.API_URL, **kwargs)
+    def __init__(self, token: str = None, url: Optional[str] = None,
+                 **kwargs):
+        if 'rate_limiter' not in kwargs:
+            kwargs['rate_limiter'] = TokenBucket(*self.RATE_LIMIT)
+        super().__init__(self.API_URL if url is None else url, **kwargs)
         if token is not None:
             self.headers['Authorization'] = 'Bearer {}'.format(token)
+
+    def paginate(self, query: str, variables: Optional[dict] = None,
+                 path: Union[str, Sequence[str], None] = None,
+                 per_page: Optional[int] = None, prefetch: int = 0,
+                 page_variable: str = 'page',
+                 per_page_variable: str = 'perPage') -> Iterator[dict]:
+        """ Lazily iterate over every node of a paginated start.gg connection
+
+        The query must take page and per-page variables and select the
+        connection's `nodes`, and should select `pageInfo { totalPages }` so
+        iteration can stop without requesting an extra empty page. If the
+        API rejects a request for being too complex, the page size is halved
+        and iteration resumes from the same node.
+
+        Parameters
+        ----------
+        query : str
+            GraphQL query string for a single page of the connection
+        variables : dict, optional
+            Dictionary of variables to be passed to the GraphQL query, other
+            than the page variables, default is None
+        path : Union[str, Sequence[str]], optional
+            Field path from the query result to the paginated connection,
+            either dot-separated (e.g. 'event.entrants') or as a sequence of
+            field names, default is None (the first field at each level)
+        per_page : int, optional
+            Initial number of nodes per page, default is the per-page
+            variable if given, otherwise 50
+        prefetch : int, optional
+            Number of upcoming pages to request concurrently while the
+            current page is consumed, default is 0 (fetch one at a time)
+        page_variable : str, optional
+            Name of the page number variable, default is 'page'
+        per_page_variable : str, optional
+            Name of the page size variable, default is 'perPage'
+
+        Yields
+        ------
+        dict
+            Nodes of the connection, in order
+
+        Raises
+        ------
+        GQLError
+            Exception if a response includes a GraphQL error message other
+            than a complexity error, or a complexity error at a page size of 1
+        """
+        variables = {} if variables is None else dict(variables)
+        if per_page is None:
+            per_page = variables.get(per_page_variable, 50)
+        if isinstance(path, str):
+            path = path.split('.')
+
+        def fetch(page, size):
+            page_variables = {**variables, page_variable: page,
+                              per_page_variable: size}
+            return _get_connection(self.execute(query, page_variables), path)
+
+        executor = ThreadPoolExecutor(prefetch) if prefetch > 0 else None
+        pending = {}
+        offset = 0
+        total_pages = None
+        try:
+            while True:
+                page, skip = divmod(offset, per_page)
+                page += 1
+                if total_pages is not None and page > total_pages:
+                    break
+                try:
+                    if (page, per_page) in pending:
+                        connection = pending.pop((page, per_page)).result()
+                    else:
+                        connection = fetch(page, per_page)
+                except GQLError as e:
+                    if per_page == 1 or not COMPLEXITY_ERROR.search(str(e)):
+                        raise
+                    per_page = max(per_page // 2, 1)
+                    # The page count is for the old page size
+                    total_pages = None
+                    for future in pending.values():
+                        future.cancel()
+                    pending.clear()
+                    continue
+
+                page_info = connection.get('pageInfo') or {}
+                total_pages = page_info.get('totalPages', total_pages)
+                nodes = connection['nodes'] or []
+
+                if executor is not None:
+                    last_page = page + prefetch
+                    if total_pages is not None:
+                        last_page = min(last_page, total_pages)
+                    for p in range(page + 1, last_page + 1):
+                        if (p, per_page) not in pending:
+                            pending[(p, per_page)] = executor.submit(
+                                fetch, p, per_page
+                            )
+
+                for node in nodes[skip:]:
+                    yield node
+                offset += max(len(nodes) - skip, 0)
+                if len(nodes) < per_page:
+                    break
+        finally:
+            if executor is not None:
+                for future in pending.values():
+                    future.cancel()
+                executor.shutdown(wait=False)
+
+
+def _get_connection(data: dict, path: Optional[Sequence[str]]) -> dict:
+    if path is None:
+        # Follow the first field down until reaching the connection
+        while 'nodes' not in data:
+            data = next(iter(data.values()))
+        return data
+    for field in path:
+        data = data[field]
+    return data
+
+
+class AsyncStartggClient(AsyncGQLClient):
+
+    API_URL = StartggClient.API_URL
+    RATE_LIMIT = StartggClient.RATE_LIMIT
+
+    def __init__(self, token: str = None, url: Optional[str] = None,
+                 **kwargs):
+        if 'rate_limiter' not in kwargs:
+            kwargs['rate_limiter'] = TokenBucket(*self.RATE_LIMIT)
+        super().__init__(self.API_URL if url is None else url, **kwargs)
+        if token is not None:
+            self.headers['Authorization'] = 'Bearer {}'.format(token)
+
+    async def paginate(self, query: str, variables: Optional[dict] = None,
+                       path: Union[str, Sequence[str], None] = None,
+                       per_page: Optional[int] = None,
+                       page_variable: str = 'page',
+                       per_page_variable: str = 'perPage') -> List[dict]:
+        """ Asynchronous version of StartggClient.paginate that requests the
+            pages after the first concurrently, returning every node
+
+        Pages are sent at most max_concurrency at a time, shared with any
+        other queries of the client, so several connections (e.g. the seeds
+        of many phase groups) can be paginated at once with asyncio.gather.
+        A page rejected for being too complex is fetched again as smaller
+        pages, and the number of pages is taken from the first page's
+        `pageInfo { totalPages }` (without it, pages are fetched one at a
+        time until a short page).
+
+        Parameters
+        ----------
+        query : str
+            GraphQL query string for a single page of the connection
+        variables : dict, optional
+            Dictionary of variables to be passed to the GraphQL query, other
+            than the page variables, default is None
+        path : Union[str, Sequence[str]], optional
+            Field path from the query result to the paginated connection,
+            either dot-separated (e.g. 'event.entrants') or as a sequence of
+            field names, default is None (the first field at each level)
+        per_page : int, optional
+            Initial number of nodes per page, default is the per-page
+            variable if given, otherwise 50
+        page_variable : str, optional
+            Name of the page number variable, default is 'page'
+        per_page_variable : str, optional
+            Name of the page size variable, default is 'perPage'
+
+        Returns
+        -------
+        List[dict]
+            Nodes of the connection, in order
+
+        Raises
+        ------
+        GQLError
+            Exception if a response includes a GraphQL error message other
+            than a complexity error, or a complexity error at a page size of 1
+        """
+        variables = {} if variables is None else dict(variables)
+        if per_page is None:
+            per_page = variables.get(per_page_variable, 50)
+        if isinstance(path, str):
+            path = path.split('.')
+
+        async def fetch(page, size):
+            page_variables = {**variables, page_variable: page,
+                              per_page_variable: size}
+            return _get_connection(await self.execute(query, page_variables),
+                                   path)
+
+        async def fetch_range(start, stop, size):
+            # Nodes start to stop of the connection, from pages of size nodes
+            pages = range(start // size + 1, -(-stop // size) + 1)
+            connections = await asyncio.gather(
+                *(fetch(p, size) for p in pages), return_exceptions=True
+            )
+            parts = []
+            retry = []
+            for p, connection in zip(pages, connections):
+                lo, hi = max((p-1) * size, start), min(p * size, stop)
+                if isinstance(connection, BaseException):
+                    if size == 1 or not (isinstance(connection, GQLError)
+                                         and COMPLEXITY_ERROR.search(str(connection))):
+                        raise connection
+                    retry.append((len(parts), lo, hi))
+                    parts.append(None)
+                else:
+                    nodes = connection['nodes'] or []
+                    parts.append(nodes[lo-(p-1)*size:hi-(p-1)*size])
+            retried = await asyncio.gather(*(
+                fetch_range(lo, hi, max(size // 2, 1)) for _, lo, hi in retry
+            ))
+            for (i, _, _), nodes in zip(retry, retried):
+                parts[i] = nodes
+            return [node for part in parts for node in part]
+
+        while True:
+            try:
+                connection = await fetch(1, per_page)
+            except GQLError as e:
+                if per_page == 1 or not COMPLEXITY_ERROR.search(str(e)):
+                    raise
+                per_page = max(per_page // 2, 1)
+                continue
+            break
+
+        nodes = list(connection['nodes'] or [])
+        total_pages = (connection.get('pageInfo') or {}).get('totalPages')
+        if total_pages is not None:
+            if len(nodes) == per_page and total_pages > 1:
+                nodes += await fetch_range(per_page, total_pages * per_page,
+                                           per_page)
+        else:
+            page_nodes = nodes
+            while len(page_nodes) == per_page:
+                page_nodes = await fetch_range(len(nodes), len(nodes) + per_page,
+                                               per_page)
+                nodes += page_nodes
+        return nodes
@@ -1,5 +1,27 @@
-from .bracket import assign_bracket_seeds, positions_from_seeds
-from .pools import assign_pools
-from .seeds import assign_seed_pools
-from .analyze import find_schedule_conflicts, find_external_conflicts, \
-    find_suboptimal_schedules, find_suboptimal_distributions, get_distribution
+# Public names are imported from their submodules on first access, so that
+# importing the package does not pull in pandas and numpy
+_lazy_attrs = {
+    'assign_bracket_seeds': 'curlybrackets.assignment.bracket',
+    'positions_from_seeds': 'curlybrackets.assignment.bracket',
+    'assign_pools': 'curlybrackets.assignment.pools',
+    'assign_seed_pools': 'curlybrackets.assignment.seeds',
+    'find_schedule_conflicts': 'curlybrackets.assignment.analyze',
+    'find_external_conflicts': 'curlybrackets.assignment.analyze',
+    'find_suboptimal_schedules': 'curlybrackets.assignment.analyze',
+    'find_suboptimal_distributions': 'curlybrackets.assignment.analyze',
+    'get_distribution': 'curlybrackets.assignment.analyze',
+    'AssignmentProblem': 'curlybrackets.assignment.problem',
+}
+
+
+def __getattr__(name):
+    if name not in _lazy_attrs:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from importlib import import_module
+    value = getattr(import_module(_lazy_attrs[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_attrs))
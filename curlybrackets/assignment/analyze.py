@@ -6,12 +6,22 @@ from numpy import unique
 
 from . import compute as c
 from . import utilities as u
+from .problem import AssignmentProblem
 
 
-def find_schedule_conflicts(df, events, xchar=None, phase_transitions=None, pools=None):
+def _from_problem(events, xchar, phase_transitions, pools):
+    # Settings of an AssignmentProblem passed in place of events, whose phase
+    # maps are already built, otherwise the phase maps of the given transitions
+    if isinstance(events, AssignmentProblem):
+        return (events, list(events.events), events.xchar, dict(events.phase_maps),
+                events.settings()['pools'])
     if phase_transitions is None:
         phase_transitions = {}
-    phase_maps = u.maps_from_transitions(phase_transitions, pools)
+    return None, events, xchar, u.maps_from_transitions(phase_transitions, pools), pools
+
+
+def find_schedule_conflicts(df, events, xchar=None, phase_transitions=None, pools=None):
+    _, events, xchar, phase_maps, pools = _from_problem(events, xchar, phase_transitions, pools)
 
     dfc = df.copy()
     dfc = u.add_phase_columns(phase_maps, dfc, events, xchar)
@@ -29,11 +39,11 @@ def find_schedule_conflicts(df, events, xchar=None, phase_transitions=None, pool
 
 def find_external_conflicts(df, events, external=None, xchar=None,
                             phase_transitions=None, pools=None, splitchar=None):
+    if external is None and isinstance(events, AssignmentProblem):
+        external = events.external
     if external is None:
         return []
-    if phase_transitions is None:
-        phase_transitions = {}
-    phase_maps = u.maps_from_transitions(phase_transitions, pools)
+    _, events, xchar, phase_maps, pools = _from_problem(events, xchar, phase_transitions, pools)
     splitter = list if splitchar is None else partial(str.split, sep=splitchar)
 
     dfc = df.copy()
@@ -52,32 +62,37 @@ def find_external_conflicts(df, events, external=None, xchar=None,
     return ex_ix
 
 
-def find_suboptimal_schedules(df, events, pools=None, phase_transitions=None, xchar=None, **kwargs):
-    if phase_transitions is None:
-        phase_transitions = {}
-    phase_maps = u.maps_from_transitions(phase_transitions, pools)
+def find_suboptimal_schedules(df, events, pools=None, phase_transitions=None, xchar=None,
+                              schedule_memo=None, **kwargs):
+    problem, events, xchar, phase_maps, pools = _from_problem(events, xchar, phase_transitions,
+                                                              pools)
     if pools is None:
         pools = {e: df[e].dropna().unique() for e in events}
 
     dfc = df.copy()
     dfc = u.add_phase_columns(phase_maps, df, events, xchar)
-    wave_maps = u.get_phase_wave_maps(phase_maps, pools, events)
+    if problem is None:
+        wave_maps = u.get_phase_wave_maps(phase_maps, pools, events)
+    else:
+        wave_maps = dict(problem.wave_maps)
     phases = dfc.filter(regex=r'[.]{2}[1-9][0-9]*$').columns.tolist()
 
-    min_scores = dfc.apply(c.compute_schedule_minimum, axis=1, args=(phases, wave_maps),
-                           keep_assigned=False, xchar=xchar, **kwargs)
-    curr_scores = dfc.apply(c.compute_schedule_minimum, axis=1, args=(phases, wave_maps),
-                            keep_assigned=True, xchar=xchar, **kwargs)
+    if schedule_memo is None:
+        schedule_memo = c.ScheduleMemo() if problem is None else problem.schedule_memo
+    min_scores = c.compute_schedule_minimums(dfc, phases, wave_maps, keep_assigned=False,
+                                             xchar=xchar, memo=schedule_memo, **kwargs)
+    curr_scores = c.compute_schedule_minimums(dfc, phases, wave_maps, keep_assigned=True,
+                                              xchar=xchar, memo=schedule_memo, **kwargs)
     so_ix = dfc.loc[curr_scores > min_scores].index.tolist()
     return so_ix
 
 
-def find_suboptimal_distributions(df, events, locations, pools, pk=None, phase_transitions=None,
+def find_suboptimal_distributions(df, events, locations=None, pools=None, pk=None, phase_transitions=None,
                                   include_seeds=False, bracket_accounting='none', pool_order=None,
                                   phase_distrib_calc='first', location_thold=1, diff_th=1e-7, return_costs=False):
-    if phase_transitions is None:
-        phase_transitions = {}
-    phase_maps = u.maps_from_transitions(phase_transitions, pools)
+    problem, events, _, phase_maps, pools = _from_problem(events, None, phase_transitions, pools)
+    if problem is not None:
+        locations, pk = list(problem.locations), problem.pk
     if isinstance(pool_order, dict):
         pool_order.update({e: (lambda s: s) for e in events if e not in pool_order})
     elif pool_order is not None:
@@ -89,7 +104,10 @@ def find_suboptimal_distributions(df, events, locations, pools, pk=None, phase_t
     dfc = df.copy()
     dfc = u.add_entry_columns(dfc, events, pk)
     dfc = u.add_phase_columns(phase_maps, dfc, events)
-    ph_pools = u.get_phase_pools(phase_maps, pools, events)
+    if problem is None:
+        ph_pools = u.get_phase_pools(phase_maps, pools, events)
+    else:
+        ph_pools = dict(problem.phase_pools)
     phases = dfc.filter(regex=r'[.]{2}[1-9][0-9]*$').columns.tolist()
 
     so_tuples = []
@@ -157,14 +175,18 @@ def find_suboptimal_distributions(df, events, locations, pools, pk=None, phase_t
 
 
 def get_distribution(df, event, location, place, pk=None, phase=1,
-                     phase_transition=None, pools=None, pool_order=None):
-    if pools is not None and not isinstance(pools, dict):
-        pools = {event: pools}
-    if phase_transition is None:
-        phase_transition = {}
-    elif not isinstance(phase_transition, dict):
-        phase_transition = {event: phase_transition}
-    phase_maps = u.maps_from_transitions(phase_transition, pools)
+                     phase_transition=None, pools=None, pool_order=None, problem=None):
+    if problem is not None:
+        pk = problem.pk
+        phase_maps = dict(problem.phase_maps)
+    else:
+        if pools is not None and not isinstance(pools, dict):
+            pools = {event: pools}
+        if phase_transition is None:
+            phase_transition = {}
+        elif not isinstance(phase_transition, dict):
+            phase_transition = {event: phase_transition}
+        phase_maps = u.maps_from_transitions(phase_transition, pools)
     if pool_order is None:
         pool_order = (lambda s: s)
     elif isinstance(pool_order, dict) and event in pool_order:
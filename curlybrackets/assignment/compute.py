@@ -1,12 +1,15 @@
 import re
+import random
 import warnings
+from collections import Counter, OrderedDict
 from functools import reduce, partial
 from math import factorial
 
-from pandas import Series, DataFrame, Index
+from pandas import Series, DataFrame, Index, isna
 from numpy import array, unique, where, zeros, infty
 
 from . import utilities as u
+from ..utilities import get_pool_wave
 
 
 _pull_event = lambda s: re.sub(r'[.]{2}[1-9][0-9]*$', '', s)
@@ -42,6 +45,17 @@ def _optimal_weight_partition(nbins, weights):
     return bins
 
 
+def schedule_slope(current, external, scm=2.0, xcm=8.0):
+    '''
+    Marginal schedule score of one more phase in a block, given the block's
+    current phase count and whether it is an external conflict (scalars or
+    Series indexed by block)
+    '''
+    if isinstance(current, Series):
+        return scm * ((current+1).map(factorial) - current.map(factorial)) + xcm * external
+    return scm * (factorial(current+1) - factorial(current)) + xcm * external
+
+
 def compute_schedule_minimum(sr, phases, wave_maps, keep_assigned=False, xchar=None,
                              external=None, splitchar=None, wave_order=None, scm=2.0, xcm=8.0, **kwargs):
     splitter = list if splitchar is None else partial(str.split, sep=splitchar)
@@ -58,15 +72,15 @@ def compute_schedule_minimum(sr, phases, wave_maps, keep_assigned=False, xchar=N
     block_sr_current = Series(0, index=blocks_possible)
     if keep_assigned:
         phases_unassigned = phases_entered.loc[phases_entered == xchar].index.tolist()
-        block_sr_current = block_sr_current.add(u.count_blocks(phases_entered, xchar), fill_value=0)
+        block_sr_current = block_sr_current.add(u.count_blocks(phases_entered, xchar),
+                                                fill_value=0).astype('int64')
     else:
         phases_unassigned = phases_entered.index.tolist()
     events_unassigned = list(set((_pull_event(p) for p in phases_unassigned)))
     wmaps_ua = {e: wave_maps[e].dropna() for e in events_unassigned}
 
     while phases_unassigned:
-        block_sr_slope = (scm * ((block_sr_current+1).map(factorial) - block_sr_current.map(factorial)) 
-                            + xcm * block_sr_external)
+        block_sr_slope = schedule_slope(block_sr_current, block_sr_external, scm, xcm)
         # wave_sr_slope = {w: block_sr_slope[list(w)].sum() for w in waves_possible}
         min_slope = infty
         for e in events_unassigned:
@@ -115,6 +129,209 @@ def compute_schedule_minimum(sr, phases, wave_maps, keep_assigned=False, xchar=N
     return min_contrib
 
 
+class ScheduleMemo(object):
+    '''
+    Memo of compute_schedule_minimum results keyed by registration signature,
+    optionally bounded to the maxsize most recently used signatures. Keys
+    include the wave maps and schedule settings, so a memo can be shared
+    between calls. Wave maps are built once per phase map (see wave_maps) and
+    their contents interned, so keys stay small on the annealing hot path.
+    '''
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._wave_maps = {}
+        self._wave_ids = {}
+        self._wave_contents = {}
+
+    def get(self, key, compute):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = self._data[key] = compute()
+            if self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        else:
+            self.hits += 1
+            if self.maxsize is not None:
+                self._data.move_to_end(key)
+        return value
+
+    def clear(self):
+        self._data.clear()
+
+    def wave_maps(self, phase_maps, pools, events):
+        ''' Same as utilities.get_phase_wave_maps, built once per phase map '''
+        wave_maps = {}
+        for e in events:
+            pmap = phase_maps.get(e)
+            key = (e, tuple(pools[e])) if pmap is None else (e, id(pmap))
+            if key not in self._wave_maps:
+                # The phase map is kept so that its id is not reused
+                self._wave_maps[key] = (pmap, u.get_phase_wave_maps(phase_maps, pools, [e])[e])
+            wave_maps[e] = self._wave_maps[key][1]
+        return wave_maps
+
+    def settings(self, phases, wave_maps, keep_assigned, xchar, splitchar=None,
+                 wave_order=None, scm=2.0, xcm=8.0, **kwargs):
+        ''' Key of the schedule settings, with each wave map as a small id '''
+        events = sorted(set(_pull_event(p) for p in phases))
+        wave_key = tuple((e, self._wave_id(wave_maps[e])) for e in events)
+        return (tuple(phases), wave_key, keep_assigned, xchar, splitchar,
+                None if wave_order is None else tuple(wave_order), scm, xcm)
+
+    def _wave_id(self, wmap):
+        # Hash a wave map's contents only the first time the frame is seen,
+        # keeping the frame so that its id is not reused
+        entry = self._wave_ids.get(id(wmap))
+        if entry is None:
+            if len(self._wave_ids) >= 1024:
+                self._wave_ids.clear()
+            contents = tuple(wmap.itertuples())
+            wave_id = self._wave_contents.setdefault(contents, len(self._wave_contents))
+            entry = self._wave_ids[id(wmap)] = (wmap, wave_id)
+        return entry[1]
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return '{}(size={}, hits={}, misses={}, hit_rate={:.3f})'.format(
+            self.__class__.__name__, len(self), self.hits, self.misses, self.hit_rate)
+
+
+def _wave_maps(memo, phase_maps, pools, events):
+    if memo is None:
+        return u.get_phase_wave_maps(phase_maps, pools, events)
+    return memo.wave_maps(phase_maps, pools, events)
+
+
+def compute_schedule_minimums(df, phases, wave_maps, keep_assigned=False, xchar=None,
+                              external=None, memo=None, **kwargs):
+    '''
+    Same as applying compute_schedule_minimum to every row of df, but computed
+    only once per distinct signature of entered phases (and their assigned
+    pools if keep_assigned), and external conflicts, then broadcast back
+    '''
+    if memo is None:
+        memo = ScheduleMemo()
+    if len(df) == 0:
+        return Series(dtype='float64', index=df.index)
+
+    sig = df[phases] if keep_assigned else df[phases].notna()
+    if external is not None:
+        sig = sig.assign(**{'..external': df[external]})
+    codes = sig.groupby(sig.columns.tolist(), sort=False, dropna=False).ngroup()
+    settings = memo.settings(phases, wave_maps, keep_assigned, xchar, **kwargs)
+
+    minimums = {}
+    for ix, code in codes.drop_duplicates().items():
+        key = settings + tuple(None if isna(v) else v for v in sig.loc[ix])
+        minimums[code] = memo.get(key, lambda: compute_schedule_minimum(
+            df.loc[ix], phases, wave_maps, keep_assigned=keep_assigned,
+            xchar=xchar, external=external, **kwargs))
+    # Rows sharing a signature with an earlier row count as hits
+    memo.hits += len(codes) - len(minimums)
+    return codes.map(minimums).astype('float64')
+
+
+class GreedyPlacement(object):
+    '''
+    Running state for placing entries into pools one at a time. A candidate
+    pool costs the schedule slopes (as in compute_schedule_minimum) of its
+    blocks for the entry's members, plus the entry's location/pool cell counts
+    and the number of entries of at least its value already in the pool.
+    Pools already assigned in df (other than xchar) count as placed.
+    '''
+    def __init__(self, df, events, locations, pools, phase_maps=None, xchar=None,
+                 external=None, splitchar=None, scm=2.0, xcm=8.0, **kwargs):
+        if phase_maps is None:
+            phase_maps = {}
+        splitter = list if splitchar is None else partial(str.split, sep=splitchar)
+        self.scm = scm
+        self.xcm = xcm
+        self._locations = [list(l) if isinstance(l, (list, tuple)) else l for l in locations]
+
+        self._blocks = {}
+        for e in events:
+            self._blocks[e] = {}
+            for p in pools[e]:
+                phase_pools = phase_maps[e].loc[p].dropna().tolist() if e in phase_maps else [p]
+                self._blocks[e][p] = sum((list(get_pool_wave(q) or '') for q in phase_pools), [])
+
+        self._row_blocks = {ix: Counter() for ix in df.index}
+        ext = Series('', index=df.index) if external is None else df[external].fillna('')
+        self._external = {ix: set(splitter(v)) for ix, v in ext.items()}
+        self._row_places = {ix: list(self._place_values(sr)) for ix, sr in df.iterrows()}
+        self._row_events = df[events].notna().sum(axis=1).to_dict()
+
+        self._cells = {e: Counter() for e in events}
+        self._place_totals = {e: Counter() for e in events}
+        self._values = {e: {p: [] for p in pools[e]} for e in events}
+        for e in events:
+            values = df.groupby(e+'.Entry')[e+'.Value'].mean() if e+'.Value' in df.columns else None
+            for x, rows in df.groupby(e+'.Entry').groups.items():
+                for ix in rows:
+                    for i, plc in enumerate(self._row_places[ix]):
+                        if plc is not None:
+                            self._place_totals[e][(i, plc)] += 1
+                pool = df.loc[rows[0], e]
+                if pool in self._blocks[e] and pool != xchar:
+                    self.place(e, rows, pool, 0 if values is None else values[x])
+
+    def _place_values(self, sr):
+        for l in self._locations:
+            if isinstance(l, list):
+                plc = tuple(sr[l])
+                yield None if all(isna(v) for v in plc) else plc
+            else:
+                yield None if isna(sr[l]) else sr[l]
+
+    def difficulty(self, e, rows, value=0):
+        '''
+        Sort key placing entries with members in the most events first, then
+        those from the rarest locations, then the highest valued
+        '''
+        rarity = min((self._place_totals[e][(i, plc)] for ix in rows
+                      for i, plc in enumerate(self._row_places[ix]) if plc is not None),
+                     default=infty)
+        return (-max(self._row_events[ix] for ix in rows), rarity, -value)
+
+    def cost(self, e, rows, pool, value=0):
+        blocks = self._blocks[e][pool]
+        cost = 0.0
+        for ix in rows:
+            counts = self._row_blocks[ix]
+            ext = self._external[ix]
+            cost += sum(schedule_slope(counts[b], int(b in ext), self.scm, self.xcm) for b in blocks)
+            cost += sum(self._cells[e][(i, plc, pool)]
+                        for i, plc in enumerate(self._row_places[ix]) if plc is not None)
+        cost += sum(v >= value for v in self._values[e][pool])
+        return cost
+
+    def choose(self, e, rows, options, value=0):
+        ''' Pick the cheapest of the candidate pools, breaking ties randomly '''
+        costs = [self.cost(e, rows, p, value) for p in options]
+        best = min(costs)
+        return random.choice([p for p, k in zip(options, costs) if k == best])
+
+    def place(self, e, rows, pool, value=0):
+        for ix in rows:
+            self._row_blocks[ix].update(self._blocks[e][pool])
+            for i, plc in enumerate(self._row_places[ix]):
+                if plc is not None:
+                    self._cells[e][(i, plc, pool)] += 1
+        self._values[e][pool].append(value)
+
+
 def compute_schedule_contribution(sr, phases, external=None,
                                   splitchar=None, scm=2.0, xcm=8.0, **kwargs):
     splitter = list if splitchar is None else partial(str.split, sep=splitchar)
@@ -149,28 +366,58 @@ def compute_distrib_contribution(pool_counts, pools, account_for_bracket=False):
     return dist_score
 
 
+def _phase_frame(df, phase_maps, events, true_events=None, xchar=None):
+    '''
+    Copy df with phase columns for events (through their phase maps) and for
+    true_events (first phase only, no phase maps), returning the frame, the
+    events' phases and the true events' phases
+    '''
+    dfc = u.add_phase_columns(phase_maps, df.copy(), events, xchar)
+    phases = dfc.filter(regex=r'[.]{2}[1-9][0-9]*$').columns.tolist()
+    if not true_events:
+        return dfc, phases, []
+    extra = [t for t in true_events if t not in events]
+    if extra:
+        dfc = u.add_phase_columns({}, dfc, extra, xchar)
+    return dfc, phases, [t+'..1' for t in true_events]
+
+
+def _score_total(components, return_components):
+    return components if return_components else sum(components.values())
+
+
 def compute_minimum_score(df, events, locations, pools, xchar=None,
                           phase_maps=None, bracket_accounting='none',
                           skip_schedule=False, phase_distrib_calc='first',
-                          schedule_weight_col=None, location_thold=1, **kwargs):
+                          schedule_weight_col=None, location_thold=1,
+                          schedule_memo=None, true_events=None,
+                          return_components=False, **kwargs):
     # Note: pool_order not used in calculating minimum score
     # Note: bracket_accounting: {'all','ranked','none'}
+    # Note: true_events only add their schedule (first phase, no phase maps)
     if phase_maps is None:
         phase_maps = {}
 
-    dfc = df.copy()
-    dfc = u.add_phase_columns(phase_maps, dfc, events, xchar)
+    dfc, phases, true_phases = _phase_frame(df, phase_maps, events, true_events, xchar)
     ph_pools = u.get_phase_pools(phase_maps, pools, events)
-    phases = dfc.filter(regex=r'[.]{2}[1-9][0-9]*$').columns.tolist()
 
-    min_score = 0.0
+    scores = {'schedule': 0.0, 'distribution': 0.0, 'true_schedule': 0.0}
     if not skip_schedule:
-        wave_maps = u.get_phase_wave_maps(phase_maps, pools, events)
-        schedule_scores = dfc.apply(compute_schedule_minimum, axis=1,
-                                    args=(phases, wave_maps), xchar=xchar, **kwargs) #keep_assigned = True?
+        wave_maps = _wave_maps(schedule_memo, phase_maps, pools, events)
+        schedule_scores = compute_schedule_minimums(dfc, phases, wave_maps, xchar=xchar,
+                                                    memo=schedule_memo, **kwargs) #keep_assigned = True?
         if schedule_weight_col is not None:
             schedule_scores *= dfc[schedule_weight_col]
-        min_score += schedule_scores.sum()
+        scores['schedule'] = schedule_scores.sum()
+        if true_phases:
+            true_wave_maps = _wave_maps(schedule_memo, {}, pools, true_events)
+            true_scores = compute_schedule_minimums(dfc, true_phases, true_wave_maps, xchar=xchar,
+                                                    memo=schedule_memo, **kwargs)
+            if schedule_weight_col is not None:
+                true_scores *= dfc[schedule_weight_col]
+            scores['true_schedule'] = true_scores.sum()
+
+    min_score = 0.0
 
     for e in events:
         ephases = [ph for ph in phases if re.match(u.clean_regex(e), ph)]
@@ -198,15 +445,19 @@ def compute_minimum_score(df, events, locations, pools, xchar=None,
                         psr = pdf.loc[places[plc]].groupby(e+'.Entry')[e+'.Weight'].sum()
                         if psr.sum() < location_thold * total_entries:
                             min_score += compute_distrib_minimum(psr.values, len(ph_pools[ep]), a4b)
-    return min_score
+    scores['distribution'] = min_score
+    return _score_total(scores, return_components)
 
 
 def compute_current_score(df, events, locations, pools, phase_maps=None,
                           bracket_accounting='none', pool_order=None,
                           skip_schedule=False, min_schedule_calc=False,
                           xchar=None, phase_distrib_calc='first',
-                          schedule_weight_col=None, location_thold=1, **kwargs):
+                          schedule_weight_col=None, location_thold=1,
+                          schedule_memo=None, true_events=None,
+                          return_components=False, **kwargs):
     # Note: bracket_accounting: {'all','ranked','none'}
+    # Note: true_events only add their schedule (first phase, no phase maps)
     if phase_maps is None:
         phase_maps = {}
     if isinstance(pool_order, dict):
@@ -216,22 +467,26 @@ def compute_current_score(df, events, locations, pools, phase_maps=None,
     else:
         pool_order = {e: (lambda s: s) for e in events}
 
-    dfc = df.copy()
-    dfc = u.add_phase_columns(phase_maps, dfc, events, xchar)
+    dfc, phases, true_phases = _phase_frame(df, phase_maps, events, true_events, xchar)
     ph_pools = u.get_phase_pools(phase_maps, pools, events)
-    phases = dfc.filter(regex=r'[.]{2}[1-9][0-9]*$').columns.tolist()
 
-    curr_score = 0.0
+    scores = {'schedule': 0.0, 'distribution': 0.0, 'true_schedule': 0.0}
     if not skip_schedule:
-        if min_schedule_calc:
-            wave_maps = u.get_phase_wave_maps(phase_maps, pools, events)
-            schedule_scores = dfc.apply(compute_schedule_minimum, axis=1, args=(phases, wave_maps),
-                                        keep_assigned=True, xchar=xchar, **kwargs)
-        else:
-            schedule_scores = dfc.apply(compute_schedule_contribution, axis=1, args=(phases,), **kwargs)
-        if schedule_weight_col is not None:
-            schedule_scores *= dfc[schedule_weight_col]
-        curr_score += schedule_scores.sum()
+        schedule_sets = [('schedule', phases, phase_maps, events)]
+        if true_phases:
+            schedule_sets.append(('true_schedule', true_phases, {}, true_events))
+        for name, sphases, smaps, sevents in schedule_sets:
+            if min_schedule_calc:
+                wave_maps = _wave_maps(schedule_memo, smaps, pools, sevents)
+                schedule_scores = compute_schedule_minimums(dfc, sphases, wave_maps, keep_assigned=True,
+                                                            xchar=xchar, memo=schedule_memo, **kwargs)
+            else:
+                schedule_scores = dfc.apply(compute_schedule_contribution, axis=1, args=(sphases,), **kwargs)
+            if schedule_weight_col is not None:
+                schedule_scores *= dfc[schedule_weight_col]
+            scores[name] = schedule_scores.sum()
+
+    curr_score = 0.0
 
     for e in events:
         ephases = [ph for ph in phases if re.match(u.clean_regex(e), ph)]
@@ -270,46 +525,56 @@ def compute_current_score(df, events, locations, pools, phase_maps=None,
                         ppc = pgp.groupby(ep)[e+'.Weight'].sum()
                         if ppc.sum() < location_thold * total_entries:
                             curr_score += compute_distrib_contribution(ppc, ordered_pools, a4b)
-    return curr_score
+    scores['distribution'] = curr_score
+    return _score_total(scores, return_components)
 
 
 def compute_score_change(olddf, newdf, diffs, e, events, locations, pools, phase_maps=None,
                          bracket_accounting=None, pool_order=None, skip_schedule=False,
                          min_schedule_calc=False, xchar=None, phase_distrib_calc='first',
-                         schedule_weight_col=None, location_thold=1, **kwargs):
+                         schedule_weight_col=None, location_thold=1, schedule_memo=None,
+                         true_events=None, return_components=False, **kwargs):
+    # Note: true_events only add their schedule (first phase, no phase maps),
+    # which a swap in e changes only if e is one of them
     if phase_maps is None:
         phase_maps = {}
     if pool_order is None:
         pool_order = lambda s: s
+    if true_events and e not in true_events:
+        true_events = None
 
-    olddfc = olddf.copy()
-    newdfc = newdf.copy()
-    olddfc = u.add_phase_columns(phase_maps, olddfc, events, xchar)
-    newdfc = u.add_phase_columns(phase_maps, newdfc, events, xchar)
+    olddfc, phases, true_phases = _phase_frame(olddf, phase_maps, events, true_events, xchar)
+    newdfc, _, _ = _phase_frame(newdf, phase_maps, events, true_events, xchar)
     ph_pools = u.get_phase_pools(phase_maps, pools, events)
-    phases = olddfc.filter(regex=r'[.]{2}[1-9][0-9]*$').columns.tolist()
 
     members = newdfc.groupby(e+'.Entry').groups
     mixs = [members[d] for d in diffs]
     jxs = reduce(lambda a,b: a.append(b), mixs, Index([]))
 
+    scores = {'schedule': 0.0, 'distribution': 0.0, 'true_schedule': 0.0}
+    if not skip_schedule:
+        schedule_sets = [('schedule', phases, phase_maps, events)]
+        if true_phases:
+            schedule_sets.append(('true_schedule', true_phases, {}, true_events))
+        for name, sphases, smaps, sevents in schedule_sets:
+            if min_schedule_calc:
+                wave_maps = _wave_maps(schedule_memo, smaps, pools, sevents)
+                old_sched_scores = compute_schedule_minimums(olddfc.loc[jxs], sphases, wave_maps,
+                                                             keep_assigned=True, xchar=xchar,
+                                                             memo=schedule_memo, **kwargs)
+                new_sched_scores = compute_schedule_minimums(newdfc.loc[jxs], sphases, wave_maps,
+                                                             keep_assigned=True, xchar=xchar,
+                                                             memo=schedule_memo, **kwargs)
+            else:
+                old_sched_scores = olddfc.loc[jxs].apply(compute_schedule_contribution, axis=1, args=(sphases,), **kwargs)
+                new_sched_scores = newdfc.loc[jxs].apply(compute_schedule_contribution, axis=1, args=(sphases,), **kwargs)
+            if schedule_weight_col is not None:
+                old_sched_scores *= olddfc.loc[jxs, schedule_weight_col]
+                new_sched_scores *= newdfc.loc[jxs, schedule_weight_col]
+            scores[name] = new_sched_scores.sum() - old_sched_scores.sum()
+
     old_score = 0.0
     new_score = 0.0
-    if not skip_schedule:
-        if min_schedule_calc:
-            wave_maps = u.get_phase_wave_maps(phase_maps, pools, events)
-            old_sched_scores = olddfc.loc[jxs].apply(compute_schedule_minimum, axis=1, args=(phases, wave_maps),
-                                                     keep_assigned=True, xchar=xchar, **kwargs)
-            new_sched_scores = newdfc.loc[jxs].apply(compute_schedule_minimum, axis=1, args=(phases, wave_maps),
-                                                     keep_assigned=True, xchar=xchar, **kwargs)
-        else:
-            old_sched_scores = olddfc.loc[jxs].apply(compute_schedule_contribution, axis=1, args=(phases,), **kwargs)
-            new_sched_scores = newdfc.loc[jxs].apply(compute_schedule_contribution, axis=1, args=(phases,), **kwargs)
-        if schedule_weight_col is not None:
-            old_sched_scores *= olddfc.loc[jxs, schedule_weight_col]
-            new_sched_scores *= newdfc.loc[jxs, schedule_weight_col]
-        old_score += old_sched_scores.sum()
-        new_score += new_sched_scores.sum()
 
     max_mean_value = max([olddfc.loc[members[d], e+'.Value'].mean() for d in diffs])
     ephases = [ph for ph in phases if re.match(u.clean_regex(e), ph)]
@@ -368,4 +633,5 @@ def compute_score_change(olddf, newdf, diffs, e, events, locations, pools, phase
                         if oppc.sum() < location_thold * total_entries:
                             old_score += compute_distrib_contribution(oppc, ordered_pools, a4b)
                             new_score += compute_distrib_contribution(nppc, ordered_pools, a4b)
-    return (new_score-old_score)
+    scores['distribution'] = new_score - old_score
+    return _score_total(scores, return_components)
@@ -1,17 +1,24 @@
 import random
+from concurrent.futures import ProcessPoolExecutor
 from functools import reduce
+from math import ceil
 
-from pandas import Index, Series, DataFrame
-from numpy import exp
+from pandas import Index, Series, DataFrame, isna, concat
+from numpy import exp, log
 
 from . import compute as c
 from . import utilities as u
+from .problem import AssignmentProblem
+from ..utilities import get_pool_wave
 
 
 def _append_dummies(df, pk, events, locations, pools, xchar):
     full_cols = df.columns.tolist()
     loc_cols = list(set(sum((list(l) if isinstance(l, (list, tuple)) else [l] for l in locations), [])))
 
+    # Dummies of every event are collected and added in a single concat
+    dummies = [df]
+    start = df.index.max()+1
     for e in events:
         gs = df.groupby(e+'.Entry')[e].first()
         rmndr = gs.isin(pools[e] + [xchar]).sum() % len(pools[e])
@@ -21,18 +28,21 @@ def _append_dummies(df, pk, events, locations, pools, xchar):
                            + [1.0, 0.0, xchar] + ['Dummy'] * len(loc_cols))
                         for j in range(ndums)]
             dummy_cols = [pk, e+'.Entry', e+'.Weight', e+'.Value', e] + loc_cols
-            dummy_ix = Index(range(df.index.max()+1, df.index.max()+ndums+1),
-                             name=df.index.name)
-            df = df.append(DataFrame(dummy_df, index=dummy_ix, columns=dummy_cols), sort=False)
+            dummy_ix = Index(range(start, start+ndums), name=df.index.name)
+            dummies.append(DataFrame(dummy_df, index=dummy_ix, columns=dummy_cols))
+            start += ndums
 
+    if len(dummies) > 1:
+        df = concat(dummies, sort=False)
     return df[full_cols]
 
 
-def _set_initial_state(df, events, pools, xchar):
+def _set_initial_state(df, events, pools, xchar, init='random', locations=(), **kwargs):
     open_counts = Series([(df.groupby(e+'.Entry')[e].first() == xchar).sum() for e in events],
                          index=events)
     numer = open_counts * (open_counts-1) / 2
     entries = {}
+    capacity = {}
 
     for e in events:
         eps = df.groupby(e+'.Entry')[e].first()
@@ -45,9 +55,14 @@ def _set_initial_state(df, events, pools, xchar):
             all_pools.remove(p)
         pool_counts = Series(all_pools).value_counts()
         numer.loc[e] = numer.loc[e] - (pool_counts * (pool_counts-1) / 2).sum()
-        eps.loc[eps == xchar] = random.sample(all_pools, len(all_pools))
+        if init == 'greedy':
+            capacity[e] = pool_counts.to_dict()
+        else:
+            eps.loc[eps == xchar] = random.sample(all_pools, len(all_pools))
+            df[e] = df[e+'.Entry'].map(eps)
 
-        df[e] = df[e+'.Entry'].map(eps)
+    if init == 'greedy':
+        df = _greedy_fill(df, events, locations, pools, entries, capacity, xchar, **kwargs)
 
     denom = numer.sum()
     event_cutoffs = (numer / denom).cumsum()
@@ -55,73 +70,408 @@ def _set_initial_state(df, events, pools, xchar):
     return df, event_cutoffs, entries
 
 
-def _make_candidate_swap(df, cutoffs, entries):
+def _greedy_fill(df, events, locations, pools, entries, capacity, xchar, **kwargs):
+    placer = c.GreedyPlacement(df, events, locations, pools, xchar=xchar, **kwargs)
+    members = {e: df.groupby(e+'.Entry').groups for e in events}
+    values = {e: df.groupby(e+'.Entry')[e+'.Value'].mean() for e in events}
+
+    # Hardest entries first, each into its cheapest pool with room left
+    items = [(e, x) for e in events for x in entries[e]]
+    items.sort(key=lambda ex: placer.difficulty(ex[0], members[ex[0]][ex[1]], values[ex[0]][ex[1]]))
+    for e, x in items:
+        options = [p for p in pools[e] if capacity[e].get(p, 0) > 0]
+        pool = placer.choose(e, members[e][x], options, values[e][x])
+        placer.place(e, members[e][x], pool, values[e][x])
+        capacity[e][pool] -= 1
+        df.loc[members[e][x], e] = pool
+    return df
+
+
+def _make_candidate_swap(df, cutoffs, buckets, members=None):
     r = random.random()
     e = cutoffs.index[cutoffs.searchsorted(r)]
 
-    curr_pools = df.groupby(e+'.Entry')[e].first()
-
-    chosen = random.sample(entries[e], 2)
-    while curr_pools.loc[chosen[0]] == curr_pools.loc[chosen[1]]:
-        chosen = random.sample(entries[e], 2)
+    chosen = buckets.sample_pair(e)
 
     newdf = df.copy()
-    members = newdf.groupby(e+'.Entry').groups
-    newdf.loc[members[chosen[0]], e] = curr_pools.loc[chosen[1]]
-    newdf.loc[members[chosen[1]], e] = curr_pools.loc[chosen[0]]
+    if members is None:
+        members = {e: newdf.groupby(e+'.Entry').groups}
+    newdf.loc[members[e][chosen[0]], e] = buckets.label(e, chosen[1])
+    newdf.loc[members[e][chosen[1]], e] = buckets.label(e, chosen[0])
 
     return newdf, e, chosen
 
 
-def assign_pools(df, pk, events, locations, pools, external=None,
-                 xchar='xx', phase_transitions=None, true_events=None,
-                 max_iters=None, iter_check=None, tolerance=0, tau=None,
-                 return_full=False, return_scores=False, **kwargs):
-
-    cols = df.columns.tolist()
-    rows = df.index.tolist()
-
-    if df[pk].value_counts().max() > 1:
-        raise ValueError('Non-unique entries in primary key column')
+class ConflictProposal(object):
+    '''
+    Swap proposal distribution biased toward entries currently in conflict,
+    for use in place of uniform pool pair sampling. The first entry is drawn
+    with weight 1 + boost * (its number of conflicts), where an entry counts a
+    conflict for having a member whose schedule score is above its minimum
+    and, for each location, for sitting in a location/pool cell holding more
+    than its even share. The partner is drawn uniformly from the entries in
+    other pools. hastings_ratio gives the reverse to forward proposal
+    probability ratio that keeps the annealing valid.
+    '''
+    def __init__(self, df, xdf, events, locations, pools, buckets, members,
+                 phase_maps=None, xchar=None, external=None, boost=4.0,
+                 schedule_memo=None, **kwargs):
+        if phase_maps is None:
+            phase_maps = {}
+        self.events = events
+        self.boost = boost
+        self.buckets = buckets
+        self.members = members
+        self._phase_maps = phase_maps
+        self._xchar = xchar
+        self._external = external
+        self._kwargs = kwargs
+        self._locations = [list(l) if isinstance(l, (list, tuple)) else l for l in locations]
+        self._max_weight = 1 + boost * (1 + len(self._locations))
+
+        # Minimum schedule score of each row given its locked pools
+        dfc = u.add_phase_columns(phase_maps, df.copy(), events, xchar)
+        self._phases = dfc.filter(regex=r'[.]{2}[1-9][0-9]*$').columns.tolist()
+        wave_maps = u.get_phase_wave_maps(phase_maps, pools, events)
+        self._row_minimums = c.compute_schedule_minimums(dfc, self._phases, wave_maps,
+                                                         keep_assigned=True, xchar=xchar,
+                                                         external=external, memo=schedule_memo,
+                                                         **kwargs).to_dict()
+        self._row_hot = self._hot_rows(xdf, xdf.index)
+
+        self._entries = {}
+        self._places = {}
+        self._caps = {}
+        self._cells = {}
+        self._swappable = {}
+        self._entry_of = {}
+        self._hot = {}
+        self._total = {}
+        for e in events:
+            entries = list(buckets.labels(e).index)
+            self._entries[e] = entries
+            self._entry_of[e] = {ix: entry for entry in entries for ix in members[e][entry]}
+            self._hot[e] = {entry: sum(self._row_hot[ix] for ix in members[e][entry])
+                            for entry in entries}
+
+            # Location cell counts over every entry, moved or locked
+            eps = xdf.groupby(e+'.Entry').first()
+            eps = eps.loc[eps[e].isin(pools[e])]
+            places = {entry: self._entry_places(eps.loc[entry]) for entry in eps.index}
+            cells = {}
+            totals = {}
+            self._places[e] = places
+            for entry in places:
+                for cell in self._entry_cells(e, entry, eps.loc[entry, e]):
+                    cells[cell] = cells.get(cell, 0) + 1
+                    totals[cell[:2]] = totals.get(cell[:2], 0) + 1
+            self._cells[e] = cells
+            self._caps[e] = {k: ceil(n / len(pools[e])) for k, n in totals.items()}
+            swappable = {}
+            for entry in entries:
+                for cell in self._entry_cells(e, entry, buckets.label(e, entry)):
+                    swappable[cell] = swappable.get(cell, 0) + 1
+            self._swappable[e] = swappable
+            self._total[e] = sum(self._weight(e, entry, buckets.label(e, entry))
+                                 for entry in entries)
+
+    def _entry_places(self, sr):
+        places = []
+        for l in self._locations:
+            if isinstance(l, list):
+                plc = tuple(sr[l])
+                places.append(None if all(isna(v) for v in plc) else plc)
+            else:
+                places.append(None if isna(sr[l]) else sr[l])
+        return places
+
+    def _entry_cells(self, e, entry, pool):
+        return [(i, plc, pool) for i, plc in enumerate(self._places[e][entry]) if plc is not None]
+
+    def _hot_rows(self, df, rows):
+        dfc = u.add_phase_columns(self._phase_maps, df.loc[rows], self.events, self._xchar)
+        contribs = dfc.apply(c.compute_schedule_contribution, axis=1, args=(self._phases,),
+                             external=self._external, **self._kwargs)
+        return {ix: int(contribs[ix] > self._row_minimums[ix] + 1e-7) for ix in rows}
+
+    def _weight(self, e, entry, pool, hot=None, cells=None):
+        if hot is None:
+            hot = self._hot[e]
+        if cells is None:
+            cells = self._cells[e]
+        conflicts = int(hot[entry] > 0)
+        for cell in self._entry_cells(e, entry, pool):
+            conflicts += cells[cell] > self._caps[e][cell[:2]]
+        return 1 + self.boost * conflicts
+
+    def label(self, e, entry):
+        return self.buckets.label(e, entry)
+
+    def sample_pair(self, e):
+        ''' Pick an entry by weight, then a partner uniformly from other pools '''
+        entries = self._entries[e]
+        while True:
+            a = random.choice(entries)
+            if random.random() * self._max_weight < self._weight(e, a, self.buckets.label(e, a)):
+                break
+        pa = self.buckets.label(e, a)
+        b = random.choice(entries)
+        while self.buckets.label(e, b) == pa:
+            b = random.choice(entries)
+        return [a, b]
+
+    def _pair_probability(self, e, chosen, pools, weights, total):
+        n = len(self._entries[e])
+        return sum(w / (n - self.buckets.count(e, p)) for p, w in zip(pools, weights)) / total
+
+    def hastings_ratio(self, e, chosen, newdf):
+        '''
+        Ratio of the probabilities of proposing the reverse and forward swap,
+        holding the proposed state until accept is called
+        '''
+        a, b = chosen
+        pa, pb = self.buckets.label(e, a), self.buckets.label(e, b)
+        forward = self._pair_probability(e, chosen, [pa, pb],
+                                         [self._weight(e, a, pa), self._weight(e, b, pb)],
+                                         self._total[e])
+
+        rows = self.members[e][a].append(self.members[e][b])
+        hot_rows = self._hot_rows(newdf, rows)
+        new_hot = {entry: sum(hot_rows[ix] for ix in self.members[e][entry]) for entry in chosen}
+
+        # Weight change over every entry in the cells the swap touches
+        cell_changes = {}
+        for entry, old, new in [(a, pa, pb), (b, pb, pa)]:
+            for cell in self._entry_cells(e, entry, old):
+                cell_changes[cell] = cell_changes.get(cell, 0) - 1
+            for cell in self._entry_cells(e, entry, new):
+                cell_changes[cell] = cell_changes.get(cell, 0) + 1
+        cells = dict(self._cells[e])
+        swappable = dict(self._swappable[e])
+        conflict_change = sum(int(new_hot[entry] > 0) - int(self._hot[e][entry] > 0)
+                              for entry in chosen)
+        for cell, d in cell_changes.items():
+            cap = self._caps[e][cell[:2]]
+            old_n, old_over = swappable.get(cell, 0), self._cells[e].get(cell, 0) > cap
+            cells[cell] = cells.get(cell, 0) + d
+            swappable[cell] = old_n + d
+            conflict_change += swappable[cell] * (cells[cell] > cap) - old_n * old_over
+        total = self._total[e] + self.boost * conflict_change
+
+        hot = {**self._hot[e], **new_hot}
+        reverse = self._pair_probability(e, chosen, [pb, pa],
+                                         [self._weight(e, a, pb, hot, cells),
+                                          self._weight(e, b, pa, hot, cells)],
+                                         total)
+        self._pending = (e, chosen, hot_rows, cells, swappable, total)
+        return reverse / forward
+
+    def accept(self):
+        ''' Update the conflict state to the last proposed swap '''
+        e, chosen, hot_rows, cells, swappable, total = self._pending
+        self._cells[e] = cells
+        self._swappable[e] = swappable
+        self._total[e] = total
+        for ix, h in hot_rows.items():
+            d = h - self._row_hot[ix]
+            if d == 0:
+                continue
+            self._row_hot[ix] = h
+            for f in self.events:
+                entry = self._entry_of[f].get(ix)
+                if entry is None:
+                    continue
+                if f == e:
+                    self._hot[f][entry] += d
+                else:
+                    pool = self.buckets.label(f, entry)
+                    old_weight = self._weight(f, entry, pool)
+                    self._hot[f][entry] += d
+                    self._total[f] += self._weight(f, entry, pool) - old_weight
+
+
+def _event_components(df, events, pools, phase_maps, true_events=None):
+    '''
+    Group events into independent subproblems: two events interact only if
+    some entrant is in both and their pools (in any phase) share a block.
+    True events outside events are linked the same way through their (first
+    phase) pools, and go in the component of the events they touch, or with
+    the first component if they touch none
+    '''
+    extra = [t for t in (true_events or []) if t not in events]
+    nodes = events + extra
+    blocks = {}
+    for e in nodes:
+        epools = phase_maps[e].stack().unique().tolist() if e in phase_maps and e in events \
+            else pools[e]
+        blocks[e] = set(''.join(get_pool_wave(p) or '' for p in epools))
+    entered = df[nodes].notna()
+
+    parent = {e: e for e in nodes}
+    def find(e):
+        while parent[e] != e:
+            e = parent[e]
+        return e
+    for i, e in enumerate(nodes):
+        for f in nodes[i+1:]:
+            if blocks[e] & blocks[f] and (entered[e] & entered[f]).any():
+                parent[find(f)] = find(e)
+
+    components = {}
+    for e in nodes:
+        components.setdefault(find(e), []).append(e)
+    # Components of fixed true events alone have nothing to assign, but their
+    # schedule still counts towards the scores
+    components = list(components.values())
+    fixed = [comp for comp in components if not set(comp) & set(events)]
+    components = [comp for comp in components if set(comp) & set(events)]
+    for comp in fixed:
+        components[0].extend(comp)
+    return components
+
+
+def _assign_component(seed, *args, **kwargs):
+    random.seed(seed)
+    return assign_pools(*args, **kwargs)
+
+
+def _assign_components(components, df, pk, events, locations, pools, phase_transitions,
+                       true_events, max_iters, tolerance, return_full, return_scores,
+                       return_components, return_iters, max_workers, **kwargs):
+    comp_events = [[e for e in comp if e in events] for comp in components]
+    # Split the iteration budget and tolerance as the single chain would,
+    # by the number of candidate swaps in each component
+    opens = (df == kwargs['xchar']).sum()
+    sizes = [sum(opens[e] * (opens[e]-1) / 2 for e in evs) for evs in comp_events]
+    total_size = sum(sizes)
+    jobs = []
+    for comp, evs, size in zip(components, comp_events, sizes):
+        job = dict(events=evs,
+                   phase_transitions={e: phase_transitions[e] for e in evs
+                                      if e in phase_transitions},
+                   true_events=[t for t in true_events or [] if t in comp] or None)
+        if size == 0:
+            # Nothing to swap (e.g. every entry is pre-assigned), so the
+            # component is only scored, with its assignment copied through
+            job.update(max_iters=0, tolerance=0)
+        else:
+            share = size / total_size
+            job.update(max_iters=None if max_iters is None else max(ceil(max_iters * share), 1),
+                       tolerance=tolerance * share)
+        jobs.append(job)
+    # Each component only needs the rows of its own entrants (of events and
+    # true events)
+    frames = [df.loc[df[comp].notna().any(axis=1)].copy() for comp in components]
+    common = dict(pk=pk, locations=locations, pools=pools, return_full=return_full,
+                  return_scores=True, return_components=return_components, return_iters=True,
+                  decompose=False, **kwargs)
+
+    if max_workers is not None and max_workers > 1:
+        with ProcessPoolExecutor(max_workers) as executor:
+            futures = [executor.submit(_assign_component, random.getrandbits(32), frame,
+                                       **job, **common) for frame, job in zip(frames, jobs)]
+            results = [f.result() for f in futures]
+    else:
+        results = [assign_pools(frame, **job, **common) for frame, job in zip(frames, jobs)]
 
-    if phase_transitions is None:
-        phase_transitions = {}
-    phase_maps = u.maps_from_transitions(phase_transitions, pools)
+    xdf = df.copy()
+    curr_score = {} if return_components else 0.0
+    min_score = {} if return_components else 0.0
+    iters = 0
+    dummies = []
+    for evs, frame, (res, cs, ms, its) in zip(comp_events, frames, results):
+        xdf.loc[frame.index, evs] = res.loc[frame.index, evs]
+        if return_components:
+            curr_score = {k: curr_score.get(k, 0.0) + v for k, v in cs.items()}
+            min_score = {k: min_score.get(k, 0.0) + v for k, v in ms.items()}
+        else:
+            curr_score += cs
+            min_score += ms
+        iters += its
+        dummies.append(res.loc[~res.index.isin(frame.index)])
+    if return_full:
+        dummies = concat(dummies, sort=False)
+        dummies.index = Index(range(df.index.max()+1, df.index.max()+len(dummies)+1),
+                              name=df.index.name)
+        xdf = concat([xdf, dummies], sort=False)
 
-    df = u.add_entry_columns(df, events, pk)
-    df = u.add_value_columns(df, events)
+    res = (xdf, curr_score, min_score) if return_scores else (xdf,)
+    if return_iters:
+        res += (iters,)
+    return res if len(res) > 1 else xdf
 
-    df = _append_dummies(df, pk, events, locations, pools, xchar)
 
-    if external:
-        df[external] = df[external].fillna('')
+def assign_pools(df, pk=None, events=None, locations=None, pools=None, external=None,
+                 xchar='xx', phase_transitions=None, true_events=None,
+                 max_iters=None, iter_check=None, tolerance=0, tau=None,
+                 return_full=False, return_scores=False, return_components=False,
+                 return_iters=False, proposal='uniform', proposal_boost=4.0, init='random',
+                 decompose=False, max_workers=None, schedule_cache_size=4096, **kwargs):
 
-    for e in events:
-        if (df.groupby(e+'.Entry')[e].nunique(dropna=False) != 1).any():
-            raise ValueError('Members of entry in {} have dissimilar assignments'.format(e))
+    # Problem-level settings come from the problem when one is passed
+    if isinstance(df, AssignmentProblem):
+        problem = df
+    else:
+        problem = AssignmentProblem(df, pk, events, locations, pools, external=external,
+                                    xchar=xchar, phase_transitions=phase_transitions,
+                                    true_events=true_events,
+                                    schedule_cache_size=schedule_cache_size)
+    settings = problem.settings()
+    pk, events, locations, pools = (settings[k] for k in ('pk', 'events', 'locations', 'pools'))
+    external, xchar, true_events = settings['external'], settings['xchar'], settings['true_events']
+    phase_transitions = settings['phase_transitions']
+    phase_maps = dict(problem.phase_maps)
+
+    cols = list(problem.columns)
+    rows = list(problem.rows)
+
+    if decompose:
+        components = _event_components(problem.df, events, pools, phase_maps, true_events)
+        if len(components) > 1:
+            return _assign_components(components, problem.df, pk, events, locations, pools,
+                                      phase_transitions, true_events, max_iters, tolerance,
+                                      return_full, return_scores, return_components,
+                                      return_iters, max_workers,
+                                      external=external, xchar=xchar, iter_check=iter_check,
+                                      tau=tau, proposal=proposal,
+                                      proposal_boost=proposal_boost, init=init,
+                                      schedule_cache_size=schedule_cache_size, **kwargs)
+
+    df = problem.pool_frame
 
     if max_iters is None:
         max_iters = 50 * df[events].notna().sum().sum()
     tau = u.tau_values(tau, max_iters)
 
-    min_score = c.compute_minimum_score(df, events, locations, pools, xchar=xchar,
-                                        phase_maps=phase_maps, external=external,
-                                        **kwargs)
-    if true_events:
-        min_score += c.compute_minimum_score(df, true_events, locations, pools, xchar=xchar,
-                                             external=external, phase_distrib_calc='none', **kwargs)
+    schedule_memo = problem.schedule_memo
+    min_scores = problem.minimum_score(return_components=True, **kwargs)
+    min_score = sum(min_scores.values())
 
     # Set Initial State
     xdf = df.copy()
-    xdf, event_cutoffs, swappable_entries = _set_initial_state(xdf, events, pools, xchar)
+    if init not in ('random', 'greedy'):
+        raise ValueError("Unknown init '{}', must be 'random' or 'greedy'".format(init))
+    xdf, event_cutoffs, swappable_entries = _set_initial_state(xdf, events, pools, xchar, init=init,
+                                                               locations=locations,
+                                                               phase_maps=phase_maps,
+                                                               external=external, **kwargs)
+    buckets = u.PoolBuckets({e: xdf.groupby(e+'.Entry')[e].first().loc[swappable_entries[e]]
+                             for e in events})
+    members = problem.members
+    if proposal == 'conflict':
+        proposer = ConflictProposal(df, xdf, events, locations, pools, buckets, members,
+                                    phase_maps=phase_maps, xchar=xchar, external=external,
+                                    boost=proposal_boost, schedule_memo=schedule_memo, **kwargs)
+    elif proposal == 'uniform':
+        proposer = buckets
+    else:
+        raise ValueError("Unknown proposal '{}', must be 'uniform' or 'conflict'".format(proposal))
 
-    curr_score = c.compute_current_score(xdf, events, locations, pools,
-                                         phase_maps=phase_maps, external=external,
-                                         **kwargs)
-    if true_events:
-        curr_score += c.compute_current_score(xdf, true_events, locations, pools,
-                                              external=external, phase_distrib_calc='none',
-                                              **kwargs)
+    curr_scores = c.compute_current_score(xdf, events, locations, pools,
+                                          phase_maps=phase_maps, external=external,
+                                          true_events=true_events, return_components=True,
+                                          **kwargs)
+    curr_score = sum(curr_scores.values())
 
     counter = 0
     total_swaps_made = 0
@@ -129,21 +479,29 @@ def assign_pools(df, pk, events, locations, pools, external=None,
         if iter_check and counter % iter_check == 0:
             print(counter, curr_score, min_score, total_swaps_made)
 
-        newdf, e, chosen = _make_candidate_swap(xdf, event_cutoffs, swappable_entries)
+        newdf, e, chosen = _make_candidate_swap(xdf, event_cutoffs, proposer, members)
 
-        score_change = c.compute_score_change(xdf, newdf, chosen, e, events, locations, pools,
-                                              phase_maps=phase_maps, external=external,
-                                              **kwargs)
-        if true_events and e in true_events:
-            score_change += c.compute_score_change(xdf, newdf, chosen, e, true_events, locations, pools,
-                                                   external=external, phase_distrib_calc='none',
-                                                   **kwargs)
+        score_changes = c.compute_score_change(xdf, newdf, chosen, e, events, locations, pools,
+                                               phase_maps=phase_maps, external=external,
+                                               true_events=true_events, return_components=True,
+                                               **kwargs)
+        score_change = sum(score_changes.values())
 
-        q = 1 if score_change < 0 else exp(-tau[counter] * score_change)
+        if proposal == 'conflict':
+            # Hastings correction for the non-uniform proposal
+            x = -tau[counter] * score_change + log(proposer.hastings_ratio(e, chosen, newdf))
+            q = 1 if x >= 0 else exp(x)
+        else:
+            q = 1 if score_change < 0 else exp(-tau[counter] * score_change)
         r = random.random()
         if r < q:
             xdf = newdf
+            if proposal == 'conflict':
+                proposer.accept()
+            buckets.swap(e, *chosen)
             curr_score += score_change
+            for k, v in score_changes.items():
+                curr_scores[k] += v
             total_swaps_made += 1
 
         counter += 1
@@ -158,7 +516,9 @@ def assign_pools(df, pk, events, locations, pools, external=None,
     else:
         xdf = xdf.loc[rows, cols]
 
+    res = (xdf,)
     if return_scores:
-        return xdf, curr_score, min_score
-    else:
-        return xdf
+        res += (curr_scores, dict(min_scores)) if return_components else (curr_score, min_score)
+    if return_iters:
+        res += (counter,)
+    return res if len(res) > 1 else xdf
@@ -0,0 +1,139 @@
+import copy
+from types import MappingProxyType
+
+from . import compute as c
+from . import utilities as u
+
+
+def _settings_key(kwargs):
+    # Hashable form of scoring settings, or None if a setting is unhashable
+    key = tuple(sorted(kwargs.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class AssignmentProblem(object):
+    '''
+    Registrations and settings of a pool assignment problem, preprocessed once
+    so that assign_pools, assign_seed_pools and the analyze functions can be
+    run on it repeatedly without redoing the setup. Pass it in place of df to
+    assign_pools and assign_seed_pools, and in place of events to the find_*
+    analyzers (or as problem to get_distribution).
+
+    The phase maps, phase pools and wave maps are built once, entry columns are
+    added once, minimum scores are cached per scoring settings, and schedule
+    minimums are memoized across runs. All of these are read-only.
+    '''
+    def __init__(self, df, pk, events, locations, pools, external=None, xchar='xx',
+                 phase_transitions=None, true_events=None, schedule_cache_size=4096):
+        if df[pk].value_counts().max() > 1:
+            raise ValueError('Non-unique entries in primary key column')
+
+        self.pk = pk
+        self.events = tuple(events)
+        self.locations = tuple(locations)
+        self.pools = MappingProxyType({e: tuple(pools[e]) for e in pools})
+        self.external = external
+        self.xchar = xchar
+        self.true_events = None if true_events is None else tuple(true_events)
+        self.columns = tuple(df.columns)
+        self.rows = tuple(df.index)
+
+        # maps_from_transitions normalizes transitions in place, so keep a copy
+        self.phase_transitions = MappingProxyType(copy.deepcopy(phase_transitions or {}))
+        self._pools_lists = {e: list(p) for e, p in self.pools.items()}
+        phase_maps = u.maps_from_transitions(copy.deepcopy(phase_transitions or {}),
+                                             self._pools_lists)
+        self.phase_maps = MappingProxyType(phase_maps)
+        self.phase_pools = MappingProxyType(u.get_phase_pools(phase_maps, self._pools_lists,
+                                                              self.events))
+        self.wave_maps = MappingProxyType(u.get_phase_wave_maps(phase_maps, self._pools_lists,
+                                                                self.events))
+
+        self._df = df.copy()
+        entries = u.add_entry_columns(df.copy(), self.events, pk)
+        if external is not None:
+            entries[external] = entries[external].fillna('')
+        self._entries = entries
+
+        self.schedule_memo = c.ScheduleMemo(maxsize=schedule_cache_size)
+        self._pool_frame = None
+        self._members = None
+        self._cache = {}
+
+    def __repr__(self):
+        return '{}(events={!r}, entrants={})'.format(self.__class__.__name__,
+                                                     list(self.events), len(self.rows))
+
+    @property
+    def df(self):
+        ''' Copy of the registrations as given '''
+        return self._df.copy()
+
+    @property
+    def entries(self):
+        ''' Copy of the registrations with entry and weight columns '''
+        return self._entries.copy()
+
+    @property
+    def pool_frame(self):
+        '''
+        Copy of the registrations prepared for assign_pools, with entry, weight
+        and value columns and dummy entries filling out the pools
+        '''
+        if self._pool_frame is None:
+            from .pools import _append_dummies
+            df = u.add_value_columns(self._entries.copy(), self.events)
+            df = _append_dummies(df, self.pk, self.events, list(self.locations),
+                                 self._pools_lists, self.xchar)
+            if self.external is not None:
+                df[self.external] = df[self.external].fillna('')
+            for e in self.events:
+                if (df.groupby(e+'.Entry')[e].nunique(dropna=False) != 1).any():
+                    raise ValueError('Members of entry in {} have dissimilar assignments'.format(e))
+            self._pool_frame = df
+        return self._pool_frame.copy()
+
+    @property
+    def members(self):
+        '''
+        Row labels of the members of each entry of each event in pool_frame,
+        as (immutable) indexes
+        '''
+        if self._members is None:
+            df = self._pool_frame if self._pool_frame is not None else self.pool_frame
+            self._members = MappingProxyType({e: MappingProxyType(dict(df.groupby(e+'.Entry').groups))
+                                              for e in self.events})
+        return self._members
+
+    def cached(self, key, compute):
+        ''' Return the cached value for key, computing and storing it if missing '''
+        if key is None:
+            return compute()
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def minimum_score(self, return_components=False, **kwargs):
+        ''' Minimum score of the pool assignment, cached per scoring settings '''
+        settings = _settings_key(kwargs)
+        scores = self.cached(None if settings is None else ('minimum_score', settings),
+                             lambda: c.compute_minimum_score(
+                                 self._pool_frame if self._pool_frame is not None else self.pool_frame,
+                                 list(self.events), list(self.locations), self._pools_lists,
+                                 xchar=self.xchar, phase_maps=dict(self.phase_maps),
+                                 external=self.external, schedule_memo=self.schedule_memo,
+                                 true_events=None if self.true_events is None else list(self.true_events),
+                                 return_components=True, **kwargs))
+        return dict(scores) if return_components else sum(scores.values())
+
+    def settings(self):
+        ''' Keyword arguments recreating the problem-level settings of a call '''
+        return dict(pk=self.pk, events=list(self.events), locations=list(self.locations),
+                    pools={e: list(p) for e, p in self.pools.items()},
+                    external=self.external, xchar=self.xchar,
+                    phase_transitions=copy.deepcopy(dict(self.phase_transitions)),
+                    true_events=None if self.true_events is None else list(self.true_events))
@@ -12,6 +12,7 @@ from numpy.random import permutation
 
 from . import compute as c
 from . import utilities as u
+from .problem import AssignmentProblem, _settings_key
 
 from ..utilities import get_pool_wave, reverse_seed_map, bracket_sections
 
@@ -220,6 +221,37 @@ def _set_initial_pool_state(df, events, seed_smap, pool_order):
     return df
 
 
+def _greedy_seed_state(df, events, key_events, locations, pools, seed_smap, pool_order,
+                       xchar, **kwargs):
+    gdf = df.copy()
+    for k in key_events:
+        gdf.loc[gdf[k+'.Seed'].notna(), k] = xchar
+    placer = c.GreedyPlacement(gdf, events, locations, pools, xchar=xchar, **kwargs)
+
+    items = []
+    open_seeds = {}
+    for k in key_events:
+        f = k+'.Seed'
+        members = df.groupby(f+'.Entry').groups
+        values = df.groupby(f+'.Entry')[f+'.Value'].mean()
+        seeds = df.groupby(f+'.Entry')[f].first()
+        for v, xs in values.groupby(values).groups.items():
+            open_seeds[(k, v)] = seeds.loc[xs].tolist()
+        items.extend((k, members[x], values[x]) for x in values.index)
+
+    # Hardest entries first, each onto the seed in its value tier with the cheapest pool
+    items.sort(key=lambda it: placer.difficulty(*it))
+    for k, rows, v in items:
+        seed_pools = {sd: pool_order[k][seed_smap[k][sd]] for sd in open_seeds[(k, v)]}
+        pool = placer.choose(k, rows, sorted(set(seed_pools.values())), v)
+        seed = random.choice([sd for sd, p in seed_pools.items() if p == pool])
+        open_seeds[(k, v)].remove(seed)
+        placer.place(k, rows, pool, v)
+        df.loc[rows, k+'.Seed'] = seed
+        df.loc[rows, k] = pool
+    return df
+
+
 def _select_swap_type(swapevent_cutoffs):
     r = random.random()
     swap, e = swapevent_cutoffs.index[swapevent_cutoffs.searchsorted(r)]
@@ -229,27 +261,23 @@ def _select_swap_type(swapevent_cutoffs):
     return swap, e
 
 
-def _make_seed_swap(df, e, cutoffs, entries):
+def _make_seed_swap(df, e, cutoffs, entries, buckets, members):
     r = random.random()
     v = cutoffs.index[cutoffs.searchsorted(r)]
 
     f = e+'.Seed'
-    curr_seeds = df.groupby(f+'.Entry')[f].first()
-    curr_pools = df.groupby(e+'.Entry')[e].first()
-
     chosen = random.sample(entries[v], 2)
 
     newdf = df.copy()
-    members = newdf.groupby(f+'.Entry').groups
-    newdf.loc[members[chosen[0]], f] = curr_seeds.loc[chosen[1]]
-    newdf.loc[members[chosen[1]], f] = curr_seeds.loc[chosen[0]]
-    newdf.loc[members[chosen[0]], e] = curr_pools.loc[chosen[1]]
-    newdf.loc[members[chosen[1]], e] = curr_pools.loc[chosen[0]]
+    newdf.loc[members[e][chosen[0]], f] = buckets.label(f, chosen[1])
+    newdf.loc[members[e][chosen[1]], f] = buckets.label(f, chosen[0])
+    newdf.loc[members[e][chosen[0]], e] = buckets.label(e, chosen[1])
+    newdf.loc[members[e][chosen[1]], e] = buckets.label(e, chosen[0])
 
-    return newdf, chosen, (curr_pools.loc[chosen].nunique() == 1)
+    return newdf, chosen, (buckets.label(e, chosen[0]) == buckets.label(e, chosen[1]))
 
 
-def _make_order_swap(pool_order, df, e, reorder_options, seed_smap):
+def _make_order_swap(pool_order, df, e, reorder_options, seed_smap, buckets):
     new_pool_order = pool_order.copy()
 
     flip = random.choice(reorder_options)
@@ -257,7 +285,7 @@ def _make_order_swap(pool_order, df, e, reorder_options, seed_smap):
 
     # Get changed indexes
     f = e+'.Seed'
-    curr_seeds = df.groupby(f+'.Entry')[f].first()
+    curr_seeds = buckets.labels(f)
     is_flipped = curr_seeds.map(seed_smap).isin(flip[0])
     flipped = curr_seeds.loc[is_flipped].index.tolist()
 
@@ -269,26 +297,33 @@ def _make_order_swap(pool_order, df, e, reorder_options, seed_smap):
     return new_pool_order, newdf, flipped
 
 
-def assign_seed_pools(df, pk, events, locations, pools, external=None,
+def assign_seed_pools(df, pk=None, events=None, locations=None, pools=None, external=None,
                       xchar='xx', phase_transitions=None, init_pool_order=None,
                       reorder_method=None, true_events=None,
                       max_iters=None, iter_check=None, tolerance=0, tau=None,
-                      return_scores=False, return_order=True, return_seeds=False, **kwargs):
-
-    cols = df.columns.tolist()
-    rows = df.index.tolist()
+                      return_scores=False, return_order=True, return_seeds=False,
+                      return_components=False, return_iters=False, schedule_cache_size=4096, init='random', **kwargs):
 
-    if df[pk].value_counts().max() > 1:
-        raise ValueError('Non-unique entries in primary key column')
+    # Problem-level settings come from the problem when one is passed
+    if isinstance(df, AssignmentProblem):
+        problem = df
+    else:
+        problem = AssignmentProblem(df, pk, events, locations, pools, external=external,
+                                    xchar=xchar, phase_transitions=phase_transitions,
+                                    true_events=true_events,
+                                    schedule_cache_size=schedule_cache_size)
+    settings = problem.settings()
+    pk, events, locations, pools = (settings[k] for k in ('pk', 'events', 'locations', 'pools'))
+    external, xchar, true_events = settings['external'], settings['xchar'], settings['true_events']
+    phase_maps = dict(problem.phase_maps)
 
-    if phase_transitions is None:
-        phase_transitions = {}
-    phase_maps = u.maps_from_transitions(phase_transitions, pools)
+    cols = list(problem.columns)
+    rows = list(problem.rows)
 
-    df = u.add_entry_columns(df, events, pk)
+    if init not in ('random', 'greedy'):
+        raise ValueError("Unknown init '{}', must be 'random' or 'greedy'".format(init))
 
-    if external is not None:
-        df[external] = df[external].fillna('')
+    df = problem.entries
 
     key_events = [e for e in events if e+'.Value' in df.columns and df[e+'.Value'].notna().any()]
     key_event_values = [e+'.Value' for e in key_events]
@@ -320,17 +355,25 @@ def assign_seed_pools(df, pk, events, locations, pools, external=None,
     sdf = u.add_value_columns(sdf, events)
     sdf = _add_seed_entry_columns(sdf, key_events)
 
-    # Compute minimum score
-    min_score_seed = c.compute_minimum_score(sdf, sd_events, locations, sd_pools,
-                                             bracket_accounting='all', skip_schedule=True,
-                                             phase_distrib_calc='first', **kwargs)
-    min_score_pool = c.compute_minimum_score(sdf, events, locations, pools, xchar=xchar,
-                                             phase_maps=phase_maps, external=external,
-                                             phase_distrib_calc='max', **kwargs)
-    if true_events:
-        min_score_pool += c.compute_minimum_score(sdf, true_events, locations, pools,
-                                                  xchar=xchar, external=external,
-                                                  phase_distrib_calc='none', **kwargs)
+    # Compute minimum score, which does not depend on the random initial seeds
+    # so is kept by the problem for reruns with the same settings
+    min_key = _settings_key(kwargs)
+    min_score_seed = problem.cached(
+        None if min_key is None else ('seed_minimum_score', min_key),
+        lambda: c.compute_minimum_score(sdf, sd_events, locations, sd_pools,
+                                        bracket_accounting='all', skip_schedule=True,
+                                        phase_distrib_calc='first', **kwargs))
+    # Bounded LRU of schedule minimums by entrant signature (assigned pools,
+    # unassigned phases, external conflicts), reused across iterations and runs
+    schedule_memo = problem.schedule_memo
+    min_scores_pool = problem.cached(
+        None if min_key is None else ('seed_pool_minimum_score', min_key),
+        lambda: c.compute_minimum_score(sdf, events, locations, pools, xchar=xchar,
+                                        phase_maps=phase_maps, external=external,
+                                        phase_distrib_calc='max', schedule_memo=schedule_memo,
+                                        true_events=true_events, return_components=True,
+                                        **kwargs))
+    min_score_pool = sum(min_scores_pool.values())
 
     if iter_check:
         print(min_score_seed, min_score_pool)
@@ -338,26 +381,36 @@ def assign_seed_pools(df, pk, events, locations, pools, external=None,
     scale_factor = 1 if min_score_seed <= min_score_pool else min_score_pool / min_score_seed
 
     min_score = min_score_seed * scale_factor + min_score_pool
+    min_scores = {'seed_distribution': min_score_seed * scale_factor, **min_scores_pool}
 
     #map seeds to pools
     sdf = _set_initial_pool_state(sdf, key_events, seed_smap, curr_pool_order)
+    if init == 'greedy':
+        sdf = _greedy_seed_state(sdf, events, key_events, locations, pools, seed_smap,
+                                 curr_pool_order, xchar, phase_maps=phase_maps,
+                                 external=external, **kwargs)
+
+    # Current seed and pool of each seeded entry, kept in step with sdf
+    buckets = u.PoolBuckets({g: sdf.groupby(k+'.Seed.Entry')[g].first()
+                             for k in key_events for g in (k, k+'.Seed')})
+    members = {k: sdf.groupby(k+'.Seed.Entry').groups for k in key_events}
 
     #compute current score
     curr_score_seed = c.compute_current_score(sdf, sd_events, locations, sd_pools,
                                               bracket_accounting='all', pool_order=sd_order,
                                               skip_schedule=True, phase_distrib_calc='first', **kwargs)
-    curr_score_pool = c.compute_current_score(sdf, events, locations, pools, xchar=xchar,
-                                              phase_maps=phase_maps, external=external,
-                                              min_schedule_calc=True, phase_distrib_calc='max', **kwargs)
-    if true_events:
-        curr_score_pool += c.compute_current_score(sdf, true_events, locations, pools, xchar=xchar,
-                                                   external=external, min_schedule_calc=True,
-                                                   phase_distrib_calc='none', **kwargs)
+    curr_scores_pool = c.compute_current_score(sdf, events, locations, pools, xchar=xchar,
+                                               phase_maps=phase_maps, external=external,
+                                               min_schedule_calc=True, phase_distrib_calc='max',
+                                               schedule_memo=schedule_memo, true_events=true_events,
+                                               return_components=True, **kwargs)
+    curr_score_pool = sum(curr_scores_pool.values())
 
     if iter_check:
         print(curr_score_seed, curr_score_pool)
 
     curr_score = curr_score_seed * scale_factor + curr_score_pool
+    curr_scores = {'seed_distribution': curr_score_seed * scale_factor, **curr_scores_pool}
 
     counter = 0
     swaps_made = {'Seed': 0, 'Order': 0}
@@ -368,7 +421,8 @@ def assign_seed_pools(df, pk, events, locations, pools, external=None,
         swap, e = _select_swap_type(swapevent_cutoffs)
 
         if swap == 'Seed':
-            newdf, chosen, same_pool = _make_seed_swap(sdf, e, value_cutoffs[e], swappable_entries[e])
+            newdf, chosen, same_pool = _make_seed_swap(sdf, e, value_cutoffs[e], swappable_entries[e],
+                                                      buckets, members)
             new_pool_order = curr_pool_order[e]
 
             # get seed score change
@@ -380,31 +434,33 @@ def assign_seed_pools(df, pk, events, locations, pools, external=None,
                 score_change_seed = 0
             # get pool score change
             if not same_pool:
-                score_change_pool = c.compute_score_change(sdf, newdf, chosen, e, events, locations, pools,
-                                                           xchar=xchar, phase_maps=phase_maps, external=external,
-                                                           min_schedule_calc=True, phase_distrib_calc='max', **kwargs)
-                if true_events:
-                    score_change_pool += c.compute_score_change(sdf, newdf, chosen, e, true_events, locations,
-                                                                pools, xchar=xchar, external=external,
-                                                                min_schedule_calc=True, phase_distrib_calc='none', **kwargs)
+                score_changes = c.compute_score_change(sdf, newdf, chosen, e, events, locations, pools,
+                                                       xchar=xchar, phase_maps=phase_maps, external=external,
+                                                       min_schedule_calc=True, phase_distrib_calc='max',
+                                                       schedule_memo=schedule_memo, true_events=true_events,
+                                                       return_components=True, **kwargs)
+                score_change_pool = sum(score_changes.values())
             else:
+                score_changes = {}
                 score_change_pool = 0
 
             score_change = score_change_seed * scale_factor + score_change_pool
+            score_changes['seed_distribution'] = score_change_seed * scale_factor
 
         elif swap == 'Order':
-            new_pool_order, newdf, flipped = _make_order_swap(curr_pool_order[e], sdf, e, reorder_options[e], seed_smap[e])
+            new_pool_order, newdf, flipped = _make_order_swap(curr_pool_order[e], sdf, e, reorder_options[e],
+                                                                seed_smap[e], buckets)
 
             #get pool score change
             if not (curr_pool_order[e].map(get_pool_wave) == new_pool_order.map(get_pool_wave)).all():
-                score_change = c.compute_score_change(sdf, newdf, flipped, e, events, locations, pools,
-                                                      xchar=xchar, phase_maps=phase_maps, external=external,
-                                                      min_schedule_calc=True, phase_distrib_calc='none', **kwargs)
-                if true_events:
-                    score_change += c.compute_score_change(sdf, newdf, flipped, e, true_events, locations,
-                                                           pools, xchar=xchar, external=external,
-                                                           min_schedule_calc=True, phase_distrib_calc='none', **kwargs)
+                score_changes = c.compute_score_change(sdf, newdf, flipped, e, events, locations, pools,
+                                                       xchar=xchar, phase_maps=phase_maps, external=external,
+                                                       min_schedule_calc=True, phase_distrib_calc='none',
+                                                       schedule_memo=schedule_memo, true_events=true_events,
+                                                       return_components=True, **kwargs)
+                score_change = sum(score_changes.values())
             else:
+                score_changes = {}
                 score_change = 0
 
         q = 1 if score_change < 0 else exp(-tau[counter] * score_change)
@@ -412,7 +468,15 @@ def assign_seed_pools(df, pk, events, locations, pools, external=None,
         if r < q:
             sdf = newdf
             curr_pool_order[e] = new_pool_order
+            if swap == 'Seed':
+                buckets.swap(e, *chosen)
+                buckets.swap(e+'.Seed', *chosen)
+            else:
+                for entry in flipped:
+                    buckets.move(e, entry, new_pool_order[seed_smap[e][buckets.label(e+'.Seed', entry)]])
             curr_score += score_change
+            for k, v in score_changes.items():
+                curr_scores[k] += v
             swaps_made[swap] += 1
 
         counter += 1
@@ -421,11 +485,9 @@ def assign_seed_pools(df, pk, events, locations, pools, external=None,
         print(counter, curr_score, min_score, swaps_made['Seed'], swaps_made['Order'])
 
     # Merge back into df
-    sdf = sdf.append(udf, sort=False).sort_index()
+    sdf = concat([sdf, udf], sort=False).sort_index()
 
     # Return df AND current orders
-    df = df.loc[rows, cols]
-
     sdf = sdf.loc[rows]
 
     if return_seeds:
@@ -433,13 +495,9 @@ def assign_seed_pools(df, pk, events, locations, pools, external=None,
     else:
         sdf = sdf[cols]
 
-    if return_order:
-        if return_scores:
-            return sdf, curr_pool_order, curr_score, min_score
-        else:
-            return sdf, curr_pool_order
-    else:
-        if return_scores:
-            return sdf, curr_score, min_score
-        else:
-            return sdf
+    res = (sdf, curr_pool_order) if return_order else (sdf,)
+    if return_scores:
+        res += (curr_scores, min_scores) if return_components else (curr_score, min_score)
+    if return_iters:
+        res += (counter,)
+    return res if len(res) > 1 else sdf
@@ -9,6 +9,79 @@ from numpy import logspace, log10, array, ndarray
 from ..utilities import get_pool_wave
 
 
+class PoolBuckets(object):
+    '''
+    Per-event buckets of swappable entries by their current pool (or any
+    other label, e.g. seed), supporting constant time sampling of a pair of
+    entries in different pools and constant time updates after a swap.
+
+    assignments: dict mapping each event to a Series (or dict) of the
+                 current pool of each swappable entry
+    '''
+    def __init__(self, assignments):
+        self._buckets = {}
+        self._position = {}
+        self._label = {}
+        self._labels = {}
+        for e, assigned in assignments.items():
+            buckets = {}
+            position = {}
+            for entry, label in dict(assigned).items():
+                bucket = buckets.setdefault(label, [])
+                position[entry] = len(bucket)
+                bucket.append(entry)
+            self._buckets[e] = buckets
+            self._position[e] = position
+            self._label[e] = dict(assigned)
+            self._labels[e] = list(buckets)
+
+    def label(self, e, entry):
+        return self._label[e][entry]
+
+    def labels(self, e):
+        return Series(self._label[e], dtype='O')
+
+    def count(self, e, label):
+        return len(self._buckets[e].get(label, ()))
+
+    def sample_pair(self, e):
+        ''' Pick two distinct pools uniformly, then one entry from each '''
+        p, q = random.sample(self._labels[e], 2)
+        return [random.choice(self._buckets[e][p]), random.choice(self._buckets[e][q])]
+
+    def swap(self, e, a, b):
+        ''' Exchange the pools of two entries '''
+        label, position, buckets = self._label[e], self._position[e], self._buckets[e]
+        la, lb = label[a], label[b]
+        ia, ib = position[a], position[b]
+        buckets[la][ia] = b
+        buckets[lb][ib] = a
+        position[a], position[b] = ib, ia
+        label[a], label[b] = lb, la
+
+    def move(self, e, entry, new_label):
+        ''' Move an entry into a different pool '''
+        label, position, buckets = self._label[e], self._position[e], self._buckets[e]
+        old_label = label[entry]
+        if old_label == new_label:
+            return
+        # Fill the entry's old slot with the last entry of its bucket
+        bucket = buckets[old_label]
+        last = bucket.pop()
+        if last != entry:
+            bucket[position[entry]] = last
+            position[last] = position[entry]
+        if not bucket:
+            del buckets[old_label]
+            self._labels[e].remove(old_label)
+        if new_label not in buckets:
+            buckets[new_label] = []
+            self._labels[e].append(new_label)
+        position[entry] = len(buckets[new_label])
+        buckets[new_label].append(entry)
+        label[entry] = new_label
+
+
 def clean_regex(s):
     return re.sub(r'(?P<bc>\W)', r'[\g<bc>]', s)
 
@@ -133,11 +206,15 @@ def maps_from_transitions(phase_transitions, pools=None):
             else:
                 pls = phase_transitions[e][0].keys()
             pmap = DataFrame({e: pls, e+'..1': pls})
+        # Each transition maps every block of pools forward and adds a block
+        # for the pools it enters, all concatenated once at the end
+        blocks = [pmap]
         for i, pt in enumerate(phase_transitions[e]):
-            pmap[e+'..'+str(i+2)] = pmap[e+'..'+str(i+1)].map(pt)
-            ppools = sorted(pmap[e+'..'+str(i+2)].unique())
-            pmap = pmap.append(DataFrame({e: ppools, e+'..'+str(i+2): ppools}),
-                               ignore_index=True, sort=False)
+            for block in blocks:
+                block[e+'..'+str(i+2)] = block[e+'..'+str(i+1)].map(pt)
+            ppools = sorted(concat([block[e+'..'+str(i+2)] for block in blocks]).unique())
+            blocks.append(DataFrame({e: ppools, e+'..'+str(i+2): ppools}))
+        pmap = concat(blocks, ignore_index=True, sort=False)
         phase_maps[e] = pmap.set_index(e)
 
     return phase_maps
@@ -173,7 +250,7 @@ def tau_values(tau, max_iters):
     if not isinstance(tau, ndarray):
         tau = array(tau)
 
-    if tau[0] >= tau[-1]:
+    if len(tau) > 1 and tau[0] >= tau[-1]:
         raise ValueError('Beginning tau value is not strictly less than ending tau value')
     elif not (tau[:-1] < tau[1:]).all():
         raise ValueError('Tau values are not continuously increasing')
@@ -1,4 +1,7 @@
 import csv
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from math import log10
 
 
@@ -58,3 +61,134 @@ def pools_from_schedule(filename, uniform_length=None):
         pools = _read_pools_from_schedule(f, uniform_length)
 
     return pools
+
+
+STARTGG_URL = re.compile(r'(?:start|smash)\.gg/tournament/[^/]+/event/[^/]+'
+                         r'/brackets/\d+/(\d+)')
+CHALLONGE_URL = re.compile(r'(?:([\w-]+)\.)?challonge\.com/(?:[a-z]{2}/)?'
+                           r'([\w-]+)/?$')
+
+PHASE_GROUP_INFO_QUERY = '''
+query PhaseGroupInfo($id: ID) {
+  phaseGroup(id: $id) {
+    displayIdentifier
+    bracketType
+    phase { event { name } }
+  }
+}
+'''
+
+PHASE_GROUP_QUERY = '''
+query PhaseGroupSeeds($id: ID, $page: Int, $perPage: Int) {
+  phaseGroup(id: $id) {
+    seeds(query: {page: $page, perPage: $perPage}) {
+      pageInfo { totalPages }
+      nodes { seedNum entrant { name } }
+    }
+  }
+}
+'''
+
+
+def parse_bracket_url(url):
+    ''' Split a start.gg phase group or Challonge bracket link into its
+        source ('startgg' or 'challonge') and bracket id
+    '''
+    m = STARTGG_URL.search(url)
+    if m:
+        return 'startgg', m.group(1)
+    m = CHALLONGE_URL.search(url.split('?')[0])
+    if m:
+        subdomain, path = m.groups()
+        if subdomain and subdomain != 'www':
+            return 'challonge', subdomain + '-' + path
+        return 'challonge', path
+    raise ValueError('Unrecognized bracket link: {}'.format(url))
+
+
+def _fetch_startgg_bracket(client, group_id, per_page=64):
+    pg = client.execute(PHASE_GROUP_INFO_QUERY, {'id': group_id})['phaseGroup']
+    nodes = sorted(client.paginate(PHASE_GROUP_QUERY, {'id': group_id},
+                                   path='phaseGroup.seeds', per_page=per_page),
+                   key=lambda n: n['seedNum'])
+    return {'entrants': [n['entrant']['name'] for n in nodes],
+            'format': pg['bracketType'].replace('_', '-'),
+            'event': pg['phase']['event']['name'],
+            'pool': pg['displayIdentifier']}
+
+
+def _fetch_challonge_bracket(client, tid):
+    t = client.tournament(tid)
+    ps = sorted(client.participants(t['id']), key=lambda p: p['seed'])
+    return {'entrants': ['' if p['name'].startswith('[[Bye ') else p['name']
+                         for p in ps],
+            'format': t['tournament_type'],
+            'event': t['name'],
+            'pool': None}
+
+
+def _bracket_spec(bracket, format=None, n_advance=0, bracket_size=None,
+                  **kwargs):
+    from .pdf.creator import get_format
+    from .pdf.specs import PageSpec
+    from .utilities import seeds_to_sequential
+
+    format = get_format(format or bracket['format'])
+    entrants = bracket['entrants']
+    while entrants and entrants[-1] == '':
+        entrants = entrants[:-1]
+    if format[0] in ['d', 's']:
+        names = seeds_to_sequential(entrants, size=bracket_size)
+    else:
+        names = entrants
+    values = {'total': str(sum(1 for e in entrants if e)),
+              'event': bracket['event'], 'pool': bracket['pool']}
+    values = {k: v for k, v in values.items() if v is not None}
+    if bracket_size:
+        kwargs['bracket_size'] = bracket_size
+    return PageSpec.from_kwargs(names, format, n_advance=n_advance,
+                                **{**values, **kwargs})
+
+
+def print_brackets_from_urls(filename, urls, startgg_client=None,
+                             challonge_client=None, max_workers=8,
+                             chunk_size=None, **kwargs):
+    '''
+    Print one bracket page per start.gg phase group or Challonge bracket
+    link into a single pdf. Brackets are fetched concurrently, in the
+    background, while earlier pages are rendered. If chunk_size is given,
+    pages are instead written to pdfs of at most chunk_size pages, with
+    filename as the pattern of their names (see render_batch_files), and the
+    filenames are returned.
+
+    startgg_client: StartggClient used for start.gg links
+    challonge_client: ChallongeClient (v2) used for Challonge links
+    kwargs: format, n_advance, bracket_size and other print_bracket options,
+            format defaults to the bracket's own
+    '''
+    from .pdf.creator import render_batch, render_batch_files
+
+    clients = {'startgg': startgg_client, 'challonge': challonge_client}
+    fetchers = {'startgg': _fetch_startgg_bracket,
+                'challonge': _fetch_challonge_bracket}
+    brackets = [parse_bracket_url(url) for url in urls]
+    for source, _ in brackets:
+        if clients[source] is None:
+            raise ValueError('A {} client is needed for {} links'.format(
+                source, source))
+
+    def specs():
+        with ThreadPoolExecutor(max_workers) as executor:
+            # Keep a bounded window of fetches running ahead of rendering
+            pending = deque()
+            for source, bid in brackets:
+                pending.append(executor.submit(fetchers[source],
+                                               clients[source], bid))
+                if len(pending) > 2 * max_workers:
+                    yield _bracket_spec(pending.popleft().result(), **kwargs)
+            while pending:
+                yield _bracket_spec(pending.popleft().result(), **kwargs)
+
+    if chunk_size is not None:
+        return render_batch_files(specs(), filename, chunk_size)
+    render_batch(specs(), filename)
@@ -1,5 +1,26 @@
 """ Bracket PDF-making functions """
-from curlybrackets.pdf.creator import (print_bracket,
-                                       print_initial_bracket,
-                                       print_continued_bracket)
-from curlybrackets.pdf.brackets import Template, TemplateLookup
+# Public names are imported from their submodules on first access, so that
+# importing the package does not pull in reportlab and PyPDF2
+_lazy_attrs = {
+    'print_bracket': 'curlybrackets.pdf.creator',
+    'print_initial_bracket': 'curlybrackets.pdf.creator',
+    'print_continued_bracket': 'curlybrackets.pdf.creator',
+    'render_batch': 'curlybrackets.pdf.creator',
+    'render_batch_files': 'curlybrackets.pdf.creator',
+    'Template': 'curlybrackets.pdf.brackets',
+    'TemplateLookup': 'curlybrackets.pdf.brackets',
+    'PageSpec': 'curlybrackets.pdf.specs',
+}
+
+
+def __getattr__(name):
+    if name not in _lazy_attrs:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from importlib import import_module
+    value = getattr(import_module(_lazy_attrs[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_attrs))
@@ -1,5 +1,6 @@
 
 import io
+from itertools import product
 # from functools import partial, wraps
 from importlib.resources import open_binary, open_text
 import json
@@ -16,7 +17,8 @@ from curlybrackets.pdf.elements import (TextElement,
                                         ItemListElement,
                                         ImageElement)
 from curlybrackets.pdf.pages import Page
-from curlybrackets.pdf.fonts import DEFAULT_FONT, BASE_FONT
+from curlybrackets.pdf.specs import PageSpec
+from curlybrackets.pdf.fonts import get_default_font, BASE_FONT
 from curlybrackets.pdf.utilities import (expand_kwargs,
                                          collapse_kwargs,
                                          ProgressionFormatter, 
@@ -53,7 +55,7 @@ class Template:
     def build_element(element_name, **element_props):
         if element_name in ['names']:
             base_class = NameListElement
-            element_defaults = {'fontname': DEFAULT_FONT, 'min_hscale': 60}
+            element_defaults = {'fontname': get_default_font(), 'min_hscale': 60}
         elif element_name in ['event', 'label']:
             base_class = TextElement
             element_defaults = {'fontname': BASE_FONT, 'min_hscale': 90}
@@ -64,7 +66,7 @@ class Template:
                                 'min_hscale': 90}
         elif element_name in ['judge']:
             base_class = TextElement
-            element_defaults = {'fontname': DEFAULT_FONT, 'min_hscale': 90}
+            element_defaults = {'fontname': get_default_font(), 'min_hscale': 90}
         elif element_name in ['progressions']:
             # if element_props.get('type') == 'list':
             #     base_class = ItemListElement
@@ -73,7 +75,7 @@ class Template:
             element_defaults = {'fontname': BASE_FONT, 'valign': 'MIDDLE'}
         elif element_name in ['notes']:
             base_class = ItemListElement
-            element_defaults = {'fontname': DEFAULT_FONT, 'bullet': ENDA}
+            element_defaults = {'fontname': get_default_font(), 'bullet': ENDA}
         elif element_name in ['image']:
             base_class = ImageElement
             element_defaults = {}
@@ -87,7 +89,7 @@ class Template:
         self.overlay_packet = io.BytesIO()
         self.canvas = Canvas(self.overlay_packet,
                              pagesize=self.page.size,
-                             initialFontName=DEFAULT_FONT)
+                             initialFontName=get_default_font())
 
     def draw_names(self, names, **kwargs):
         for name_element in self.names:
@@ -131,25 +133,16 @@ class Template:
             element = getattr(self, element_name)
             element.draw(self.canvas, element_value, **kwargs)
 
-    def draw_page(self, names, **kwargs):
+    def draw_spec(self, spec):
         if not getattr(self, 'canvas', None):
             self.create()
 
-        kwargs['names'] = names
-        element_values = {e: kwargs.pop(e, None) for e in self.elements}
-        element_props = {e: {} for e in self.elements}
-        for k in kwargs:
-            if k == 'format_string' and 'progressions' in self.elements:
-                element_props['progressions']['format_string'] = kwargs[k]
-                continue
-            for e in self.elements:
-                if k.startswith(e+'_'):
-                    p = k.replace(e+'_', '', 1)
-                    element_props[e][p] = kwargs[k]
-                    break
-
         for e in self.elements:
-            self.draw_element(e, element_values[e], **element_props[e])
+            value = spec.names if e == 'names' else spec.values.get(e)
+            self.draw_element(e, value, **spec.props.get(e, {}))
+
+    def draw_page(self, names, **kwargs):
+        self.draw_spec(PageSpec.from_kwargs(names, self.format, **kwargs))
 
     def next_page(self):
         self.canvas.showPage()
@@ -178,6 +171,16 @@ class Template:
             yield bracket
 
 
+class _LazyConfig:
+    """ Class attribute descriptor that loads the template config on first
+        access and then replaces itself with the loaded config
+    """
+    def __get__(self, obj, owner):
+        config = json.load(open_text(templates, 'config.json'))
+        owner.config = config
+        return config
+
+
 class TemplateLookup:
     key_field = 'template_file'
     sort_field = 'lookup_order'
@@ -198,7 +201,11 @@ class TemplateLookup:
         'source',
         'elements'
     ]
-    config = json.load(open_text(templates, 'config.json'))
+    index_fields = ('format', 'n_advance')
+    count_fields = [('n_entrants',), ('n_in_winners', 'n_in_losers')]
+    config = _LazyConfig()
+    _index = None
+    _cache = {}
 
     @classmethod
     def lookup(cls, key):
@@ -211,13 +218,66 @@ class TemplateLookup:
     def get(cls, key):
         return Template(**cls.lookup(key))
 
+    @classmethod
+    def _build_index(cls):
+        """ Index config entries by the fields every search specifies, with
+            reserve options expanded, so a search only checks the entries
+            that can possibly match
+        """
+        index = {}
+        for check_reserve in [False, True]:
+            for pos, conf in enumerate(cls.config):
+                lkp = conf
+                if check_reserve:
+                    lkp = {**conf, **conf.get(cls.reserve_field, {})}
+                for count_fields in cls.count_fields:
+                    options = []
+                    for k in cls.index_fields + count_fields:
+                        if k not in lkp:
+                            break
+                        if isinstance(lkp[k], list):
+                            options.append(lkp[k])
+                        else:
+                            # A null value matches anything, so it is
+                            # indexed under None as a wildcard
+                            options.append([lkp[k]])
+                    else:
+                        for values in product(*options):
+                            key = (check_reserve, count_fields, values)
+                            index.setdefault(key, []).append((pos, lkp))
+        cls._index = index
+        cls._cache = {}
+
+    @classmethod
+    def _candidates(cls, check_reserve, params):
+        if cls._index is None:
+            cls._build_index()
+        for count_fields in cls.count_fields:
+            fields = cls.index_fields + count_fields
+            if all(k in params for k in fields):
+                break
+        else:
+            count_fields = None
+        if count_fields is not None:
+            try:
+                options = [(params[k], None) for k in fields]
+                entries = {}
+                for values in product(*options):
+                    key = (check_reserve, count_fields, values)
+                    entries.update(cls._index.get(key, []))
+                return [entries[pos] for pos in sorted(entries)]
+            except TypeError:
+                # Unhashable parameter values, fall back to a full scan
+                pass
+        if check_reserve:
+            return [{**conf, **conf.get(cls.reserve_field, {})}
+                    for conf in cls.config]
+        return cls.config
+
     @classmethod
     def _search(cls, check_reserve=False, **params):
         best_key, best_sort = None, 1e8
-        for conf in cls.config:
-            lkp = conf
-            if check_reserve:
-                lkp = {**conf, **conf.get(cls.reserve_field, {})}
+        for lkp in cls._candidates(check_reserve, params):
             if lkp[cls.sort_field] < best_sort:
                 is_match = True
                 for k in params:
@@ -253,8 +313,18 @@ class TemplateLookup:
         for k in params:
             if k in cls.fields:
                 valid_params[k] = params[k]
+        try:
+            cache_key = tuple(sorted(valid_params.items()))
+            hash(cache_key)
+        except TypeError:
+            cache_key = None
+        if cache_key in cls._cache:
+            return cls._cache[cache_key]
         try:
             match = cls._search(**valid_params)
         except ValueError:
             match = cls._search(check_reserve=True, **valid_params)
+        if cache_key is not None:
+            cls._cache[cache_key] = match
         return match
+
@@ -1,8 +1,13 @@
 
-from PyPDF2 import PdfFileWriter
+import os
+from itertools import islice
+from tempfile import TemporaryDirectory
+
+from PyPDF2 import PdfFileWriter, PdfFileMerger
 
 from curlybrackets.pdf.brackets import TemplateLookup
-from curlybrackets.pdf.utilities import expand_kwargs, collapse_kwargs
+from curlybrackets.pdf.specs import PageSpec
+from curlybrackets.pdf.utilities import collapse_kwargs
 
 from curlybrackets.utilities import seeds_to_sequential
 
@@ -18,35 +23,32 @@ def get_format(format):
         raise TypeError(f'Invalid tournament format: {format}')
 
 
-def print_bracket(filename, names, format, **kwargs):
-    """ Make bracket pdf
-
-    Parameters
-    ----------
-    filename : str
-    names :
-    """
-    if not isinstance(names[0], (tuple, list)):
-        names = [names]
-    format = get_format(format)
+def _write_document(document, output):
+    if hasattr(output, 'write'):
+        document.write(output)
+    else:
+        with open(output, 'wb') as f:
+            document.write(f)
 
-    var_kwargs = expand_kwargs(len(names), **kwargs)
 
+def _render_pages(specs, output):
     template_files = []
     template_brackets = {}
-    for nms, vkwargs in zip(names, var_kwargs):
+    for spec in specs:
+        format = get_format(spec.format)
         try:
-            tf = TemplateLookup.search(format=format, **vkwargs)
+            tf = TemplateLookup.search(format=format, **spec.lookup)
         except KeyError:
             tf = TemplateLookup.search(format=format,
-                                       n_entrants=len(nms), **vkwargs)
+                                       n_entrants=len(spec.names),
+                                       **spec.lookup)
 
         template_files.append(tf)
         if tf not in template_brackets:
             template_brackets[tf] = TemplateLookup.get(tf)
             template_brackets[tf].create()
 
-        template_brackets[tf].draw_page(nms, **vkwargs)
+        template_brackets[tf].draw_spec(spec)
         template_brackets[tf].next_page()
 
     for tf in template_brackets:
@@ -59,8 +61,109 @@ def print_bracket(filename, names, format, **kwargs):
         merged_page = next(template_pages[tf])
         document.addPage(merged_page)
 
-    with open(filename, 'wb') as f:
-        document.write(f)
+    _write_document(document, output)
+
+
+def render_batch_files(specs, filename, chunk_size):
+    """ Render bracket pages from page specs into one pdf per chunk of pages,
+        so that only a single chunk is ever held in memory
+
+    Parameters
+    ----------
+    specs : iterable of PageSpec
+        Page specifications, in the order the pages should be printed,
+        can be a generator so that specs are also built one chunk at a time
+    filename : str
+        Format string for the chunk filenames, formatted with the chunk
+        number starting from 1, e.g. 'brackets-{:03d}.pdf' (a filename
+        without a format field, e.g. 'brackets.pdf', is numbered the same
+        way before its extension)
+    chunk_size : int
+        Maximum number of pages in each file
+
+    Returns
+    -------
+    list
+        Filenames of the written pdfs, in page order
+    """
+    if chunk_size < 1:
+        raise ValueError('Chunk size must be a positive integer')
+    if '{' not in filename:
+        root, ext = os.path.splitext(filename)
+        filename = root + '-{:03d}' + ext
+    specs = iter(specs)
+    filenames = []
+    chunk = list(islice(specs, chunk_size))
+    while chunk:
+        chunk_file = filename.format(len(filenames) + 1)
+        _render_pages(chunk, chunk_file)
+        filenames.append(chunk_file)
+        chunk = list(islice(specs, chunk_size))
+    return filenames
+
+
+def render_batch(specs, output, chunk_size=None):
+    """ Render bracket pages from page specs into a single pdf
+
+    Parameters
+    ----------
+    specs : iterable of PageSpec
+        Page specifications, in the order the pages should be printed
+    output : str or file-like
+        Filename or writable binary stream for the pdf
+    chunk_size : int, optional
+        If given, the overlays and template merges are rendered this many
+        pages at a time through temporary files, default is None (render
+        all pages at once)
+
+    Notes
+    -----
+    The output is a single pdf, so all of its pages are held in memory
+    until it is written, whether chunked or not. Use render_batch_files
+    for memory bounded by the chunk size rather than the packet size.
+    """
+    if chunk_size is None:
+        _render_pages(specs, output)
+        return
+
+    with TemporaryDirectory() as tmpdir:
+        chunk_files = render_batch_files(
+            specs, os.path.join(tmpdir, 'chunk{:06d}.pdf'), chunk_size
+        )
+        merger = PdfFileMerger()
+        try:
+            for chunk_file in chunk_files:
+                merger.append(chunk_file)
+            _write_document(merger, output)
+        finally:
+            merger.close()
+
+
+def print_bracket(filename, names, format, chunk_size=None, **kwargs):
+    """ Make bracket pdf
+
+    Parameters
+    ----------
+    filename : str
+    names :
+    chunk_size : int, optional
+        If given, the brackets are split into pdfs of at most this many
+        pages, one chunk in memory at a time, with filename as the pattern
+        of their names (see render_batch_files), default is None (one pdf)
+
+    Returns
+    -------
+    list
+        Filenames of the written pdfs, when chunk_size is given
+    """
+    if not isinstance(names[0], (tuple, list)):
+        names = [names]
+    format = get_format(format)
+
+    specs = PageSpec.batch(names, format, **kwargs)
+    if chunk_size is not None:
+        return render_batch_files(specs, filename, chunk_size)
+    render_batch(specs, filename)
 
 
 def print_initial_bracket(filename, entrants, format='double-elimination',
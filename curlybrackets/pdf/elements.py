@@ -1,9 +1,15 @@
+import copy
+import io
 import math
 import warnings
+from collections import OrderedDict
+from functools import lru_cache
 
 from reportlab.lib.colors import Color
 from reportlab.platypus import Paragraph, Frame, Table, TableStyle
 from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
 from reportlab.pdfgen.textobject import PDFTextObject
 
 from curlybrackets.pdf.utilities import expand_kwargs, cycle_list
@@ -14,6 +20,98 @@ def gray2color(g):
         return Color(g, g, g)
 
 
+@lru_cache(maxsize=4096)
+def _fit_line(text, fontname, fontsize, width, min_hscale):
+    """ Fit a line of text to a width by shrinking the font size in 0.25pt
+        steps until the horizontal scale needed is at least min_hscale,
+        returns the fitted (fontsize, hscale, line_width) tuple
+    """
+    unit_width = stringWidth(text, fontname, 1)
+    line_width = unit_width * fontsize
+    hscale = 100 * width / (line_width if line_width > 0 else 1e-5)
+    if hscale < min_hscale:
+        # String width is linear in font size, so solve for the largest
+        # font size on the 0.25pt grid directly instead of stepping down
+        max_fontsize = 100 * width / (unit_width * min_hscale)
+        fontsize -= 0.25 * math.ceil((fontsize - max_fontsize) / 0.25)
+        line_width = unit_width * fontsize
+        hscale = 100 * width / line_width
+    if hscale > 100:
+        hscale = 100
+    else:
+        line_width = width
+    return fontsize, hscale, line_width
+
+
+def _search_fit(fits, max_steps):
+    """ Binary search for the fewest 0.25pt font size reductions for which
+        fits(steps) is True, assuming text that fits at a size also fits at
+        every smaller size
+    """
+    if fits(0):
+        return 0
+    lo, hi = 0, max_steps
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+class _FitMemo(object):
+    """ LRU memo of the font size reductions found by _search_fit, keyed by
+        everything the fit depends on (the fits predicate itself is not
+        hashable, so lru_cache cannot be used directly)
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def steps(self, key, fits, fontsize):
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            max_steps = max(math.ceil(fontsize / 0.25) - 1, 0)
+            self._data[key] = _search_fit(fits, max_steps)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return self._data[key]
+
+
+_paragraph_fits = _FitMemo()
+_item_list_fits = _FitMemo()
+
+
+class _FrameProbe(object):
+    """ Tries frame.add on a scratch copy of a frame and a scratch canvas,
+        both made on the first probe and reused for the rest of a search, so
+        that nothing is drawn
+    """
+    def __init__(self, frame):
+        self._source = frame
+        self._state = None
+        self._frame = None
+        self._canvas = None
+
+    def fits(self, flowable):
+        if self._frame is None:
+            self._state = dict(self._source.__dict__)
+            self._frame = copy.copy(self._source)
+            self._canvas = Canvas(io.BytesIO())
+        # Put the scratch frame in the original frame's state before each try
+        self._frame.__dict__.clear()
+        self._frame.__dict__.update(self._state)
+        return bool(self._frame.add(flowable, self._canvas))
+
+
+def _shrink_style(style, steps):
+    return style.clone(style.name,
+                       fontSize=style.fontSize - 0.25 * steps,
+                       leading=style.leading - 0.3 * steps)
+
+
 class CBTextObject(PDFTextObject):
     def setFont(self, fontname, fontsize):
         if fontname != self._fontname or fontsize != self._fontsize:
@@ -108,16 +206,8 @@ class LineElement(Element):
         fontsize = self.fontsize if self.fontsize else txobj._fontsize
         fontname = self.fontname if self.fontname else txobj._fontname
 
-        line_width = txobj._canvas.stringWidth(line, fontname, fontsize)
-        hscale = 100 * self.width / (line_width if line_width > 0 else 1e-5)
-        while hscale < self.min_hscale:
-            fontsize -= 0.25
-            line_width = txobj._canvas.stringWidth(line, fontname, fontsize)
-            hscale = 100 * self.width / line_width
-        if hscale > 100:
-            hscale = 100
-        else:
-            line_width = self.width
+        fontsize, hscale, line_width = _fit_line(line, fontname, fontsize,
+                                                 self.width, self.min_hscale)
 
         if self.alignment == 'right':
             shift = self.width - line_width
@@ -314,16 +404,21 @@ class ParagraphElement(RectElement):
             )
         return TableStyle(cmds)
 
+    def _fit_paragraph_style(self, canvas, frame, text, style):
+        def fits(steps):
+            par = Paragraph(text, _shrink_style(style, steps))
+            return len(frame.split(par, canvas)) == 1
+
+        key = (text, style.fontName, style.fontSize, style.leading,
+               self.alignment, self.width, self.height)
+        steps = _paragraph_fits.steps(key, fits, style.fontSize)
+        return _shrink_style(style, steps)
+
     def _draw(self, canvas, text):
         frame = self._build_frame(canvas)
-        style = self._build_style(canvas)
+        style = self._fit_paragraph_style(canvas, frame, text,
+                                          self._build_style(canvas))
         par = Paragraph(text, style)
-        check = len(frame.split(par, canvas))
-        while check != 1:
-            style.fontSize -= 0.25
-            style.leading -= 0.3
-            par = Paragraph(text, style)
-            check = len(frame.split(par, canvas))
         tstyle = self._generate_tablestyle(style)
         table = Table([[par]], rowHeights=[self.height],
                       colWidths=[self.width], style=tstyle,
@@ -369,7 +464,29 @@ class ItemListElement(ParagraphElement):
         else:
             items_txt = items
 
-        istyle = style.clone('Item')
+        istyle = self._fit_items_style(canvas, frame, items_txt,
+                                       style.clone('Item'), avail_height)
+        table = self._build_table(canvas, items_txt, istyle, avail_height)[0]
+        frame.add(table, canvas)
+
+    def _fit_items_style(self, canvas, frame, items_txt, istyle, avail_height):
+        probe = _FrameProbe(frame)
+
+        def fits(steps):
+            table, col_widths = self._build_table(
+                canvas, items_txt, _shrink_style(istyle, steps), avail_height
+            )
+            if sum(col_widths) > self.width:
+                return False
+            return probe.fits(table)
+
+        key = (tuple(items_txt), istyle.fontName, istyle.fontSize,
+               istyle.leading, self.col_space, self.width, avail_height,
+               frame._y, frame._atTop)
+        steps = _item_list_fits.steps(key, fits, istyle.fontSize)
+        return _shrink_style(istyle, steps)
+
+    def _build_table(self, canvas, items_txt, istyle, avail_height):
         nrows = math.floor(avail_height / istyle.leading)
         ncols = math.ceil(len(items_txt) / nrows)
         items_ext = items_txt + [''] * (nrows * ncols - len(items_txt))
@@ -387,29 +504,7 @@ class ItemListElement(ParagraphElement):
                       colWidths=col_widths, style=tstyle,
                       vAlign=['BOTTOM', 'MIDDLE', 'TOP'][self.valign],
                       hAlign=['LEFT', 'CENTER', 'RIGHT'][self.alignment])
-        check = 0 if sum(col_widths) > self.width else frame.add(table, canvas)
-        while check == 0:
-            istyle.fontSize -= 0.25
-            istyle.leading -= 0.3
-
-            nrows = math.floor(avail_height / istyle.leading)
-            ncols = math.ceil(len(items_txt) / nrows)
-            items_ext = items_txt + [''] * (nrows * ncols - len(items_txt))
-
-            items_grid = [items_ext[i*nrows:(i+1)*nrows] for i in range(ncols)]
-            items_table = [['\n'.join(col) for col in items_grid]]
-
-            col_widths = [max(canvas.stringWidth(t, istyle.fontName, istyle.fontSize)
-                              for t in col) + istyle.fontSize * self.col_space
-                          for col in items_grid]
-            row_heights = [istyle.leading * nrows]
-            tstyle = self._generate_tablestyle(istyle)
-
-            table = Table(items_table, rowHeights=row_heights,
-                          colWidths=col_widths, style=tstyle,
-                          vAlign=['BOTTOM', 'MIDDLE', 'TOP'][self.valign],
-                          hAlign=['LEFT', 'CENTER', 'RIGHT'][self.alignment])
-            check = 0 if sum(col_widths) > self.width else frame.add(table, canvas)
+        return table, col_widths
 
     def draw(self, canvas, items=None, **kwargs):
         if items:
@@ -1,15 +1,27 @@
+from functools import lru_cache
 
 
-from reportlab.pdfbase.pdfmetrics import registerFont, registerFontFamily
-from reportlab.pdfbase.ttfonts import TTFont, TTFError
+BASE_FONT = 'Helvetica'
 
 
-BASE_FONT = 'Helvetica'
-try:
-    registerFont(TTFont('UnGraphic', 'UnGraphic.ttf'))
-    registerFont(TTFont('UnGraphicBold', 'UnGraphicBold.ttf'))
-    registerFontFamily('UnGraphic', normal='UnGraphic', bold='UnGraphicBold')
-except TTFError:
-    DEFAULT_FONT = BASE_FONT
-else:
-    DEFAULT_FONT = 'UnGraphic'
+@lru_cache(maxsize=None)
+def get_default_font():
+    """ Register the UnGraphic font family on first use and return its name,
+        or the base font if the font files cannot be found
+    """
+    from reportlab.pdfbase.pdfmetrics import registerFont, registerFontFamily
+    from reportlab.pdfbase.ttfonts import TTFont, TTFError
+
+    try:
+        registerFont(TTFont('UnGraphic', 'UnGraphic.ttf'))
+        registerFont(TTFont('UnGraphicBold', 'UnGraphicBold.ttf'))
+        registerFontFamily('UnGraphic', normal='UnGraphic', bold='UnGraphicBold')
+    except TTFError:
+        return BASE_FONT
+    return 'UnGraphic'
+
+
+def __getattr__(name):
+    if name == 'DEFAULT_FONT':
+        return get_default_font()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
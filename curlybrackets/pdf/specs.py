@@ -0,0 +1,85 @@
+from functools import lru_cache
+
+
+ELEMENT_NAMES = ('names', 'event', 'label', 'pool', 'date', 'total',
+                 'judge', 'progressions', 'notes', 'image')
+
+
+@lru_cache(maxsize=None)
+def resolve_key(key):
+    """ Resolve a flat keyword argument name into the part of a page spec it
+        belongs to, returning a (section, element, prop) 3-tuple where section
+        is one of 'values', 'props' or 'lookup'
+    """
+    if key == 'format_string':
+        return 'props', 'progressions', key
+    if key in ELEMENT_NAMES:
+        return 'values', key, None
+    for e in ELEMENT_NAMES:
+        if key.startswith(e+'_'):
+            return 'props', e, key[len(e)+1:]
+    return 'lookup', key, None
+
+
+class PageSpec:
+    """ Specification for a single bracket page
+
+    Parameters
+    ----------
+    names : list
+        Names to fill into the bracket lines, in sequential order
+    format : str
+        Tournament format of the bracket
+    lookup : dict, optional
+        Template lookup fields (n_advance, n_entrants, bracket_size, etc.)
+    values : dict, optional
+        Values to draw for each template element, keyed by element name
+    props : dict, optional
+        Per-page element property overrides, keyed by element name
+    """
+    __slots__ = ('names', 'format', 'lookup', 'values', 'props')
+
+    def __init__(self, names, format, lookup=None, values=None, props=None):
+        self.names = names
+        self.format = format
+        self.lookup = {} if lookup is None else lookup
+        self.values = {} if values is None else values
+        self.props = {} if props is None else props
+
+    def __repr__(self):
+        return '{}({!r}, {!r})'.format(self.__class__.__name__,
+                                       self.names, self.format)
+
+    def set(self, key, value):
+        section, element, prop = resolve_key(key)
+        if section == 'props':
+            self.props.setdefault(element, {})[prop] = value
+        else:
+            getattr(self, section)[element] = value
+
+    @classmethod
+    def from_kwargs(cls, names, format, **kwargs):
+        spec = cls(names, format)
+        for k in kwargs:
+            spec.set(k, kwargs[k])
+        return spec
+
+    @classmethod
+    def batch(cls, names, format, **kwargs):
+        """ Build page specs for many pages at once, where each keyword
+            argument is either shared by all pages or is a list or tuple
+            with one item per page
+        """
+        specs = [cls(nms, format) for nms in names]
+        for k in kwargs:
+            section, element, prop = resolve_key(k)
+            value = kwargs[k]
+            per_page = (isinstance(value, (tuple, list))
+                        and len(value) == len(specs))
+            for i, spec in enumerate(specs):
+                v = value[i] if per_page else value
+                if section == 'props':
+                    spec.props.setdefault(element, {})[prop] = v
+                else:
+                    getattr(spec, section)[element] = v
+        return specs
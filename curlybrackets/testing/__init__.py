@@ -0,0 +1,22 @@
+""" Helpers for exercising curlybrackets without network access or real
+    registrations, shared by the tests and benchmarks
+"""
+# Public names are imported from their submodules on first access, so that
+# importing the package does not pull in pandas
+_lazy_attrs = {
+    'StubServer': 'curlybrackets.testing.stub_server',
+    'make_problem': 'curlybrackets.testing.assignment_problem',
+}
+
+
+def __getattr__(name):
+    if name not in _lazy_attrs:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from importlib import import_module
+    value = getattr(import_module(_lazy_attrs[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_attrs))
@@ -0,0 +1,33 @@
+""" Synthetic pool assignment problems for exercising the assignment
+    optimizers, used by the assignment tests and benchmarks
+"""
+import random
+
+from numpy import nan
+from pandas import DataFrame
+
+
+EVENTS = ['SF', 'MK', 'BB']
+POOLS = {'SF': ['A1', 'A2', 'A3', 'A4', 'B1', 'B2', 'B3', 'B4'],
+         'MK': ['A5', 'A6', 'B5', 'B6'],
+         'BB': ['A7', 'B7']}
+STATES = ['CA', 'NY', 'TX', 'FL', 'WA']
+
+
+def make_problem(n_entrants=60, seed=0, xchar='xx', entry_rates=(0.9, 0.5, 0.3),
+                 values=False):
+    """ Random registrations for three events sharing two schedule blocks,
+        returning (df, events, pools), with 'Id' as the primary key, a
+        'State' location column and an 'Ext' external conflicts column
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_entrants):
+        row = {'Id': 'P{}'.format(i), 'State': rng.choice(STATES),
+               'Ext': rng.choice(['', '', '', 'A', 'B'])}
+        for e, rate in zip(EVENTS, entry_rates):
+            row[e] = xchar if rng.random() < rate else nan
+        if values:
+            row['SF.Value'] = float(rng.choice([1, 1, 2, 3])) if row['SF'] == xchar else nan
+        rows.append(row)
+    return DataFrame(rows), list(EVENTS), {e: list(p) for e, p in POOLS.items()}
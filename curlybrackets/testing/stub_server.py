@@ -0,0 +1,94 @@
+""" Local stub HTTP server for exercising the API clients without network
+    access, used by the API tests and benchmarks
+"""
+import json
+import threading
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer:
+    """ Serve JSON responses from a handler function on a local port
+
+    Parameters
+    ----------
+    handler : callable
+        Called as handler(method, path, body) for each request, where body is
+        the decoded JSON request body, a dictionary of lists for a form
+        encoded body, or None, returning a 2-tuple
+        (status, payload) or a 3-tuple (status, payload, headers)
+    """
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0),
+                                           self._make_handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def _make_handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def _respond(self):
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length) if length else b''
+                if not raw:
+                    body = None
+                elif self.headers.get('Content-Type', '').startswith(
+                        'application/x-www-form-urlencoded'):
+                    body = parse_qs(raw.decode('utf-8'))
+                else:
+                    body = json.loads(raw)
+                with stub._lock:
+                    stub.requests.append((self.command, self.path, body))
+                status, payload, *headers = stub.handler(self.command,
+                                                         self.path, body)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for k, v in (headers[0] if headers else {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={'poll_interval': 0.01},
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+from curlybrackets.api.cache import ResponseCache
+from curlybrackets.api.startgg import (GQLClient, AsyncGQLClient,
+                                       StartggClient)
+
+from curlybrackets.testing.stub_server import StubServer
+
+
+def echo_handler(method, path, body):
+    return 200, {'data': {'echo': body.get('variables')}}
+
+
+def test_cache_persists(tmp_path):
+    path = tmp_path / 'responses.sqlite'
+    key = ResponseCache.make_key('url', 'query { a }', {'x': 1})
+    assert key == ResponseCache.make_key('url', 'query { a }', {'x': 1})
+    assert key != ResponseCache.make_key('url', 'query { a }', {'x': 2})
+    assert key != ResponseCache.make_key('url', 'query { a }', {'x': 1},
+                                         'Bearer token')
+    with ResponseCache(path) as cache:
+        cache.set(key, {'a': [1, 2]})
+    with ResponseCache(path) as cache:
+        assert cache.get(key) == {'a': [1, 2]}
+        assert cache.hits == 1
+
+
+def test_cache_ttl():
+    cache = ResponseCache(ttl=0.05)
+    cache.set('k', {'a': 1})
+    assert cache.get('k') == {'a': 1}
+    time.sleep(0.1)
+    assert cache.get('k') is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_evicts_least_recently_used():
+    value = {'a': 'x' * 90}
+    cache = ResponseCache(max_size=350)
+    for k in 'abc':
+        cache.set(k, value)
+    cache.get('a')
+    cache.set('d', value)
+    assert cache.get('b') is None
+    assert all(cache.get(k) == value for k in 'acd')
+
+
+def test_cache_size_total(tmp_path):
+    path = tmp_path / 'responses.sqlite'
+
+    def sizes(cache):
+        return cache._total_size(), cache._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    with ResponseCache(path, max_size=500) as cache:
+        for i in range(8):
+            cache.set(str(i % 5), {'a': 'x' * (10 * i)})
+        total, expected = sizes(cache)
+        assert total == expected <= 500
+        # Another cache sharing the database keeps the same total
+        with ResponseCache(path, max_size=500) as other:
+            other.set('z', {'a': 'y' * 40})
+            other.get('1')
+        assert sizes(cache)[0] == sizes(cache)[1]
+        cache.clear()
+        assert sizes(cache) == (0, 0)
+
+
+def test_client_cache():
+    with StubServer(echo_handler) as stub:
+        with GQLClient(stub.url, cache=ResponseCache()) as client:
+            for _ in range(3):
+                assert client.execute('query Q($x: Int) { echo }',
+                                      {'x': 1}) == {'echo': {'x': 1}}
+            client.execute('query Q($x: Int) { echo }', {'x': 2})
+            client.execute('query Q($x: Int) { echo }', {'x': 2},
+                           use_cache=False)
+            for _ in range(2):
+                client.execute('mutation M($x: Int) { echo }', {'x': 1})
+    assert len(stub.requests) == 5
+
+
+def test_async_client_cache():
+    async def run(url):
+        async with AsyncGQLClient(url, cache=ResponseCache()) as client:
+            await client.execute('{ echo }')
+            return await client.execute_many(['{ echo }'] * 3)
+
+    with StubServer(echo_handler) as stub:
+        assert asyncio.run(run(stub.url)) == [{'echo': None}] * 3
+    assert len(stub.requests) == 1
+
+
+def test_client_cache_by_token():
+    cache = ResponseCache()
+    with StubServer(echo_handler) as stub:
+        for token in ['a', 'b', 'a', None]:
+            with StartggClient(token, url=stub.url, rate_limiter=None,
+                               cache=cache) as client:
+                client.execute('{ echo }')
+    assert len(stub.requests) == 3
@@ -0,0 +1,129 @@
+import re
+
+import pytest
+
+import curlybrackets.api.challonge as cbchallonge
+
+from curlybrackets.testing.stub_server import StubServer
+
+
+class FakeBracket:
+    """ Single elimination bracket of 8 seeds for a stub Challonge API """
+
+    def __init__(self, names):
+        self.tournament = {'id': 1, 'url': 't1', 'state': 'pending',
+                           'participants_count': len(names),
+                           'sequential_pairings': False}
+        self.participants = [{'id': i+1, 'name': n, 'seed': i+1}
+                             for i, n in enumerate(names)]
+        self.matches = {1: (1, 8), 2: (4, 5), 3: (2, 7), 4: (3, 6),
+                        5: ('m1', 'm2'), 6: ('m3', 'm4'), 7: ('m5', 'm6')}
+        self.winners = {}
+
+    def _player(self, p):
+        if isinstance(p, str):
+            return self.winners.get(int(p[1:]))
+        return p
+
+    def match(self, mid):
+        p1, p2 = (self._player(p) for p in self.matches[mid])
+        if mid in self.winners:
+            state = 'complete'
+        elif p1 is None or p2 is None:
+            state = 'pending'
+        else:
+            state = 'open'
+        return {'id': mid, 'state': state,
+                'player1_id': p1, 'player2_id': p2}
+
+    def handler(self, method, path, body):
+        path = path.split('?')[0]
+        if path == '/tournaments/t1.json':
+            return 200, {'tournament': self.tournament}
+        if path == '/tournaments/1/start.json':
+            self.tournament['state'] = 'underway'
+            return 200, {'tournament': self.tournament}
+        if path == '/tournaments/1/participants.json':
+            return 200, [{'participant': p} for p in self.participants]
+        if path == '/tournaments/1/participants/bulk_add.json':
+            return 200, []
+        if path == '/tournaments/1/matches.json':
+            return 200, [{'match': self.match(m)} for m in self.matches
+                         if self.match(m)['state'] == 'open']
+        mid = int(re.match(r'/tournaments/1/matches/(\d+)[.]json', path)[1])
+        self.winners[mid] = int(body['match[winner_id]'][0])
+        return 200, {'match': self.match(mid)}
+
+
+@pytest.fixture
+def stub_api():
+    def start(fake):
+        stub = StubServer(fake.handler).start()
+        cbchallonge.set_api_url(stub.url)
+        return stub
+
+    stubs = []
+    yield lambda fake: stubs.append(start(fake)) or stubs[-1]
+    cbchallonge.set_api_url(None)
+    cbchallonge.close_session()
+    for stub in stubs:
+        stub.stop()
+
+
+def test_free_advance(stub_api):
+    names = ['A', 'B', 'C', '[[Bye 1]]', '[[Bye 2]]', 'F', 'G', '[[Bye 3]]']
+    fake = FakeBracket(names)
+    stub = stub_api(fake)
+    cbchallonge.free_advance('t1')
+    # Byes cascade over two rounds of advancements, with both players of
+    # match 2 being byes
+    assert fake.winners == {1: 1, 2: 4, 5: 1}
+    assert fake.tournament['state'] == 'underway'
+    paths = [p.split('?')[0] for _, p, _ in stub.requests]
+    assert paths.count('/tournaments/1/matches.json') == 3
+    assert paths.count('/tournaments/1/participants.json') == 1
+    assert len(paths) == 9
+
+
+def test_expand_bracket(stub_api):
+    fake = FakeBracket(['A', 'B', 'C', 'D', 'E'])
+    stub = stub_api(fake)
+    cbchallonge.expand_bracket('t1')
+    assert len(stub.requests) == 2
+    method, path, body = stub.requests[1]
+    assert body['participants[][name]'] == ['[[Bye X{}]]'.format(i)
+                                            for i in range(1, 12)]
+    assert body['participants[][seed]'] == [str(s) for s in
+                                            [6, 7, 8] + list(range(9, 17))]
+
+
+def test_prepare_params():
+    assert cbchallonge._prepare_params({'winner_id': 3, 'scores_csv': '0-0'},
+                                       'match') \
+        == [('match[winner_id]', 3), ('match[scores_csv]', '0-0')]
+    assert cbchallonge._prepare_params({'name': ['X', 'Y'], 'seed': [7, 8],
+                                        'misc': True}, 'participants[]') \
+        == [('participants[][name]', 'X'), ('participants[][seed]', 7),
+            ('participants[][name]', 'Y'), ('participants[][seed]', 8),
+            ('participants[][misc]', 'true')]
+    assert cbchallonge._prepare_params({'state': 'open', 'ids': [1, 2]}) \
+        == [('state', 'open'), ('ids[]', 1), ('ids[]', 2)]
+
+
+def test_parse():
+    assert cbchallonge._parse([]) == []
+    assert cbchallonge._parse({'tournament': {'id': 1, 'state': 'pending'}}) \
+        == {'id': 1, 'state': 'pending'}
+    assert cbchallonge._parse([{'match': {'id': 1}}, {'match': {'id': 2}}]) \
+        == [{'id': 1}, {'id': 2}]
+
+
+def test_close_session(stub_api):
+    stub_api(FakeBracket(['A', 'B', 'C']))
+    cbchallonge.free_advance('t1')
+    session = cbchallonge._session
+    assert session is not None
+    cbchallonge.close_session()
+    assert cbchallonge._session is None
+    cbchallonge.close_session()
+    assert cbchallonge._get_session() is not session
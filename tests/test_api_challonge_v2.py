@@ -0,0 +1,172 @@
+import re
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from curlybrackets.api.challonge_v2 import (ChallongeClient, ChallongeError,
+                                            make_challonge, free_advance,
+                                            expand_bracket,
+                                            get_participant_list)
+
+from curlybrackets.testing.stub_server import StubServer
+
+
+class FakeChallonge:
+    """ Stub Challonge v2 API holding a single tournament """
+
+    def __init__(self, existing=False):
+        self.tournament = None
+        if existing:
+            self._create({'name': 'Old', 'url': 't1'})
+        self.participants = []
+        self.matches = {}
+        self.winners = {}
+
+    def _create(self, attributes):
+        self.tournament = {'id': '1', 'type': 'tournament',
+                           'attributes': {**attributes, 'state': 'pending'}}
+
+    def _page(self, items, query):
+        page = int(query.get('page', ['1'])[0])
+        per_page = int(query.get('per_page', ['25'])[0])
+        data = items[(page-1)*per_page:page*per_page]
+        more = page * per_page < len(items)
+        return {'data': data,
+                'links': {'next': 'page={}'.format(page+1) if more else None}}
+
+    def _match(self, mid):
+        p1, p2 = (self.winners.get(int(p[1:])) if isinstance(p, str)
+                  and p.startswith('m') else p for p in self.matches[mid])
+        state = ('complete' if mid in self.winners else
+                 'pending' if p1 is None or p2 is None else 'open')
+        rels = {'player{}'.format(i+1): {'data': None if p is None else
+                                         {'id': p, 'type': 'participant'}}
+                for i, p in enumerate([p1, p2])}
+        return {'id': str(mid), 'type': 'match',
+                'attributes': {'state': state}, 'relationships': rels}
+
+    def handler(self, method, path, body):
+        parts = urlsplit(path)
+        path, query = parts.path, parse_qs(parts.query)
+        if method == 'POST' and path == '/tournaments.json':
+            if self.tournament is not None:
+                return 422, {'errors': [{'detail': 'URL is already taken',
+                                         'source': {'pointer': '/url'}}]}
+            self._create(body['data']['attributes'])
+            return 200, {'data': self.tournament}
+        if method == 'DELETE' and path == '/tournaments/t1.json':
+            self.tournament = None
+            return 204, None
+        if path == '/tournaments/1/change_state.json':
+            state = body['data']['attributes']['state']
+            self.tournament['attributes']['state'] = \
+                'underway' if state == 'start' else 'pending'
+            return 200, {'data': self.tournament}
+        if path in ('/tournaments/1.json', '/tournaments/t1.json'):
+            return 200, {'data': self.tournament}
+        if path == '/tournaments/1/participants/bulk_add.json':
+            new = body['data']['attributes']['participants']
+            created = [{'id': str(len(self.participants)+i+1),
+                        'type': 'participant', 'attributes': p}
+                       for i, p in enumerate(new)]
+            self.participants.extend(created)
+            return 200, {'data': created}
+        if path == '/tournaments/1/participants.json':
+            return 200, self._page(self.participants, query)
+        if path == '/tournaments/1/matches.json':
+            matches = [self._match(m) for m in self.matches]
+            return 200, self._page([m for m in matches if m['attributes']
+                                    ['state'] == query['state'][0]], query)
+        mid = int(re.fullmatch(r'/tournaments/1/matches/(\d+)[.]json', path)[1])
+        result = body['data']['attributes']['match']
+        self.winners[mid] = next(r['participant_id'] for r in result
+                                 if r['advancing'])
+        return 200, {'data': self._match(mid)}
+
+
+@pytest.fixture
+def fake_api():
+    stubs = []
+
+    def start(fake):
+        stubs.append(StubServer(fake.handler).start())
+        return stubs[-1], ChallongeClient('key', url=stubs[-1].url)
+
+    yield start
+    for stub in stubs:
+        stub.stop()
+
+
+@pytest.mark.parametrize('existing', [False, True])
+def test_make_challonge(fake_api, existing):
+    fake = FakeChallonge(existing)
+    stub, client = fake_api(fake)
+    tid = make_challonge(client, ['A', '', 'C', 'D'], 'Pool A1', 't1',
+                         miscs=['1', '2', '3', '4'])
+    assert tid == '1'
+    attributes = fake.tournament['attributes']
+    assert (attributes['name'], attributes['state']) == ('Pool A1', 'underway')
+    assert [p['attributes'] for p in fake.participants] == [
+        {'name': 'A', 'misc': '1'}, {'name': '[[Bye 1]]', 'misc': '2'},
+        {'name': 'C', 'misc': '3'}, {'name': 'D', 'misc': '4'}
+    ]
+    assert sum(p.endswith('bulk_add.json') for _, p, _ in stub.requests) == 1
+    assert get_participant_list(client, tid, misc=True) == \
+        (['A', '', 'C', 'D'], ['1', '', '3', '4'])
+
+
+def test_make_challonge_merges_options(fake_api):
+    fake = FakeChallonge(existing=False)
+    stub, client = fake_api(fake)
+    make_challonge(client, ['A', 'B', '', 'D'], 'Pool A1', 't1', start=False,
+                   seeding_options={'hide_seeds': False})
+    assert fake.tournament['attributes']['seeding_options'] == \
+        {'sequential_pairings': True, 'hide_seeds': False}
+    # Sequential pairings are still on, so need a power of 2 players
+    with pytest.raises(ValueError):
+        make_challonge(client, ['A', 'B', 'C'], 'Pool A1', 't1',
+                       seeding_options={'hide_seeds': False})
+
+
+def test_paginate(fake_api):
+    fake = FakeChallonge(existing=True)
+    stub, client = fake_api(fake)
+    client.bulk_add_participants('1', [{'name': str(i)} for i in range(7)],
+                                 chunk_size=3)
+    names = [p['name'] for p in client.paginate('tournaments/1/participants',
+                                                per_page=3)]
+    assert names == [str(i) for i in range(7)]
+    # Three bulk requests and three pages
+    assert len(stub.requests) == 6
+
+
+def test_free_advance(fake_api):
+    fake = FakeChallonge(existing=True)
+    stub, client = fake_api(fake)
+    names = ['A', 'B', 'C', '[[Bye 1]]', '[[Bye 2]]', 'F', 'G', '[[Bye 3]]']
+    client.bulk_add_participants('1', [{'name': n} for n in names])
+    fake.matches = {1: ('1', '8'), 2: ('4', '5'), 3: ('2', '7'),
+                    4: ('3', '6'), 5: ('m1', 'm2'), 6: ('m3', 'm4'),
+                    7: ('m5', 'm6')}
+    free_advance(client, 't1')
+    assert fake.winners == {1: '1', 2: '4', 5: '1'}
+
+
+def test_expand_bracket(fake_api):
+    fake = FakeChallonge(existing=True)
+    stub, client = fake_api(fake)
+    fake.tournament['attributes']['seeding_options'] = \
+        {'sequential_pairings': False}
+    client.bulk_add_participants('1', [{'name': n} for n in 'ABCDE'])
+    expand_bracket(client, 't1')
+    byes = [p['attributes'] for p in fake.participants[5:]]
+    assert [p['name'] for p in byes] == ['[[Bye X{}]]'.format(i)
+                                         for i in range(1, 12)]
+    assert [p['seed'] for p in byes] == [6, 7, 8] + list(range(9, 17))
+
+
+def test_error_response(fake_api):
+    fake = FakeChallonge(existing=True)
+    stub, client = fake_api(fake)
+    with pytest.raises(ChallongeError, match='already taken'):
+        client.create_tournament('New', 't1')
@@ -0,0 +1,62 @@
+from email.utils import formatdate
+import time
+
+import pytest
+
+from curlybrackets.api.ratelimit import (TokenBucket, backoff_delay,
+                                         parse_retry_after)
+from curlybrackets.api.startgg import GQLClient
+
+from curlybrackets.testing.stub_server import StubServer
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(10, per=1, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+    assert bucket.metrics.waits == 2
+
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(100, per=1)
+    bucket.pause(0.5)
+    assert bucket.reserve() == pytest.approx(0.51, abs=0.02)
+
+
+@pytest.mark.parametrize('value, expected',
+                         [(None, None), ('', None), ('2', 2.0),
+                          ('0.5', 0.5), ('soon', None)])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_date():
+    value = formatdate(time.time() + 30, usegmt=True)
+    assert parse_retry_after(value) == pytest.approx(30, abs=2)
+
+
+@pytest.mark.parametrize('attempt', [0, 1, 2, 3, 10])
+def test_backoff_delay(attempt):
+    expected = min(2 ** attempt, 5)
+    delay = backoff_delay(attempt, 1, max_delay=5)
+    assert expected / 2 <= delay <= expected
+    assert backoff_delay(attempt, 1, max_delay=5, jitter=False) == expected
+    assert backoff_delay(attempt, 1, max_delay=5, retry_after=20) == 20
+
+
+def test_client_honours_retry_after():
+    responses = iter([(429, {}, {'Retry-After': '0.1'}),
+                      (200, {'data': {'ok': True}})])
+
+    with StubServer(lambda *args: next(responses)) as stub:
+        bucket = TokenBucket(100, per=1)
+        with GQLClient(stub.url, retries=1, rate_limiter=bucket) as client:
+            start = time.monotonic()
+            assert client.execute('{ ok }') == {'ok': True}
+            elapsed = time.monotonic() - start
+    assert elapsed >= 0.1
+    assert client.metrics.as_dict()['retries'] == 1
+    assert client.metrics.throttled == 1
+    assert client.metrics.throttled_time >= 0.1
@@ -0,0 +1,69 @@
+from numpy import isnan
+import pytest
+
+from curlybrackets.api.registrations import load_registrations, standing_values
+from curlybrackets.api.startgg import StartggClient
+
+from curlybrackets.testing.stub_server import StubServer
+
+
+PARTICIPANTS = [
+    {'id': 1, 'gamerTag': 'Alpha', 'player': {'id': 11},
+     'user': {'location': {'country': 'US', 'state': 'CA', 'city': 'LA'}},
+     'entrants': [{'id': 100, 'event': {'name': 'Singles'}},
+                  {'id': 200, 'event': {'name': 'Doubles'}}]},
+    {'id': 2, 'gamerTag': 'Bravo', 'player': {'id': 12},
+     'user': {'location': {'country': 'US', 'state': 'NY', 'city': None}},
+     'entrants': [{'id': 200, 'event': {'name': 'Doubles'}}]},
+    {'id': 3, 'gamerTag': 'Charlie', 'player': {'id': 13}, 'user': None,
+     'entrants': [{'id': 101, 'event': {'name': 'Singles'}}]},
+]
+
+STANDINGS = [
+    {'placement': 1, 'entrant': {'participants': [{'player': {'id': 13}}]}},
+    {'placement': 2, 'entrant': {'participants': [{'player': {'id': 14}}]}},
+    {'placement': 3, 'entrant': {'participants': [{'player': {'id': 11}}]}},
+]
+
+
+def handler(method, path, body):
+    v = body['variables']
+    nodes = STANDINGS if 'standings' in body['query'] else PARTICIPANTS
+    start = (v['page'] - 1) * v['perPage']
+    connection = {'pageInfo': {'totalPages': -(-len(nodes) // v['perPage'])},
+                  'nodes': nodes[start:start+v['perPage']]}
+    if 'standings' in body['query']:
+        return 200, {'data': {'event': {'standings': connection}}}
+    return 200, {'data': {'tournament': {'participants': connection}}}
+
+
+def test_load_registrations():
+    with StubServer(handler) as stub:
+        with StartggClient(url=stub.url, rate_limiter=None) as client:
+            values = standing_values(client, 'event/prior')
+            df = load_registrations(client, 'tournament/t', per_page=2,
+                                    seed_values={'Singles': values})
+    assert values == {13: 3, 14: 2, 11: 1}
+    assert df.columns.tolist() == ['Participant', 'Tag', 'Player', 'Country',
+                                   'State', 'Singles', 'Singles.Entry',
+                                   'Singles.Value', 'Doubles',
+                                   'Doubles.Entry']
+    assert df['Participant'].tolist() == [1, 2, 3]
+    assert df['State'].tolist() == ['CA', 'NY', None]
+    assert df['Singles'].tolist()[::2] == ['xx', 'xx']
+    assert df['Singles'].isna().tolist() == [False, True, False]
+    assert df['Singles.Value'].tolist()[::2] == [1, 3]
+    assert df['Doubles.Entry'].tolist()[:2] == [200, 200]
+    assert isnan(df.loc[2, 'Doubles.Entry'])
+
+
+def test_load_registrations_renamed_events():
+    with StubServer(handler) as stub:
+        with StartggClient(url=stub.url, rate_limiter=None) as client:
+            df = load_registrations(client, 'tournament/t',
+                                    events={'Doubles': 'DB'},
+                                    locations=['city'], xchar='X')
+    assert df.columns.tolist() == ['Participant', 'Tag', 'Player', 'City',
+                                   'DB', 'DB.Entry']
+    assert df['DB'].notna().tolist() == [True, True, False]
+    assert (df['DB'].dropna() == 'X').all()
@@ -0,0 +1,304 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from curlybrackets.api.startgg import (GQLClient, GQLError, StartggClient,
+                                       AsyncGQLClient, AsyncStartggClient,
+                                       batch_query)
+
+from curlybrackets.testing.stub_server import StubServer
+
+
+def echo_handler(method, path, body):
+    return 200, {'data': {'echo': body['variables']}}
+
+
+def test_execute():
+    with StubServer(echo_handler) as stub:
+        with GQLClient(stub.url) as client:
+            result = client.execute('query Q($x: Int) { echo }', {'x': 1})
+    assert result == {'echo': {'x': 1}}
+
+
+def test_execute_gql_error():
+    def handler(method, path, body):
+        return 200, {'errors': [{'message': 'Bad field',
+                                 'locations': [{'line': 1, 'column': 3}]}]}
+
+    with StubServer(handler) as stub:
+        with GQLClient(stub.url) as client:
+            with pytest.raises(GQLError, match='Bad field'):
+                client.execute('{ bad }')
+
+
+def test_execute_retries():
+    responses = iter([(503, {}), (429, {}), (200, {'data': {'ok': True}})])
+
+    with StubServer(lambda *args: next(responses)) as stub:
+        with GQLClient(stub.url, retries=2) as client:
+            assert client.execute('{ ok }') == {'ok': True}
+    assert len(stub.requests) == 3
+
+
+def test_session_reuses_connection():
+    with StubServer(echo_handler) as stub:
+        with StartggClient('token', url=stub.url, timeout=5) as client:
+            for i in range(5):
+                client.execute('{ echo }', {'i': i})
+    assert len(stub.requests) == 5
+    assert stub.connections == 1
+
+
+def test_async_execute_many():
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def handler(method, path, body):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.pop()
+        return echo_handler(method, path, body)
+
+    async def run(url):
+        async with AsyncStartggClient('token', url=url,
+                                      max_concurrency=3) as client:
+            return await client.execute_many(
+                [('{ echo }', {'i': i}) for i in range(12)]
+            )
+
+    with StubServer(handler) as stub:
+        results = asyncio.run(run(stub.url))
+    assert results == [{'echo': {'i': i}} for i in range(12)]
+    assert 1 < max(peak) <= 3
+
+
+def test_async_execute_retries_and_errors():
+    responses = iter([(503, {}), (200, {'data': {'ok': True}}),
+                      (200, {'errors': [{'message': 'Bad field',
+                                         'locations': []}]})])
+
+    async def run(url):
+        async with AsyncGQLClient(url, retries=1) as client:
+            ok = await client.execute('{ ok }')
+            with pytest.raises(GQLError):
+                await client.execute('{ bad }')
+        return ok
+
+    with StubServer(lambda *args: next(responses)) as stub:
+        assert asyncio.run(run(stub.url)) == {'ok': True}
+
+
+def paged_handler(n_items, max_per_page=None, from_page=1):
+    items = [{'id': i} for i in range(n_items)]
+
+    def handler(method, path, body):
+        page = body['variables']['page']
+        per_page = body['variables']['perPage']
+        if max_per_page and per_page > max_per_page and page >= from_page:
+            return 200, {'errors': [{
+                'message': 'Your query complexity is too high.',
+                'locations': [{'line': 1, 'column': 1}]
+            }]}
+        nodes = items[(page-1)*per_page:page*per_page]
+        total_pages = -(-n_items // per_page)
+        return 200, {'data': {'event': {'entrants': {
+            'pageInfo': {'totalPages': total_pages},
+            'nodes': nodes
+        }}}}
+
+    return handler
+
+
+@pytest.mark.parametrize('n_items, per_page, prefetch, path',
+                         [(23, 5, 0, 'event.entrants'),
+                          (23, 5, 2, ('event', 'entrants')),
+                          (20, 5, 3, None),
+                          (0, 5, 0, None)])
+def test_paginate(n_items, per_page, prefetch, path):
+    with StubServer(paged_handler(n_items)) as stub:
+        with StartggClient(url=stub.url) as client:
+            nodes = list(client.paginate('query', {'eventId': 1}, path=path,
+                                         per_page=per_page,
+                                         prefetch=prefetch))
+    assert nodes == [{'id': i} for i in range(n_items)]
+    pages = sorted(body['variables']['page'] for _, _, body in stub.requests)
+    assert pages == list(range(1, max(-(-n_items // per_page), 1) + 1))
+
+
+def test_paginate_reduces_page_size():
+    with StubServer(paged_handler(30, max_per_page=8)) as stub:
+        with StartggClient(url=stub.url) as client:
+            nodes = list(client.paginate('query', {'perPage': 25},
+                                         path='event.entrants'))
+    assert nodes == [{'id': i} for i in range(30)]
+    per_pages = [body['variables']['perPage'] for _, _, body in stub.requests]
+    assert per_pages[:3] == [25, 12, 6]
+    assert set(per_pages[2:]) == {6}
+
+
+def test_paginate_reduces_page_size_midway():
+    with StubServer(paged_handler(30, max_per_page=5, from_page=2)) as stub:
+        with StartggClient(url=stub.url) as client:
+            nodes = list(client.paginate('query', path='event.entrants',
+                                         per_page=9))
+    assert nodes == [{'id': i} for i in range(30)]
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_paginate_reduces_page_size_after_total_pages(prefetch):
+    # The page count from the larger pages must not cut iteration short
+    with StubServer(paged_handler(200, max_per_page=25, from_page=3)) as stub:
+        with StartggClient(url=stub.url) as client:
+            nodes = list(client.paginate('query', path='event.entrants',
+                                         per_page=50, prefetch=prefetch))
+    assert nodes == [{'id': i} for i in range(200)]
+
+
+def batch_handler(max_fields=None):
+    def handler(method, path, body):
+        variables = body['variables']
+        if max_fields and len(variables) > max_fields:
+            return 200, {'errors': [{'message': 'Query complexity too high',
+                                     'locations': []}]}
+        data = {}
+        for k, v in variables.items():
+            i = k.split('_')[-1]
+            data[f'b{i}'] = {'id': v, 'seeds': [v * 10, v * 10 + 1]}
+        return 200, {'data': data}
+    return handler
+
+
+def test_batch_query():
+    query, variables = batch_query('phaseGroup(id: $id) { id }',
+                                   [{'id': 5}, {'id': 6}], {'id': 'ID'})
+    assert query == ('query Batch($id_0: ID, $id_1: ID) {\n'
+                     '  b0: phaseGroup(id: $id_0) { id }\n'
+                     '  b1: phaseGroup(id: $id_1) { id }\n'
+                     '}')
+    assert variables == {'id_0': 5, 'id_1': 6}
+
+
+def test_execute_batched():
+    items = [{'id': i} for i in range(45)]
+    with StubServer(batch_handler(max_fields=10)) as stub:
+        with GQLClient(stub.url) as client:
+            results = client.execute_batched('phaseGroup(id: $id) { id }',
+                                             items, {'id': 'ID'})
+    assert results == [{'id': i, 'seeds': [i*10, i*10 + 1]} for i in range(45)]
+    # One rejected batch of 20, then batches of 10
+    assert len(stub.requests) == 6
+
+
+def test_async_execute_batched():
+    items = [{'id': i} for i in range(45)]
+
+    async def run(url):
+        async with AsyncGQLClient(url) as client:
+            return await client.execute_batched('phaseGroup(id: $id) { id }',
+                                                items, {'id': 'ID'})
+
+    with StubServer(batch_handler(max_fields=10)) as stub:
+        results = asyncio.run(run(stub.url))
+    assert results == [{'id': i, 'seeds': [i*10, i*10 + 1]} for i in range(45)]
+
+
+def test_async_client_across_event_loops():
+    def handler(method, path, body):
+        time.sleep(0.01)
+        return echo_handler(method, path, body)
+
+    async def run(client):
+        return await client.execute_many(
+            ('query Q($x: Int) { echo }', {'x': i}) for i in range(4)
+        )
+
+    # The concurrency limit is contended in both loops
+    with StubServer(handler) as stub:
+        client = AsyncGQLClient(stub.url, max_concurrency=1)
+        try:
+            for _ in range(2):
+                results = asyncio.run(run(client))
+                assert results == [{'echo': {'x': i}} for i in range(4)]
+        finally:
+            client.close()
+
+
+def _async_paginate(url, *args, **kwargs):
+    async def run():
+        async with AsyncStartggClient(url=url, rate_limiter=None,
+                                      max_concurrency=3) as client:
+            return await client.paginate(*args, **kwargs)
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('n_items, per_page, path',
+                         [(23, 5, 'event.entrants'),
+                          (20, 5, ('event', 'entrants')),
+                          (3, 5, None),
+                          (0, 5, None)])
+def test_async_paginate(n_items, per_page, path):
+    with StubServer(paged_handler(n_items)) as stub:
+        nodes = _async_paginate(stub.url, 'query', {'eventId': 1}, path=path,
+                                per_page=per_page)
+    assert nodes == [{'id': i} for i in range(n_items)]
+    pages = sorted(body['variables']['page'] for _, _, body in stub.requests)
+    assert pages == list(range(1, max(-(-n_items // per_page), 1) + 1))
+
+
+def test_async_paginate_concurrent():
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+    paged = paged_handler(40)
+
+    def handler(method, path, body):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.pop()
+        return paged(method, path, body)
+
+    with StubServer(handler) as stub:
+        nodes = _async_paginate(stub.url, 'query', path='event.entrants',
+                                per_page=4)
+    assert nodes == [{'id': i} for i in range(40)]
+    assert 1 < max(peak) <= 3
+
+
+@pytest.mark.parametrize('max_per_page, from_page', [(8, 1), (25, 3), (4, 2)])
+def test_async_paginate_reduces_page_size(max_per_page, from_page):
+    handler = paged_handler(200, max_per_page=max_per_page, from_page=from_page)
+    with StubServer(handler) as stub:
+        nodes = _async_paginate(stub.url, 'query', path='event.entrants',
+                                per_page=50)
+    assert nodes == [{'id': i} for i in range(200)]
+
+
+def test_async_paginate_without_page_count():
+    def handler(method, path, body):
+        status, result = paged_handler(13)(method, path, body)
+        del result['data']['event']['entrants']['pageInfo']
+        return status, result
+
+    with StubServer(handler) as stub:
+        nodes = _async_paginate(stub.url, 'query', per_page=5)
+    assert nodes == [{'id': i} for i in range(13)]
+
+
+def test_async_client_is_not_a_sync_client():
+    # Code taking a GQLClient must not get coroutines back
+    with StubServer(echo_handler) as stub:
+        client = AsyncGQLClient(stub.url)
+        try:
+            assert not isinstance(client, GQLClient)
+            assert client.client.execute('{ echo }', {'x': 1}) == {'echo': {'x': 1}}
+        finally:
+            client.close()
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from curlybrackets.assignment import compute as c
+from curlybrackets.assignment import utilities as u
+
+from curlybrackets.testing.assignment_problem import make_problem
+
+
+@pytest.fixture(scope='module')
+def schedule_frame():
+    df, events, pools = make_problem(80)
+    df = u.add_phase_columns({}, df, events, 'xx')
+    phases = [e+'..1' for e in events]
+    rng = random.Random(1)
+    for ph, e in zip(phases, events):
+        entered = df[ph].notna()
+        df.loc[entered, ph] = [rng.choice(pools[e] + ['xx'])
+                               for _ in range(entered.sum())]
+    return df, phases, u.get_phase_wave_maps({}, pools, events)
+
+
+@pytest.mark.parametrize('keep_assigned', [False, True])
+def test_compute_schedule_minimums(schedule_frame, keep_assigned):
+    df, phases, wave_maps = schedule_frame
+    expected = df.apply(c.compute_schedule_minimum, axis=1,
+                        args=(phases, wave_maps), keep_assigned=keep_assigned,
+                        xchar='xx', external='Ext')
+    memo = c.ScheduleMemo()
+    result = c.compute_schedule_minimums(df, phases, wave_maps,
+                                         keep_assigned=keep_assigned,
+                                         xchar='xx', external='Ext', memo=memo)
+    assert result.tolist() == expected.tolist()
+    assert memo.hits + memo.misses == len(df)
+    assert memo.misses == len(memo) < len(df)
+
+    # A shared memo answers a repeated call entirely from the cache, but
+    # does not reuse results for different settings
+    n_signatures = memo.misses
+    c.compute_schedule_minimums(df, phases, wave_maps, keep_assigned=keep_assigned,
+                                xchar='xx', external='Ext', memo=memo)
+    assert memo.misses == n_signatures
+    c.compute_schedule_minimums(df, phases, wave_maps, keep_assigned=keep_assigned,
+                                xchar='xx', external='Ext', memo=memo, scm=3.0)
+    assert memo.misses == 2 * n_signatures
+
+
+def test_schedule_memo_lru():
+    memo = c.ScheduleMemo(maxsize=2)
+    for k in ['a', 'b', 'a', 'c', 'b']:
+        memo.get(k, lambda: k.upper())
+    assert (memo.hits, memo.misses, len(memo)) == (1, 4, 2)
+    assert memo.hit_rate == pytest.approx(0.2)
+
+
+def test_schedule_memo_settings():
+    _, events, pools = make_problem(10)
+    phase_maps = u.maps_from_transitions({'SF': {p: 'C1' for p in pools['SF']}}, pools)
+    memo = c.ScheduleMemo()
+
+    # Wave maps are built once per phase map, and keyed by their contents
+    wave_maps = memo.wave_maps(phase_maps, pools, events)
+    again = memo.wave_maps(phase_maps, pools, events)
+    assert all(again[e] is wave_maps[e] for e in events)
+    phases = ['SF..1', 'SF..2', 'MK..1']
+    key = memo.settings(phases, wave_maps, True, 'xx')
+    fresh = u.get_phase_wave_maps(phase_maps, pools, events)
+    assert memo.settings(phases, fresh, True, 'xx') == key
+    fresh['MK'] = fresh['MK'].iloc[:1]
+    assert memo.settings(phases, fresh, True, 'xx') != key
+
+
+def test_compute_score_change_schedule_memo():
+    df, events, pools = make_problem(40)
+    rng = random.Random(2)
+    for e in events:
+        entered = df[e].notna()
+        df.loc[entered, e] = [rng.choice(pools[e]) for _ in range(entered.sum())]
+    df = u.add_value_columns(u.add_entry_columns(df, events, 'Id'), events)
+    entries = df.loc[df['SF'].notna(), 'SF.Entry'].tolist()[:2]
+    newdf = df.copy()
+    swapped = newdf['SF.Entry'].isin(entries)
+    newdf.loc[swapped, 'SF'] = df.loc[swapped, 'SF'].values[::-1]
+
+    kwargs = dict(xchar='xx', external='Ext', min_schedule_calc=True)
+    expected = c.compute_score_change(df, newdf, entries, 'SF', events, ['State'],
+                                      pools, **kwargs)
+    memo = c.ScheduleMemo(maxsize=8)
+    for _ in range(2):
+        assert c.compute_score_change(df, newdf, entries, 'SF', events, ['State'],
+                                      pools, schedule_memo=memo, **kwargs) == expected
+    assert memo.hits >= 4
+
+
+def test_fused_true_event_scores():
+    df, events, pools = make_problem(40)
+    rng = random.Random(4)
+    for e in events:
+        entered = df[e].notna()
+        df.loc[entered, e] = [rng.choice(pools[e]) for _ in range(entered.sum())]
+    df = u.add_value_columns(u.add_entry_columns(df, events, 'Id'), events)
+    df['Ext'] = df['Ext'].fillna('')
+    true_events = ['SF', 'BB']
+    kwargs = dict(xchar='xx', external='Ext')
+
+    fused = c.compute_minimum_score(df, events, ['State'], pools, true_events=true_events,
+                                    return_components=True, **kwargs)
+    assert fused['true_schedule'] > 0
+    assert sum(fused.values()) == pytest.approx(
+        c.compute_minimum_score(df, events, ['State'], pools, **kwargs)
+        + c.compute_minimum_score(df, true_events, ['State'], pools,
+                                  phase_distrib_calc='none', **kwargs))
+
+    fused = c.compute_current_score(df, events, ['State'], pools, true_events=true_events,
+                                    return_components=True, **kwargs)
+    assert sum(fused.values()) == pytest.approx(
+        c.compute_current_score(df, events, ['State'], pools, **kwargs)
+        + c.compute_current_score(df, true_events, ['State'], pools,
+                                  phase_distrib_calc='none', **kwargs))
+
+    entries = df.loc[df['BB'].notna(), 'BB.Entry'].tolist()[:2]
+    newdf = df.copy()
+    swapped = newdf['BB.Entry'].isin(entries)
+    newdf.loc[swapped, 'BB'] = df.loc[swapped, 'BB'].values[::-1]
+    expected = (c.compute_score_change(df, newdf, entries, 'BB', events, ['State'],
+                                       pools, **kwargs)
+                + c.compute_score_change(df, newdf, entries, 'BB', true_events, ['State'],
+                                         pools, phase_distrib_calc='none', **kwargs))
+    assert c.compute_score_change(df, newdf, entries, 'BB', events, ['State'], pools,
+                                  true_events=true_events, **kwargs) == pytest.approx(expected)
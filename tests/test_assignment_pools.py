@@ -0,0 +1,233 @@
+import random
+
+import pytest
+
+from curlybrackets.assignment import compute as c
+from curlybrackets.assignment import pools as p
+from curlybrackets.assignment import utilities as u
+
+from curlybrackets.testing.assignment_problem import make_problem
+
+
+def _conflict_state(df, events, pools, xdf, swappable):
+    buckets = u.PoolBuckets({e: xdf.groupby(e+'.Entry')[e].first().loc[swappable[e]]
+                             for e in events})
+    members = {e: xdf.groupby(e+'.Entry').groups for e in events}
+    proposer = p.ConflictProposal(df, xdf, events, ['State'], pools, buckets, members,
+                                  xchar='xx', external='Ext')
+    return buckets, members, proposer
+
+
+def _forward(proposer, e, chosen):
+    labels = [proposer.label(e, x) for x in chosen]
+    weights = [proposer._weight(e, x, l) for x, l in zip(chosen, labels)]
+    return proposer._pair_probability(e, chosen, labels, weights, proposer._total[e])
+
+
+def test_conflict_proposal():
+    df, events, pools = make_problem(30)
+    df = u.add_value_columns(u.add_entry_columns(df, events, 'Id'), events)
+    df = p._append_dummies(df, 'Id', events, ['State'], pools, 'xx')
+    df['Ext'] = df['Ext'].fillna('')
+    random.seed(0)
+    xdf, cutoffs, swappable = p._set_initial_state(df.copy(), events, pools, 'xx')
+    buckets, members, proposer = _conflict_state(df, events, pools, xdf, swappable)
+
+    for _ in range(10):
+        newdf, e, chosen = p._make_candidate_swap(xdf, cutoffs, proposer, members)
+        assert proposer.label(e, chosen[0]) != proposer.label(e, chosen[1])
+        ratio = proposer.hastings_ratio(e, chosen, newdf)
+
+        # Reverse probability matches a proposer built from the new state
+        forward = _forward(proposer, e, chosen)
+        _, _, fresh = _conflict_state(df, events, pools, newdf, swappable)
+        assert ratio == pytest.approx(_forward(fresh, e, chosen) / forward)
+
+        proposer.accept()
+        buckets.swap(e, *chosen)
+        xdf = newdf
+
+    for e in events:
+        assert proposer._total[e] == pytest.approx(fresh._total[e])
+        assert proposer._hot[e] == fresh._hot[e]
+
+
+def test_assign_pools_conflict_proposal():
+    df, events, pools = make_problem(24)
+    random.seed(1)
+    res = p.assign_pools(df, 'Id', events, ['State'], pools, external='Ext',
+                         max_iters=30, return_full=True, proposal='conflict')
+    for e in events:
+        counts = res[e].value_counts()
+        assert set(counts.index) <= set(pools[e])
+        assert counts.max() - counts.min() <= 1
+
+    with pytest.raises(ValueError):
+        p.assign_pools(df, 'Id', events, ['State'], pools, max_iters=1, proposal='greedy')
+
+
+def test_assign_pools_greedy_init():
+    df, events, pools = make_problem(40)
+    scores = {}
+    for init in ['random', 'greedy']:
+        random.seed(0)
+        res, curr_score, min_score = p.assign_pools(df, 'Id', events, ['State'], pools,
+                                                    external='Ext', max_iters=2,
+                                                    tolerance=1e9, return_full=True,
+                                                    return_scores=True, init=init)
+        for e in events:
+            counts = res[e].value_counts()
+            assert counts.max() - counts.min() <= 1
+        scores[init] = curr_score - min_score
+    assert scores['greedy'] < scores['random']
+
+
+def test_assign_pools_return_iters():
+    df, events, pools = make_problem(30)
+    random.seed(3)
+    res, iters = p.assign_pools(df, 'Id', events, ['State'], pools, external='Ext',
+                                max_iters=20, return_iters=True)
+    assert iters == 20
+    *_, iters = p.assign_pools(df, 'Id', events, ['State'], pools, external='Ext',
+                               max_iters=20, tolerance=1e9, return_scores=True,
+                               return_iters=True)
+    assert iters == 0
+
+    # Components split the iteration budget, rounding their shares up
+    pools['MK'] = ['C5', 'C6', 'D5', 'D6']
+    pools['BB'] = ['C7', 'D7']
+    *_, iters = p.assign_pools(df, 'Id', events, ['State'], pools, external='Ext',
+                               max_iters=20, return_scores=True, return_iters=True,
+                               decompose=True)
+    assert 20 <= iters <= 22
+
+
+@pytest.mark.parametrize('decompose', [False, True])
+def test_assign_pools_return_components(decompose):
+    df, events, pools = make_problem(30)
+    pools['BB'] = ['C7', 'D7']
+    kwargs = dict(external='Ext', true_events=['MK'], max_iters=40, return_scores=True,
+                  decompose=decompose)
+    random.seed(3)
+    _, curr_score, min_score = p.assign_pools(df, 'Id', events, ['State'], pools, **kwargs)
+    random.seed(3)
+    res, curr_scores, min_scores = p.assign_pools(df, 'Id', events, ['State'], pools,
+                                                  return_components=True, **kwargs)
+    assert set(curr_scores) == set(min_scores) == {'schedule', 'distribution',
+                                                  'true_schedule'}
+    assert sum(curr_scores.values()) == pytest.approx(curr_score)
+    assert sum(min_scores.values()) == pytest.approx(min_score)
+
+    # The running totals are the components of the final assignment
+    full = u.add_value_columns(u.add_entry_columns(res.copy(), events, 'Id'), events)
+    expected = c.compute_current_score(full, events, ['State'], pools, external='Ext',
+                                       true_events=['MK'], return_components=True)
+    assert curr_scores == pytest.approx(expected)
+
+
+def test_event_components():
+    df, events, pools = make_problem(30)
+    assert p._event_components(df, events, pools, {}) == [events]
+
+    # Separate blocks make BB independent, even with shared entrants
+    pools['BB'] = ['C7', 'D7']
+    assert p._event_components(df, events, pools, {}) == [['SF', 'MK'], ['BB']]
+
+    # Shared blocks without shared entrants do not couple events
+    pools['BB'] = ['A7', 'B7']
+    df.loc[df['SF'].notna(), 'BB'] = float('nan')
+    assert p._event_components(df, events, pools, {}) == [['SF', 'MK'], ['BB']]
+
+    # A true event sharing entrants and blocks with two events ties them
+    # together, and one touching no event goes with the first component
+    df, events, pools = make_problem(30)
+    pools['MK'] = ['C5', 'C6', 'D5', 'D6']
+    pools['BB'] = ['E7', 'F7']
+    assert p._event_components(df, events, pools, {}) == [['SF'], ['MK'], ['BB']]
+    df['TR'] = ['C9', 'E9'] * 15
+    pools['TR'] = ['C9', 'E9']
+    assert p._event_components(df, events, pools, {}, ['TR']) == [['SF'], ['MK', 'BB', 'TR']]
+    df['TR'] = 'G9'
+    pools['TR'] = ['G9']
+    assert p._event_components(df, events, pools, {}, ['TR']) == [['SF', 'TR'], ['MK'], ['BB']]
+
+
+@pytest.mark.parametrize('max_workers', [None, 2])
+def test_assign_pools_decompose(max_workers):
+    df, events, pools = make_problem(30)
+    pools['MK'] = ['C5', 'C6', 'D5', 'D6']
+    pools['BB'] = ['C7', 'D7']
+    random.seed(3)
+    res, curr_score, min_score = p.assign_pools(df, 'Id', events, ['State'], pools,
+                                                external='Ext', max_iters=20,
+                                                return_full=True, return_scores=True,
+                                                decompose=True, max_workers=max_workers)
+    assert res['Id'].is_unique
+    for e in events:
+        counts = res[e].value_counts()
+        assert set(counts.index) <= set(pools[e])
+        assert counts.max() - counts.min() <= 1
+
+    # The combined score is the score of the combined assignment
+    full = u.add_value_columns(u.add_entry_columns(res.copy(), events, 'Id'), events)
+    full['Ext'] = full['Ext'].fillna('')
+    assert curr_score == pytest.approx(c.compute_current_score(full, events, ['State'], pools,
+                                                               external='Ext'))
+
+
+def _pre_assign(df, e, pools):
+    rows = df[e].notna()
+    df.loc[rows, e] = [pools[i % len(pools)] for i in range(rows.sum())]
+
+
+@pytest.mark.parametrize('max_iters', [20, None])
+def test_assign_pools_decompose_fixed_component(max_iters):
+    df, events, pools = make_problem(30)
+    pools['MK'] = ['C5', 'C6', 'D5', 'D6']
+    pools['BB'] = ['C7', 'D7']
+    _pre_assign(df, 'BB', pools['BB'])
+    random.seed(3)
+    res, curr_score, min_score, iters = p.assign_pools(df, 'Id', events, ['State'], pools,
+                                                       external='Ext', max_iters=max_iters,
+                                                       tolerance=1, return_scores=True,
+                                                       return_iters=True, decompose=True)
+    assert res['BB'].equals(df['BB'])
+    assert res[['SF', 'MK']].isin(pools['SF'] + pools['MK'] + [float('nan')]).all().all()
+    full = u.add_value_columns(u.add_entry_columns(res.copy(), events, 'Id'), events)
+    assert curr_score == pytest.approx(c.compute_current_score(full, events, ['State'], pools,
+                                                               external='Ext'))
+    if max_iters is not None:
+        assert 0 < iters <= max_iters + 2
+
+    # With every entry pre-assigned there is nothing to anneal
+    for e in ['SF', 'MK']:
+        _pre_assign(df, e, pools[e])
+    res, iters = p.assign_pools(df, 'Id', events, ['State'], pools, external='Ext',
+                                max_iters=max_iters, return_iters=True, decompose=True)
+    assert res[events].equals(df[events])
+    assert iters == 0
+
+
+def test_assign_pools_decompose_true_events():
+    df, events, pools = make_problem(30)
+    pools['MK'] = ['C5', 'C6', 'D5', 'D6']
+    pools['BB'] = ['E7', 'F7']
+    # Fixed true event linking MK and BB through blocks C and E
+    df['TR'] = ['C9', 'E9', float('nan')] * 10
+    pools['TR'] = ['C9', 'E9']
+    true_events = ['MK', 'BB', 'TR']
+    assert p._event_components(df, events, pools, {}, true_events) == [['SF'], ['MK', 'BB', 'TR']]
+
+    scores = {}
+    for decompose in [False, True]:
+        random.seed(3)
+        res, curr_score, min_score = p.assign_pools(df, 'Id', events, ['State'], pools,
+                                                    external='Ext', true_events=true_events,
+                                                    max_iters=20, return_full=True,
+                                                    return_scores=True, decompose=decompose)
+        full = u.add_value_columns(u.add_entry_columns(res.copy(), events, 'Id'), events)
+        full['Ext'] = full['Ext'].fillna('')
+        assert curr_score == pytest.approx(c.compute_current_score(
+            full, events, ['State'], pools, external='Ext', true_events=true_events))
+        scores[decompose] = min_score
+    assert scores[True] == pytest.approx(scores[False])
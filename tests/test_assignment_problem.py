@@ -0,0 +1,94 @@
+import random
+
+import numpy as np
+import pytest
+
+from curlybrackets.assignment import analyze as a
+from curlybrackets.assignment import compute as c
+from curlybrackets.assignment import pools as p
+from curlybrackets.assignment import seeds as s
+from curlybrackets.assignment.problem import AssignmentProblem
+
+from curlybrackets.testing.assignment_problem import make_problem
+
+
+def test_assign_pools_with_problem(monkeypatch):
+    df, events, pools = make_problem(30)
+    random.seed(3)
+    expected = p.assign_pools(df, 'Id', events, ['State'], pools, external='Ext',
+                              max_iters=40, return_scores=True)
+
+    problem = AssignmentProblem(df, 'Id', events, ['State'], pools, external='Ext')
+    random.seed(3)
+    res = p.assign_pools(problem, max_iters=40, return_scores=True)
+    assert res[0].equals(expected[0])
+    assert res[1:] == pytest.approx(expected[1:])
+
+    # Rerunning reuses the cached minimum score
+    calls = []
+    monkeypatch.setattr(c, 'compute_minimum_score', lambda *args, **kwargs: calls.append(1))
+    random.seed(3)
+    again = p.assign_pools(problem, max_iters=40, return_scores=True)
+    assert not calls
+    assert again[0].equals(expected[0])
+    assert problem.minimum_score() == pytest.approx(expected[2])
+
+
+def test_assign_seed_pools_with_problem():
+    df, events, pools = make_problem(32, values=True)
+    random.seed(0)
+    np.random.seed(0)
+    expected = s.assign_seed_pools(df, 'Id', events, ['State'], pools, external='Ext',
+                                   max_iters=20, return_scores=True)
+
+    problem = AssignmentProblem(df, 'Id', events, ['State'], pools, external='Ext')
+    for _ in range(2):
+        random.seed(0)
+        np.random.seed(0)
+        res, order, curr_score, min_score = s.assign_seed_pools(problem, max_iters=20,
+                                                                return_scores=True)
+        assert res.equals(expected[0])
+        assert curr_score == pytest.approx(expected[2])
+        assert min_score == pytest.approx(expected[3])
+
+    # Schedule minimums are shared through the problem's memo across runs
+    memo = problem.schedule_memo
+    assert memo.hits > memo.misses == len(memo) > 0
+
+
+def test_analyze_with_problem():
+    df, events, pools = make_problem(30)
+    problem = AssignmentProblem(df, 'Id', events, ['State'], pools, external='Ext')
+    random.seed(5)
+    res = p.assign_pools(problem, max_iters=20)
+
+    assert a.find_schedule_conflicts(res, problem) == \
+        a.find_schedule_conflicts(res, events, xchar='xx', pools=pools)
+    assert a.find_external_conflicts(res, problem) == \
+        a.find_external_conflicts(res, events, external='Ext', xchar='xx', pools=pools)
+    assert a.find_suboptimal_schedules(res, problem) == \
+        a.find_suboptimal_schedules(res, events, pools=pools, xchar='xx')
+    assert a.find_suboptimal_distributions(res, problem, return_costs=True) == \
+        a.find_suboptimal_distributions(res, events, ['State'], pools, pk='Id',
+                                        return_costs=True)
+    assert a.get_distribution(res, 'SF', 'State', 'CA', problem=problem).equals(
+        a.get_distribution(res, 'SF', 'State', 'CA', pk='Id', pools=pools))
+
+
+def test_problem_is_read_only():
+    df, events, pools = make_problem(20)
+    problem = AssignmentProblem(df, 'Id', events, ['State'], pools)
+    with pytest.raises(TypeError):
+        problem.members['SF']['P0'] = None
+    with pytest.raises(TypeError):
+        problem.phase_maps['SF'] = None
+    frame = problem.pool_frame
+    frame['SF'] = 'A1'
+    assert (problem.pool_frame['SF'] != 'A1').any()
+    settings = problem.settings()
+    settings['pools']['SF'].append('Z9')
+    assert 'Z9' not in problem.settings()['pools']['SF']
+    assert problem.schedule_memo.maxsize == 4096
+
+    with pytest.raises(ValueError):
+        AssignmentProblem(df.iloc[[0, 0]], 'Id', events, ['State'], pools)
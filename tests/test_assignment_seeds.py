@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+import pytest
+
+from curlybrackets.assignment import seeds as s
+
+from curlybrackets.testing.assignment_problem import make_problem
+
+
+def test_assign_seed_pools_greedy_init():
+    df, events, pools = make_problem(32, values=True)
+    random.seed(0)
+    np.random.seed(0)
+    res, order, curr_score, min_score = s.assign_seed_pools(
+        df, 'Id', events, ['State'], pools, external='Ext', max_iters=2,
+        tolerance=1e9, return_scores=True, return_seeds=True, init='greedy')
+
+    # Greedy placement only reorders seeds within each value tier
+    seeded = res['SF.Seed'].notna()
+    ranks = df.loc[seeded, 'SF.Value'].rank(method='first', ascending=False)
+    for v in df.loc[seeded, 'SF.Value'].unique():
+        tier = df.loc[seeded, 'SF.Value'] == v
+        assert sorted(res.loc[seeded].loc[tier, 'SF.Seed']) == sorted(ranks.loc[tier])
+    counts = res.loc[seeded, 'SF'].value_counts()
+    assert counts.max() - counts.min() <= 1
+
+
+def test_assign_seed_pools_return_iters():
+    df, events, pools = make_problem(32, values=True)
+    random.seed(0)
+    np.random.seed(0)
+    res, order, iters = s.assign_seed_pools(df, 'Id', events, ['State'], pools,
+                                            external='Ext', max_iters=5, return_iters=True)
+    assert iters == 5
+    res, iters = s.assign_seed_pools(df, 'Id', events, ['State'], pools, external='Ext',
+                                     max_iters=5, tolerance=1e9, return_order=False,
+                                     return_iters=True)
+    assert iters == 0
+
+
+def test_assign_seed_pools_return_components():
+    df, events, pools = make_problem(32, values=True)
+    scores = []
+    for return_components in [False, True]:
+        random.seed(0)
+        np.random.seed(0)
+        scores.append(s.assign_seed_pools(df, 'Id', events, ['State'], pools, external='Ext',
+                                          max_iters=30, return_order=False, return_scores=True,
+                                          return_components=return_components)[1:])
+    (curr_score, min_score), (curr_scores, min_scores) = scores
+    assert set(curr_scores) == set(min_scores) == {'seed_distribution', 'schedule',
+                                                  'distribution', 'true_schedule'}
+    assert sum(curr_scores.values()) == pytest.approx(curr_score)
+    assert sum(min_scores.values()) == pytest.approx(min_score)
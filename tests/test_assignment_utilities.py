@@ -0,0 +1,48 @@
+import random
+
+from pandas import Series
+
+from curlybrackets.assignment import utilities as u
+
+
+def _check_buckets(buckets, e, expected):
+    assert buckets.labels(e).to_dict() == expected
+    assert sorted(buckets._labels[e]) == sorted(set(expected.values()))
+    for label, bucket in buckets._buckets[e].items():
+        assert sorted(bucket) == sorted(k for k, v in expected.items() if v == label)
+        for i, entry in enumerate(bucket):
+            assert buckets._position[e][entry] == i
+
+
+def test_pool_buckets():
+    rng = random.Random(0)
+    assigned = {i: rng.choice(['A1', 'A2', 'B1']) for i in range(30)}
+    buckets = u.PoolBuckets({'SF': Series(assigned)})
+    _check_buckets(buckets, 'SF', assigned)
+
+    random.seed(0)
+    for _ in range(50):
+        a, b = buckets.sample_pair('SF')
+        assert buckets.label('SF', a) != buckets.label('SF', b)
+        buckets.swap('SF', a, b)
+        assigned[a], assigned[b] = assigned[b], assigned[a]
+    _check_buckets(buckets, 'SF', assigned)
+
+    for entry in [k for k, v in assigned.items() if v == 'B1']:
+        buckets.move('SF', entry, 'B2')
+        assigned[entry] = 'B2'
+    _check_buckets(buckets, 'SF', assigned)
+    assert 'B1' not in buckets._labels['SF']
+
+
+def test_maps_from_transitions():
+    pools = {'SF': ['A1', 'A2', 'B1', 'B2']}
+    transitions = {'SF': [{'A1': 'C1', 'A2': 'C1', 'B1': 'C2', 'B2': 'C2'},
+                          Series({'C1': 'D1', 'C2': 'D1'})]}
+    pmap = u.maps_from_transitions(transitions, pools)['SF']
+
+    assert pmap.index.tolist() == ['A1', 'A2', 'B1', 'B2', 'C1', 'C2', 'D1']
+    assert pmap.columns.tolist() == ['SF..1', 'SF..2', 'SF..3']
+    assert pmap['SF..2'].tolist()[:6] == ['C1', 'C1', 'C2', 'C2', 'C1', 'C2']
+    assert pmap['SF..3'].tolist() == ['D1'] * 7
+    assert pmap['SF..1'].notna().sum() == 4
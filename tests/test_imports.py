@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize('module, heavy',
+                         [('curlybrackets.pdf', ['reportlab', 'PyPDF2']),
+                          ('curlybrackets.assignment', ['pandas', 'numpy']),
+                          ('curlybrackets.testing', ['pandas', 'numpy']),
+                          ('curlybrackets', ['reportlab', 'pandas'])])
+def test_lazy_import(module, heavy):
+    code = (f'import sys, {module}; '
+            f'print(",".join(m for m in {heavy!r} if m in sys.modules))')
+    proc = subprocess.run([sys.executable, '-c', code],
+                          capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == ''
+
+
+def test_lazy_attributes():
+    import curlybrackets.pdf as cbpdf
+    import curlybrackets.assignment as cbassign
+    from curlybrackets.pdf.creator import print_bracket
+    from curlybrackets.assignment.pools import assign_pools
+
+    assert cbpdf.print_bracket is print_bracket
+    assert cbassign.assign_pools is assign_pools
+    with pytest.raises(AttributeError):
+        cbpdf.not_a_function
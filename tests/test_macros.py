@@ -1,8 +1,13 @@
-from io import StringIO
+from io import BytesIO, StringIO
 
 import pytest
+from PyPDF2 import PdfFileReader
 
 import curlybrackets.macros as cbmacro
+from curlybrackets.api.challonge_v2 import ChallongeClient
+from curlybrackets.api.startgg import StartggClient
+
+from curlybrackets.testing.stub_server import StubServer
 
 
 @pytest.mark.parametrize('uniform_length', [None, 'event', 'all'])
@@ -108,3 +113,59 @@ C,2,4
         'KI': ['A11', 'A12', 'B11', 'B12', 'B13', 'C11', 'C12']
     }
     assert cbmacro._read_pools_from_schedule(stream) == expected
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://www.start.gg/tournament/genesis-9/event/melee-singles/brackets/'
+     '1234/5678', ('startgg', '5678')),
+    ('https://challonge.com/abc123', ('challonge', 'abc123')),
+    ('https://challonge.com/fr/abc123', ('challonge', 'abc123')),
+    ('https://myorg.challonge.com/abc123/', ('challonge', 'myorg-abc123')),
+])
+def test_parse_bracket_url(url, expected):
+    assert cbmacro.parse_bracket_url(url) == expected
+
+
+def test_print_brackets_from_urls():
+    def startgg_handler(method, path, body):
+        if 'page' not in body['variables']:
+            return 200, {'data': {'phaseGroup': {
+                'displayIdentifier': 'A1', 'bracketType': 'DOUBLE_ELIMINATION',
+                'phase': {'event': {'name': 'Singles'}}
+            }}}
+        seeds = [{'seedNum': i+1, 'entrant': {'name': 'P{}'.format(i+1)}}
+                 for i in range(6)]
+        page, per_page = body['variables']['page'], body['variables']['perPage']
+        return 200, {'data': {'phaseGroup': {
+            'seeds': {'pageInfo': {'totalPages': -(-6 // per_page)},
+                      'nodes': seeds[(page-1)*per_page:page*per_page]}
+        }}}
+
+    def challonge_handler(method, path, body):
+        if path.startswith('/tournaments/abc.json'):
+            return 200, {'data': {'id': '7', 'type': 'tournament',
+                                  'attributes': {'name': 'Doubles',
+                                                 'tournament_type':
+                                                 'double elimination'}}}
+        names = ['Team 2', 'Team 1', '[[Bye 1]]', 'Team 3']
+        return 200, {'data': [{'id': str(i), 'type': 'participant',
+                               'attributes': {'name': n, 'seed': s}}
+                              for i, (n, s) in enumerate(zip(names,
+                                                             [2, 1, 4, 3]))]}
+
+    output = BytesIO()
+    with StubServer(startgg_handler) as sgg, \
+            StubServer(challonge_handler) as chl:
+        with StartggClient(url=sgg.url, rate_limiter=None) as client:
+            cbmacro.print_brackets_from_urls(
+                output,
+                ['https://start.gg/tournament/t/event/e/brackets/1/5678',
+                 'https://challonge.com/abc'],
+                startgg_client=client,
+                challonge_client=ChallongeClient(url=chl.url),
+                bracket_size=8
+            )
+    assert PdfFileReader(BytesIO(output.getvalue())).getNumPages() == 2
+    assert len(sgg.requests) == 2
+    with pytest.raises(ValueError):
+        cbmacro.print_brackets_from_urls(output, ['https://challonge.com/abc'])
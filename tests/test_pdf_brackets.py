@@ -0,0 +1,42 @@
+import pytest
+
+from curlybrackets.pdf.brackets import TemplateLookup
+
+
+@pytest.mark.parametrize('params, expected',
+                         [(dict(format='double-elimination', n_entrants=16),
+                           '16player_Bracket.pdf'),
+                          (dict(format='double-elimination', n_entrants=32,
+                                n_advance=12),
+                           '32player_12out_Bracket.pdf'),
+                          (dict(format='double-elimination', n_in_winners=4,
+                                n_in_losers=8, n_advance=4),
+                           '4w8l_4out_Bracket.pdf'),
+                          (dict(format='double-elimination', n_in_winners=8,
+                                n_in_losers=8, n_advance=2),
+                           '16player_2out_Bracket.pdf'),
+                          (dict(format='double-elimination', n_entrants=8,
+                                n_advance=0, source='playpool'),
+                           'playpool8de.pdf'),
+                          (dict(format='double-elimination', n_in_winners=2,
+                                n_in_losers=4, n_advance=2),
+                           '8player_Bracket.pdf'),
+                          (dict(format='round-robin', n_entrants=11,
+                                n_advance=4),
+                           '11player_RRGrid.pdf'),
+                          (dict(format='single-elimination', n_entrants=64,
+                                source='playpool'),
+                           None)])
+def test_template_search(params, expected):
+    if expected is None:
+        with pytest.raises(ValueError):
+            TemplateLookup.search(**params)
+    else:
+        assert TemplateLookup.search(**params) == expected
+        # Repeated searches are served from the cache
+        assert TemplateLookup.search(**params) == expected
+
+
+def test_template_search_missing_fields():
+    with pytest.raises(KeyError):
+        TemplateLookup.search(format='double-elimination', n_in_winners=8)
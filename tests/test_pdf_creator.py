@@ -6,11 +6,15 @@ import string
 from datetime import datetime, timedelta
 
 import pytest
+from PyPDF2 import PdfFileReader
 
 from curlybrackets.pdf.creator import (print_bracket,
                                        print_initial_bracket,
                                        print_continued_bracket,
+                                       render_batch,
+                                       render_batch_files,
                                        get_format)
+from curlybrackets.pdf.specs import PageSpec
 
 
 TESTS_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -358,6 +362,56 @@ def test_continued_bracket_exceptions(name_list):
         print_continued_bracket(filename, in_winners, in_losers)
 
 
+def test_page_spec_batch():
+    specs = PageSpec.batch([['A', 'B'], ['C', 'D']], 'd', n_advance=0,
+                           pool=['A101', 'A102'], event='SF',
+                           names_textgray=[0, 0.5],
+                           format_string='{phase}')
+    assert [s.names for s in specs] == [['A', 'B'], ['C', 'D']]
+    assert [s.lookup for s in specs] == [{'n_advance': 0}] * 2
+    assert [s.values for s in specs] == [{'pool': 'A101', 'event': 'SF'},
+                                         {'pool': 'A102', 'event': 'SF'}]
+    assert specs[1].props == {'names': {'textgray': 0.5},
+                              'progressions': {'format_string': '{phase}'}}
+
+
+def test_render_batch(name_list, game_list, pool_list):
+    filename = os.path.join(PDF_DIR, 'de_render_batch.pdf')
+    specs = [PageSpec([next(name_list) for _ in range(n)], 'd',
+                      lookup={'n_advance': 0},
+                      values={'event': next(game_list),
+                              'pool': next(pool_list), 'total': str(n)},
+                      props={'names': {'textgray': 0.2}})
+             for n in [8, 16, 32, 16]]
+    render_batch(specs, filename)
+    assert os.path.getsize(filename) > 0
+
+
+def test_render_batch_chunked(name_list, pool_list):
+    n_entrants = [8, 16, 8]
+    specs = [PageSpec([next(name_list) for _ in range(n)], 'd',
+                      lookup={'n_advance': 0},
+                      values={'pool': next(pool_list)})
+             for n in n_entrants]
+
+    pattern = os.path.join(PDF_DIR, 'de_render_chunk{:02d}.pdf')
+    chunk_files = render_batch_files(iter(specs), pattern, 2)
+    assert [len(PdfFileReader(cf).pages) for cf in chunk_files] == [2, 1]
+
+    filename = os.path.join(PDF_DIR, 'de_render_chunked.pdf')
+    render_batch(specs, filename, chunk_size=2)
+    assert len(PdfFileReader(filename).pages) == len(n_entrants)
+
+
+def test_print_bracket_chunked(name_list):
+    entrants = [[next(name_list) for _ in range(n)] for n in [8, 16, 8, 8, 16]]
+    filename = os.path.join(PDF_DIR, 'de_print_chunked.pdf')
+    chunk_files = print_bracket(filename, entrants, format='d', chunk_size=2)
+    assert chunk_files == [os.path.join(PDF_DIR, 'de_print_chunked-{:03d}.pdf'.format(i))
+                           for i in [1, 2, 3]]
+    assert [len(PdfFileReader(cf).pages) for cf in chunk_files] == [2, 2, 1]
+
+
 @pytest.mark.parametrize('format',
                          ['double-elimination',
                           'single-elimination',
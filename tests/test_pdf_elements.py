@@ -0,0 +1,149 @@
+import io
+
+import pytest
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Paragraph
+
+from curlybrackets.pdf.elements import (_fit_line, _search_fit, _FitMemo,
+                                        _FrameProbe, ParagraphElement,
+                                        ItemListElement)
+
+
+def _fit_line_stepwise(text, fontname, fontsize, width, min_hscale):
+    line_width = stringWidth(text, fontname, fontsize)
+    hscale = 100 * width / (line_width if line_width > 0 else 1e-5)
+    while hscale < min_hscale:
+        fontsize -= 0.25
+        line_width = stringWidth(text, fontname, fontsize)
+        hscale = 100 * width / line_width
+    if hscale > 100:
+        hscale = 100
+    else:
+        line_width = width
+    return fontsize, hscale, line_width
+
+
+@pytest.mark.parametrize('text', ['Bye', 'A much longer player tag | Sponsor',
+                                  'WWWWWWWWWWWWWWWWWWWWWWWW', ''])
+@pytest.mark.parametrize('width, min_hscale', [(79.2, 60), (150.08, 90),
+                                               (40, 100)])
+def test_fit_line(text, width, min_hscale):
+    expected = _fit_line_stepwise(text, 'Helvetica', 11, width, min_hscale)
+    assert _fit_line(text, 'Helvetica', 11, width, min_hscale) \
+        == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('max_steps, boundary', [(40, 0), (40, 1), (40, 17),
+                                                 (40, 40), (1, 1)])
+def test_search_fit(max_steps, boundary):
+    calls = []
+
+    def fits(steps):
+        calls.append(steps)
+        return steps >= boundary
+
+    assert _search_fit(fits, max_steps) == boundary
+    assert len(calls) <= 2 + max_steps.bit_length()
+
+
+def test_fit_memo_lru():
+    memo = _FitMemo(maxsize=2)
+    calls = []
+
+    def fits_from(boundary):
+        def fits(steps):
+            calls.append(boundary)
+            return steps >= boundary
+        return fits
+
+    assert memo.steps('a', fits_from(3), 11) == 3
+    assert memo.steps('b', fits_from(5), 11) == 5
+    n_calls = len(calls)
+    assert memo.steps('a', fits_from(0), 11) == 3
+    assert len(calls) == n_calls
+    # 'b' is the least recently used entry, so it is evicted for 'c'
+    memo.steps('c', fits_from(1), 11)
+    assert memo.steps('a', fits_from(0), 11) == 3
+    assert memo.steps('b', fits_from(0), 11) == 0
+
+
+def _canvas():
+    canvas = Canvas(io.BytesIO())
+    canvas.setFont('Helvetica', 11)
+    return canvas
+
+
+PARAGRAPHS = ['Top 8', 'Winners Round 1 of the Double Elimination Bracket',
+              ' '.join(['Player{}'.format(i) for i in range(40)])]
+
+
+@pytest.mark.parametrize('text', PARAGRAPHS)
+@pytest.mark.parametrize('width, height', [(200, 30), (80, 60), (300, 14)])
+def test_paragraph_fit_matches_linear_search(text, width, height):
+    canvas = _canvas()
+    element = ParagraphElement(x=10, y=10, width=width, height=height)
+    frame = element._build_frame(canvas)
+
+    # Step down until the frame takes the paragraph whole
+    style = element._build_style(canvas)
+    while len(frame.split(Paragraph(text, style), canvas)) != 1:
+        style.fontSize -= 0.25
+        style.leading -= 0.3
+
+    fitted = element._fit_paragraph_style(canvas, frame, text,
+                                          element._build_style(canvas))
+    assert fitted.fontSize == pytest.approx(style.fontSize)
+    assert fitted.leading == pytest.approx(style.leading)
+
+
+@pytest.mark.parametrize('n_items', [3, 17, 64])
+@pytest.mark.parametrize('section_header', [None, 'Pool A1'])
+@pytest.mark.parametrize('width, height', [(250, 120), (120, 200)])
+def test_item_list_fit_matches_linear_search(n_items, section_header,
+                                             width, height):
+    canvas = _canvas()
+    items = ['{}. Entrant {}'.format(i + 1, 'W' * (i % 7)) for i in range(n_items)]
+    element = ItemListElement(x=10, y=10, width=width, height=height,
+                              bullet='-', section_header=section_header)
+    items_txt = ['- {}'.format(n) for n in items]
+
+    def prepared():
+        frame = element._build_frame(canvas)
+        style = element._build_style(canvas)
+        avail_height = element.height
+        if section_header:
+            frame.add(Paragraph(section_header, style), canvas)
+            avail_height -= style.leading
+        return frame, style.clone('Item'), avail_height
+
+    # Step down until frame.add accepts the table
+    frame, istyle, avail_height = prepared()
+    while True:
+        table, col_widths = element._build_table(canvas, items_txt, istyle,
+                                                 avail_height)
+        if sum(col_widths) <= width and frame.add(table, canvas):
+            break
+        istyle.fontSize -= 0.25
+        istyle.leading -= 0.3
+
+    frame, style, avail_height = prepared()
+    fitted = element._fit_items_style(canvas, frame, items_txt, style,
+                                      avail_height)
+    assert fitted.fontSize == pytest.approx(istyle.fontSize)
+    assert fitted.leading == pytest.approx(istyle.leading)
+
+
+def test_frame_probe_leaves_frame_untouched():
+    canvas = _canvas()
+    element = ParagraphElement(x=10, y=10, width=100, height=40)
+    frame = element._build_frame(canvas)
+    state = dict(frame.__dict__)
+    probe = _FrameProbe(frame)
+    style = element._build_style(canvas)
+    # Fills the frame, so only fits again if each probe starts afresh
+    for _ in range(3):
+        assert probe.fits(Paragraph('Winners Round 1 of the Double', style))
+    assert not probe.fits(Paragraph(' '.join(['Player'] * 200), style))
+    assert frame.__dict__ == state